@@ -94,6 +94,33 @@ def load_all(stream, Loader):
     finally:
         loader.dispose()
 
+def load_keys(stream, keys, Loader):
+    """
+    Parse the first YAML document in a stream
+    and produce the corresponding Python object,
+    keeping only the given top-level mapping keys.
+
+    Other values are skipped without being constructed
+    and parsing stops once all keys have been found.
+    Requires a pure Python Loader.
+    """
+    loader = Loader(stream)
+    try:
+        return loader.get_partial_data(keys)
+    finally:
+        loader.dispose()
+
+def safe_load_keys(stream, keys):
+    """
+    Parse the first YAML document in a stream
+    and produce the corresponding Python object,
+    keeping only the given top-level mapping keys.
+
+    Resolve only basic YAML tags. This is known
+    to be safe for untrusted input.
+    """
+    return load_keys(stream, keys, SafeLoader)
+
 def full_load(stream):
     """
     Parse the first YAML document in a stream
@@ -179,10 +206,12 @@ def serialize_all(nodes, stream=None, Dumper=Dumper,
         canonical=None, indent=None, width=None,
         allow_unicode=None, line_break=None,
         encoding=None, explicit_start=None, explicit_end=None,
-        version=None, tags=None):
+        version=None, tags=None, tree=False):
     """
     Serialize a sequence of representation trees into a YAML stream.
     If stream is None, return the produced string instead.
+    If tree is true, the nodes must not share any children; anchors
+    are not computed.
     """
     getvalue = None
     if stream is None:
@@ -194,7 +223,8 @@ def serialize_all(nodes, stream=None, Dumper=Dumper,
     dumper = Dumper(stream, canonical=canonical, indent=indent, width=width,
             allow_unicode=allow_unicode, line_break=line_break,
             encoding=encoding, version=version, tags=tags,
-            explicit_start=explicit_start, explicit_end=explicit_end)
+            explicit_start=explicit_start, explicit_end=explicit_end,
+            tree=tree)
     try:
         dumper.open()
         for node in nodes:
@@ -217,10 +247,12 @@ def dump_all(documents, stream=None, Dumper=Dumper,
         canonical=None, indent=None, width=None,
         allow_unicode=None, line_break=None,
         encoding=None, explicit_start=None, explicit_end=None,
-        version=None, tags=None, sort_keys=True):
+        version=None, tags=None, sort_keys=True, tree=False):
     """
     Serialize a sequence of Python objects into a YAML stream.
     If stream is None, return the produced string instead.
+    If tree is true, the documents must not share any objects; anchors
+    are not computed.
     """
     getvalue = None
     if stream is None:
@@ -234,7 +266,8 @@ def dump_all(documents, stream=None, Dumper=Dumper,
             canonical=canonical, indent=indent, width=width,
             allow_unicode=allow_unicode, line_break=line_break,
             encoding=encoding, version=version, tags=tags,
-            explicit_start=explicit_start, explicit_end=explicit_end, sort_keys=sort_keys)
+            explicit_start=explicit_start, explicit_end=explicit_end, sort_keys=sort_keys,
+            tree=tree)
     try:
         dumper.open()
         for data in documents:
@@ -47,6 +47,66 @@ class Composer:
 
         return document
 
+    def get_partial_node(self, keys):
+        # Compose the root node of the first document, keeping only the
+        # top-level mapping entries whose (scalar) keys are in `keys`.
+        # Other values are skipped at the event level, and composition stops
+        # as soon as every wanted key has been seen, so the rest of the
+        # stream is neither checked nor parsed.  Only the first occurrence
+        # of a key is kept.  Aliases to anchors defined in skipped values
+        # raise ComposerError.
+
+        # Drop the STREAM-START event.
+        self.get_event()
+
+        # Compose a document if the stream is not empty.
+        if self.check_event(StreamEndEvent):
+            return None
+
+        # Drop the DOCUMENT-START event.
+        self.get_event()
+
+        # Documents that are not mappings are composed entirely.
+        if not self.check_event(MappingStartEvent):
+            return self.compose_node(None, None)
+
+        wanted = set(keys)
+        self.descend_resolver(None, None)
+        start_event = self.get_event()
+        tag = start_event.tag
+        if tag is None or tag == '!':
+            tag = self.resolve(MappingNode, None, start_event.implicit)
+        node = MappingNode(tag, [],
+                start_event.start_mark, None,
+                flow_style=start_event.flow_style)
+        if start_event.anchor is not None:
+            self.anchors[start_event.anchor] = node
+        while wanted and not self.check_event(MappingEndEvent):
+            item_key = self.compose_node(node, None)
+            if isinstance(item_key, ScalarNode) and item_key.value in wanted:
+                wanted.discard(item_key.value)
+                item_value = self.compose_node(node, item_key)
+                node.value.append((item_key, item_value))
+            else:
+                self.skip_block_value()
+                self.skip_node()
+        node.end_mark = self.peek_event().end_mark
+        self.ascend_resolver()
+        self.anchors = {}
+        return node
+
+    def skip_node(self):
+        # Consume the events of the next node without composing it.
+        event = self.get_event()
+        if isinstance(event, (SequenceStartEvent, MappingStartEvent)):
+            depth = 1
+            while depth:
+                event = self.get_event()
+                if isinstance(event, (SequenceStartEvent, MappingStartEvent)):
+                    depth += 1
+                elif isinstance(event, (SequenceEndEvent, MappingEndEvent)):
+                    depth -= 1
+
     def compose_document(self):
         # Drop the DOCUMENT-START event.
         self.get_event()
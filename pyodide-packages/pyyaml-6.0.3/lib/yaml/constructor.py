@@ -51,6 +51,13 @@ class BaseConstructor:
             return self.construct_document(node)
         return None
 
+    def get_partial_data(self, keys):
+        # Construct the wanted top-level keys of the first document.
+        node = self.get_partial_node(keys)
+        if node is not None:
+            return self.construct_document(node)
+        return None
+
     def construct_document(self, node):
         data = self.construct_object(node)
         while self.state_generators:
@@ -1,22 +1,90 @@
 
 __all__ = ['Mark', 'YAMLError', 'MarkedYAMLError']
 
+import weakref
+
+class MarkSource:
+    # The text a reader hands out marks into. Marks produced by a reader only
+    # keep a weak reference to it, so they do not keep the whole document
+    # alive once the loader is gone; a MarkedYAMLError keeps detached copies
+    # of its marks with the few characters it needs for its snippet.
+
+    __slots__ = ('buffer', '__weakref__')
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __call__(self):
+        # Lets marks dereference a MarkSource and a weak reference alike.
+        return self
+
+    def __reduce__(self):
+        return MarkSource, (self.buffer,)
+
 class Mark:
 
+    __slots__ = ('name', 'index', 'line', 'column', 'pointer', 'source')
+
     def __init__(self, name, index, line, column, buffer, pointer):
         self.name = name
         self.index = index
         self.line = line
         self.column = column
-        self.buffer = buffer
         self.pointer = pointer
+        if buffer is None:
+            self.source = None
+        elif isinstance(buffer, MarkSource):
+            self.source = weakref.ref(buffer)
+        else:
+            self.source = MarkSource(buffer)
+
+    @property
+    def buffer(self):
+        if self.source is None:
+            return None
+        source = self.source()
+        if source is None:
+            return None
+        return source.buffer
+
+    def __getstate__(self):
+        # A weak reference cannot be pickled or copied; the copy refers to
+        # the source strongly instead, like a mark built from a string.
+        # Marks of one document still share a single source in a pickle.
+        source = self.source() if self.source is not None else None
+        return (self.name, self.index, self.line, self.column, self.pointer,
+                source)
+
+    def __setstate__(self, state):
+        (self.name, self.index, self.line, self.column, self.pointer,
+                self.source) = state
+
+    def detached(self, max_length=75):
+        # Return a copy that owns the characters get_snippet() can reach,
+        # so it outlives the reader cheaply. The mark itself is not changed:
+        # nodes share their marks with the errors raised about them.
+        buffer = self.buffer
+        if buffer is None:
+            return Mark(self.name, self.index, self.line, self.column,
+                    None, self.pointer)
+        start = max(self.pointer-max_length, 0)
+        end = min(self.pointer+max_length, len(buffer))
+        if start > 0 and buffer[start-1] not in '\0\r\n\x85\u2028\u2029':
+            # Keep get_snippet() from mistaking the cut for a line start.
+            start += 1
+            prefix = '\0'
+        else:
+            prefix = ''
+        return Mark(self.name, self.index, self.line, self.column,
+                prefix+buffer[start:end], self.pointer-start+len(prefix))
 
     def get_snippet(self, indent=4, max_length=75):
-        if self.buffer is None:
+        buffer = self.buffer
+        if buffer is None:
             return None
         head = ''
         start = self.pointer
-        while start > 0 and self.buffer[start-1] not in '\0\r\n\x85\u2028\u2029':
+        while start > 0 and buffer[start-1] not in '\0\r\n\x85\u2028\u2029':
             start -= 1
             if self.pointer-start > max_length/2-1:
                 head = ' ... '
@@ -24,13 +92,13 @@ class Mark:
                 break
         tail = ''
         end = self.pointer
-        while end < len(self.buffer) and self.buffer[end] not in '\0\r\n\x85\u2028\u2029':
+        while end < len(buffer) and buffer[end] not in '\0\r\n\x85\u2028\u2029':
             end += 1
             if end-self.pointer > max_length/2-1:
                 tail = ' ... '
                 end -= 5
                 break
-        snippet = self.buffer[start:end]
+        snippet = buffer[start:end]
         return ' '*indent + head + snippet + tail + '\n'  \
                 + ' '*(indent+self.pointer-start+len(head)) + '^'
 
@@ -49,6 +117,10 @@ class MarkedYAMLError(YAMLError):
 
     def __init__(self, context=None, context_mark=None,
             problem=None, problem_mark=None, note=None):
+        if context_mark is not None:
+            context_mark = context_mark.detached()
+        if problem_mark is not None:
+            problem_mark = problem_mark.detached()
         self.context = context
         self.context_mark = context_mark
         self.problem = problem
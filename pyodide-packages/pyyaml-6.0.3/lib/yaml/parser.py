@@ -69,6 +69,56 @@ from .scanner import *
 class ParserError(MarkedYAMLError):
     pass
 
+# Token kinds the parser dispatches on.
+
+DIRECTIVE = DirectiveToken.kind
+DOCUMENT_START = DocumentStartToken.kind
+DOCUMENT_END = DocumentEndToken.kind
+STREAM_END = StreamEndToken.kind
+BLOCK_SEQUENCE_START = BlockSequenceStartToken.kind
+BLOCK_MAPPING_START = BlockMappingStartToken.kind
+BLOCK_END = BlockEndToken.kind
+FLOW_SEQUENCE_START = FlowSequenceStartToken.kind
+FLOW_MAPPING_START = FlowMappingStartToken.kind
+FLOW_SEQUENCE_END = FlowSequenceEndToken.kind
+FLOW_MAPPING_END = FlowMappingEndToken.kind
+KEY = KeyToken.kind
+VALUE = ValueToken.kind
+BLOCK_ENTRY = BlockEntryToken.kind
+FLOW_ENTRY = FlowEntryToken.kind
+ALIAS = AliasToken.kind
+ANCHOR = AnchorToken.kind
+TAG = TagToken.kind
+SCALAR = ScalarToken.kind
+
+# Parser states. `Parser.state` holds one of these and `Parser.states` is a
+# stack of them; each one indexes the parse_* method in Parser.STATES that
+# produces the next event.
+
+(STREAM_START_STATE,
+ IMPLICIT_DOCUMENT_START_STATE,
+ DOCUMENT_START_STATE,
+ DOCUMENT_END_STATE,
+ DOCUMENT_CONTENT_STATE,
+ BLOCK_NODE_STATE,
+ BLOCK_NODE_OR_INDENTLESS_SEQUENCE_STATE,
+ FLOW_NODE_STATE,
+ BLOCK_SEQUENCE_FIRST_ENTRY_STATE,
+ BLOCK_SEQUENCE_ENTRY_STATE,
+ INDENTLESS_SEQUENCE_ENTRY_STATE,
+ BLOCK_MAPPING_FIRST_KEY_STATE,
+ BLOCK_MAPPING_KEY_STATE,
+ BLOCK_MAPPING_VALUE_STATE,
+ FLOW_SEQUENCE_FIRST_ENTRY_STATE,
+ FLOW_SEQUENCE_ENTRY_STATE,
+ FLOW_SEQUENCE_ENTRY_MAPPING_KEY_STATE,
+ FLOW_SEQUENCE_ENTRY_MAPPING_VALUE_STATE,
+ FLOW_SEQUENCE_ENTRY_MAPPING_END_STATE,
+ FLOW_MAPPING_FIRST_KEY_STATE,
+ FLOW_MAPPING_KEY_STATE,
+ FLOW_MAPPING_VALUE_STATE,
+ FLOW_MAPPING_EMPTY_VALUE_STATE) = range(23)
+
 class Parser:
     # Since writing a recursive-descendant parser is a straightforward task, we
     # do not give many comments here.
@@ -78,13 +128,43 @@ class Parser:
         '!!':  'tag:yaml.org,2002:',
     }
 
+    STATES = (
+        'parse_stream_start',
+        'parse_implicit_document_start',
+        'parse_document_start',
+        'parse_document_end',
+        'parse_document_content',
+        'parse_block_node',
+        'parse_block_node_or_indentless_sequence',
+        'parse_flow_node',
+        'parse_block_sequence_first_entry',
+        'parse_block_sequence_entry',
+        'parse_indentless_sequence_entry',
+        'parse_block_mapping_first_key',
+        'parse_block_mapping_key',
+        'parse_block_mapping_value',
+        'parse_flow_sequence_first_entry',
+        'parse_flow_sequence_entry',
+        'parse_flow_sequence_entry_mapping_key',
+        'parse_flow_sequence_entry_mapping_value',
+        'parse_flow_sequence_entry_mapping_end',
+        'parse_flow_mapping_first_key',
+        'parse_flow_mapping_key',
+        'parse_flow_mapping_value',
+        'parse_flow_mapping_empty_value',
+    )
+
     def __init__(self):
         self.current_event = None
         self.yaml_version = None
         self.tag_handles = {}
         self.states = []
         self.marks = []
-        self.state = self.parse_stream_start
+        self.state = STREAM_START_STATE
+        # Plain functions looked up on the class, so overridden parse_*
+        # methods are honoured without keeping bound methods around.
+        cls = self.__class__
+        self.state_handlers = [getattr(cls, name) for name in self.STATES]
 
     def dispose(self):
         # Reset the state attributes (to clear self-references)
@@ -93,31 +173,33 @@ class Parser:
 
     def check_event(self, *choices):
         # Check the type of the next event.
-        if self.current_event is None:
-            if self.state:
-                self.current_event = self.state()
-        if self.current_event is not None:
-            if not choices:
+        event = self.current_event
+        if event is None:
+            if self.state is None:
+                return False
+            event = self.current_event = self.state_handlers[self.state](self)
+        if not choices:
+            return True
+        for choice in choices:
+            if isinstance(event, choice):
                 return True
-            for choice in choices:
-                if isinstance(self.current_event, choice):
-                    return True
         return False
 
     def peek_event(self):
         # Get the next event.
         if self.current_event is None:
-            if self.state:
-                self.current_event = self.state()
+            if self.state is not None:
+                self.current_event = self.state_handlers[self.state](self)
         return self.current_event
 
     def get_event(self):
         # Get the next event and proceed further.
-        if self.current_event is None:
-            if self.state:
-                self.current_event = self.state()
         value = self.current_event
-        self.current_event = None
+        if value is None:
+            if self.state is not None:
+                value = self.state_handlers[self.state](self)
+        else:
+            self.current_event = None
         return value
 
     # stream    ::= STREAM-START implicit_document? explicit_document* STREAM-END
@@ -132,24 +214,24 @@ class Parser:
                 encoding=token.encoding)
 
         # Prepare the next state.
-        self.state = self.parse_implicit_document_start
+        self.state = IMPLICIT_DOCUMENT_START_STATE
 
         return event
 
     def parse_implicit_document_start(self):
 
         # Parse an implicit document.
-        if not self.check_token(DirectiveToken, DocumentStartToken,
-                StreamEndToken):
+        token = self.peek_token()
+        kind = token.kind
+        if kind != DIRECTIVE and kind != DOCUMENT_START and kind != STREAM_END:
             self.tag_handles = self.DEFAULT_TAGS
-            token = self.peek_token()
             start_mark = end_mark = token.start_mark
             event = DocumentStartEvent(start_mark, end_mark,
                     explicit=False)
 
             # Prepare the next state.
-            self.states.append(self.parse_document_end)
-            self.state = self.parse_block_node
+            self.states.append(DOCUMENT_END_STATE)
+            self.state = BLOCK_NODE_STATE
 
             return event
 
@@ -159,28 +241,29 @@ class Parser:
     def parse_document_start(self):
 
         # Parse any extra document end indicators.
-        while self.check_token(DocumentEndToken):
+        while self.peek_token().kind == DOCUMENT_END:
             self.get_token()
 
         # Parse an explicit document.
-        if not self.check_token(StreamEndToken):
-            token = self.peek_token()
+        token = self.peek_token()
+        if token.kind != STREAM_END:
             start_mark = token.start_mark
             version, tags = self.process_directives()
-            if not self.check_token(DocumentStartToken):
+            token = self.peek_token()
+            if token.kind != DOCUMENT_START:
                 raise ParserError(None, None,
                         "expected '<document start>', but found %r"
-                        % self.peek_token().id,
-                        self.peek_token().start_mark)
-            token = self.get_token()
+                        % token.id,
+                        token.start_mark)
+            self.get_token()
             end_mark = token.end_mark
             event = DocumentStartEvent(start_mark, end_mark,
                     explicit=True, version=version, tags=tags)
-            self.states.append(self.parse_document_end)
-            self.state = self.parse_document_content
+            self.states.append(DOCUMENT_END_STATE)
+            self.state = DOCUMENT_CONTENT_STATE
         else:
             # Parse the end of the stream.
-            token = self.get_token()
+            self.get_token()
             event = StreamEndEvent(token.start_mark, token.end_mark)
             assert not self.states
             assert not self.marks
@@ -193,22 +276,24 @@ class Parser:
         token = self.peek_token()
         start_mark = end_mark = token.start_mark
         explicit = False
-        if self.check_token(DocumentEndToken):
-            token = self.get_token()
+        if token.kind == DOCUMENT_END:
+            self.get_token()
             end_mark = token.end_mark
             explicit = True
         event = DocumentEndEvent(start_mark, end_mark,
                 explicit=explicit)
 
         # Prepare the next state.
-        self.state = self.parse_document_start
+        self.state = DOCUMENT_START_STATE
 
         return event
 
     def parse_document_content(self):
-        if self.check_token(DirectiveToken,
-                DocumentStartToken, DocumentEndToken, StreamEndToken):
-            event = self.process_empty_scalar(self.peek_token().start_mark)
+        token = self.peek_token()
+        kind = token.kind
+        if kind == DIRECTIVE or kind == DOCUMENT_START  \
+                or kind == DOCUMENT_END or kind == STREAM_END:
+            event = self.process_empty_scalar(token.start_mark)
             self.state = self.states.pop()
             return event
         else:
@@ -217,7 +302,7 @@ class Parser:
     def process_directives(self):
         self.yaml_version = None
         self.tag_handles = {}
-        while self.check_token(DirectiveToken):
+        while self.peek_token().kind == DIRECTIVE:
             token = self.get_token()
             if token.name == 'YAML':
                 if self.yaml_version is not None:
@@ -271,104 +356,109 @@ class Parser:
         return self.parse_node(block=True, indentless_sequence=True)
 
     def parse_node(self, block=False, indentless_sequence=False):
-        if self.check_token(AliasToken):
-            token = self.get_token()
+        token = self.peek_token()
+        kind = token.kind
+        if kind == ALIAS:
+            self.get_token()
             event = AliasEvent(token.value, token.start_mark, token.end_mark)
             self.state = self.states.pop()
-        else:
-            anchor = None
-            tag = None
-            start_mark = end_mark = tag_mark = None
-            if self.check_token(AnchorToken):
-                token = self.get_token()
-                start_mark = token.start_mark
-                end_mark = token.end_mark
-                anchor = token.value
-                if self.check_token(TagToken):
-                    token = self.get_token()
-                    tag_mark = token.start_mark
-                    end_mark = token.end_mark
-                    tag = token.value
-            elif self.check_token(TagToken):
-                token = self.get_token()
-                start_mark = tag_mark = token.start_mark
+            return event
+        anchor = None
+        tag = None
+        start_mark = end_mark = tag_mark = None
+        if kind == ANCHOR:
+            self.get_token()
+            start_mark = token.start_mark
+            end_mark = token.end_mark
+            anchor = token.value
+            token = self.peek_token()
+            if token.kind == TAG:
+                self.get_token()
+                tag_mark = token.start_mark
                 end_mark = token.end_mark
                 tag = token.value
-                if self.check_token(AnchorToken):
-                    token = self.get_token()
-                    end_mark = token.end_mark
-                    anchor = token.value
-            if tag is not None:
-                handle, suffix = tag
-                if handle is not None:
-                    if handle not in self.tag_handles:
-                        raise ParserError("while parsing a node", start_mark,
-                                "found undefined tag handle %r" % handle,
-                                tag_mark)
-                    tag = self.tag_handles[handle]+suffix
-                else:
-                    tag = suffix
-            #if tag == '!':
-            #    raise ParserError("while parsing a node", start_mark,
-            #            "found non-specific tag '!'", tag_mark,
-            #            "Please check 'http://pyyaml.org/wiki/YAMLNonSpecificTag' and share your opinion.")
-            if start_mark is None:
-                start_mark = end_mark = self.peek_token().start_mark
-            event = None
-            implicit = (tag is None or tag == '!')
-            if indentless_sequence and self.check_token(BlockEntryToken):
-                end_mark = self.peek_token().end_mark
-                event = SequenceStartEvent(anchor, tag, implicit,
-                        start_mark, end_mark)
-                self.state = self.parse_indentless_sequence_entry
+        elif kind == TAG:
+            self.get_token()
+            start_mark = tag_mark = token.start_mark
+            end_mark = token.end_mark
+            tag = token.value
+            token = self.peek_token()
+            if token.kind == ANCHOR:
+                self.get_token()
+                end_mark = token.end_mark
+                anchor = token.value
+        if tag is not None:
+            handle, suffix = tag
+            if handle is not None:
+                if handle not in self.tag_handles:
+                    raise ParserError("while parsing a node", start_mark,
+                            "found undefined tag handle %r" % handle,
+                            tag_mark)
+                tag = self.tag_handles[handle]+suffix
             else:
-                if self.check_token(ScalarToken):
-                    token = self.get_token()
-                    end_mark = token.end_mark
-                    if (token.plain and tag is None) or tag == '!':
-                        implicit = (True, False)
-                    elif tag is None:
-                        implicit = (False, True)
-                    else:
-                        implicit = (False, False)
-                    event = ScalarEvent(anchor, tag, implicit, token.value,
-                            start_mark, end_mark, style=token.style)
-                    self.state = self.states.pop()
-                elif self.check_token(FlowSequenceStartToken):
-                    end_mark = self.peek_token().end_mark
-                    event = SequenceStartEvent(anchor, tag, implicit,
-                            start_mark, end_mark, flow_style=True)
-                    self.state = self.parse_flow_sequence_first_entry
-                elif self.check_token(FlowMappingStartToken):
-                    end_mark = self.peek_token().end_mark
-                    event = MappingStartEvent(anchor, tag, implicit,
-                            start_mark, end_mark, flow_style=True)
-                    self.state = self.parse_flow_mapping_first_key
-                elif block and self.check_token(BlockSequenceStartToken):
-                    end_mark = self.peek_token().start_mark
-                    event = SequenceStartEvent(anchor, tag, implicit,
-                            start_mark, end_mark, flow_style=False)
-                    self.state = self.parse_block_sequence_first_entry
-                elif block and self.check_token(BlockMappingStartToken):
-                    end_mark = self.peek_token().start_mark
-                    event = MappingStartEvent(anchor, tag, implicit,
-                            start_mark, end_mark, flow_style=False)
-                    self.state = self.parse_block_mapping_first_key
-                elif anchor is not None or tag is not None:
-                    # Empty scalars are allowed even if a tag or an anchor is
-                    # specified.
-                    event = ScalarEvent(anchor, tag, (implicit, False), '',
-                            start_mark, end_mark)
-                    self.state = self.states.pop()
-                else:
-                    if block:
-                        node = 'block'
-                    else:
-                        node = 'flow'
-                    token = self.peek_token()
-                    raise ParserError("while parsing a %s node" % node, start_mark,
-                            "expected the node content, but found %r" % token.id,
-                            token.start_mark)
+                tag = suffix
+        #if tag == '!':
+        #    raise ParserError("while parsing a node", start_mark,
+        #            "found non-specific tag '!'", tag_mark,
+        #            "Please check 'http://pyyaml.org/wiki/YAMLNonSpecificTag' and share your opinion.")
+        if start_mark is None:
+            start_mark = end_mark = token.start_mark
+        else:
+            token = self.peek_token()
+            kind = token.kind
+        event = None
+        implicit = (tag is None or tag == '!')
+        if indentless_sequence and kind == BLOCK_ENTRY:
+            end_mark = token.end_mark
+            event = SequenceStartEvent(anchor, tag, implicit,
+                    start_mark, end_mark)
+            self.state = INDENTLESS_SEQUENCE_ENTRY_STATE
+        elif kind == SCALAR:
+            self.get_token()
+            end_mark = token.end_mark
+            if (token.plain and tag is None) or tag == '!':
+                implicit = (True, False)
+            elif tag is None:
+                implicit = (False, True)
+            else:
+                implicit = (False, False)
+            event = ScalarEvent(anchor, tag, implicit, token.value,
+                    start_mark, end_mark, style=token.style)
+            self.state = self.states.pop()
+        elif kind == FLOW_SEQUENCE_START:
+            end_mark = token.end_mark
+            event = SequenceStartEvent(anchor, tag, implicit,
+                    start_mark, end_mark, flow_style=True)
+            self.state = FLOW_SEQUENCE_FIRST_ENTRY_STATE
+        elif kind == FLOW_MAPPING_START:
+            end_mark = token.end_mark
+            event = MappingStartEvent(anchor, tag, implicit,
+                    start_mark, end_mark, flow_style=True)
+            self.state = FLOW_MAPPING_FIRST_KEY_STATE
+        elif block and kind == BLOCK_SEQUENCE_START:
+            end_mark = token.start_mark
+            event = SequenceStartEvent(anchor, tag, implicit,
+                    start_mark, end_mark, flow_style=False)
+            self.state = BLOCK_SEQUENCE_FIRST_ENTRY_STATE
+        elif block and kind == BLOCK_MAPPING_START:
+            end_mark = token.start_mark
+            event = MappingStartEvent(anchor, tag, implicit,
+                    start_mark, end_mark, flow_style=False)
+            self.state = BLOCK_MAPPING_FIRST_KEY_STATE
+        elif anchor is not None or tag is not None:
+            # Empty scalars are allowed even if a tag or an anchor is
+            # specified.
+            event = ScalarEvent(anchor, tag, (implicit, False), '',
+                    start_mark, end_mark)
+            self.state = self.states.pop()
+        else:
+            if block:
+                node = 'block'
+            else:
+                node = 'flow'
+            raise ParserError("while parsing a %s node" % node, start_mark,
+                    "expected the node content, but found %r" % token.id,
+                    token.start_mark)
         return event
 
     # block_sequence ::= BLOCK-SEQUENCE-START (BLOCK-ENTRY block_node?)* BLOCK-END
@@ -379,19 +469,20 @@ class Parser:
         return self.parse_block_sequence_entry()
 
     def parse_block_sequence_entry(self):
-        if self.check_token(BlockEntryToken):
-            token = self.get_token()
-            if not self.check_token(BlockEntryToken, BlockEndToken):
-                self.states.append(self.parse_block_sequence_entry)
+        token = self.peek_token()
+        if token.kind == BLOCK_ENTRY:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != BLOCK_ENTRY and kind != BLOCK_END:
+                self.states.append(BLOCK_SEQUENCE_ENTRY_STATE)
                 return self.parse_block_node()
             else:
-                self.state = self.parse_block_sequence_entry
+                self.state = BLOCK_SEQUENCE_ENTRY_STATE
                 return self.process_empty_scalar(token.end_mark)
-        if not self.check_token(BlockEndToken):
-            token = self.peek_token()
+        if token.kind != BLOCK_END:
             raise ParserError("while parsing a block collection", self.marks[-1],
                     "expected <block end>, but found %r" % token.id, token.start_mark)
-        token = self.get_token()
+        self.get_token()
         event = SequenceEndEvent(token.start_mark, token.end_mark)
         self.state = self.states.pop()
         self.marks.pop()
@@ -400,16 +491,17 @@ class Parser:
     # indentless_sequence ::= (BLOCK-ENTRY block_node?)+
 
     def parse_indentless_sequence_entry(self):
-        if self.check_token(BlockEntryToken):
-            token = self.get_token()
-            if not self.check_token(BlockEntryToken,
-                    KeyToken, ValueToken, BlockEndToken):
-                self.states.append(self.parse_indentless_sequence_entry)
+        token = self.peek_token()
+        if token.kind == BLOCK_ENTRY:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != BLOCK_ENTRY and kind != KEY  \
+                    and kind != VALUE and kind != BLOCK_END:
+                self.states.append(INDENTLESS_SEQUENCE_ENTRY_STATE)
                 return self.parse_block_node()
             else:
-                self.state = self.parse_indentless_sequence_entry
+                self.state = INDENTLESS_SEQUENCE_ENTRY_STATE
                 return self.process_empty_scalar(token.end_mark)
-        token = self.peek_token()
         event = SequenceEndEvent(token.start_mark, token.start_mark)
         self.state = self.states.pop()
         return event
@@ -425,36 +517,38 @@ class Parser:
         return self.parse_block_mapping_key()
 
     def parse_block_mapping_key(self):
-        if self.check_token(KeyToken):
-            token = self.get_token()
-            if not self.check_token(KeyToken, ValueToken, BlockEndToken):
-                self.states.append(self.parse_block_mapping_value)
+        token = self.peek_token()
+        if token.kind == KEY:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != KEY and kind != VALUE and kind != BLOCK_END:
+                self.states.append(BLOCK_MAPPING_VALUE_STATE)
                 return self.parse_block_node_or_indentless_sequence()
             else:
-                self.state = self.parse_block_mapping_value
+                self.state = BLOCK_MAPPING_VALUE_STATE
                 return self.process_empty_scalar(token.end_mark)
-        if not self.check_token(BlockEndToken):
-            token = self.peek_token()
+        if token.kind != BLOCK_END:
             raise ParserError("while parsing a block mapping", self.marks[-1],
                     "expected <block end>, but found %r" % token.id, token.start_mark)
-        token = self.get_token()
+        self.get_token()
         event = MappingEndEvent(token.start_mark, token.end_mark)
         self.state = self.states.pop()
         self.marks.pop()
         return event
 
     def parse_block_mapping_value(self):
-        if self.check_token(ValueToken):
-            token = self.get_token()
-            if not self.check_token(KeyToken, ValueToken, BlockEndToken):
-                self.states.append(self.parse_block_mapping_key)
+        token = self.peek_token()
+        if token.kind == VALUE:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != KEY and kind != VALUE and kind != BLOCK_END:
+                self.states.append(BLOCK_MAPPING_KEY_STATE)
                 return self.parse_block_node_or_indentless_sequence()
             else:
-                self.state = self.parse_block_mapping_key
+                self.state = BLOCK_MAPPING_KEY_STATE
                 return self.process_empty_scalar(token.end_mark)
         else:
-            self.state = self.parse_block_mapping_key
-            token = self.peek_token()
+            self.state = BLOCK_MAPPING_KEY_STATE
             return self.process_empty_scalar(token.start_mark)
 
     # flow_sequence     ::= FLOW-SEQUENCE-START
@@ -474,26 +568,26 @@ class Parser:
         return self.parse_flow_sequence_entry(first=True)
 
     def parse_flow_sequence_entry(self, first=False):
-        if not self.check_token(FlowSequenceEndToken):
+        token = self.peek_token()
+        if token.kind != FLOW_SEQUENCE_END:
             if not first:
-                if self.check_token(FlowEntryToken):
+                if token.kind == FLOW_ENTRY:
                     self.get_token()
-                else:
                     token = self.peek_token()
+                else:
                     raise ParserError("while parsing a flow sequence", self.marks[-1],
                             "expected ',' or ']', but got %r" % token.id, token.start_mark)
             
-            if self.check_token(KeyToken):
-                token = self.peek_token()
+            if token.kind == KEY:
                 event = MappingStartEvent(None, None, True,
                         token.start_mark, token.end_mark,
                         flow_style=True)
-                self.state = self.parse_flow_sequence_entry_mapping_key
+                self.state = FLOW_SEQUENCE_ENTRY_MAPPING_KEY_STATE
                 return event
-            elif not self.check_token(FlowSequenceEndToken):
-                self.states.append(self.parse_flow_sequence_entry)
+            elif token.kind != FLOW_SEQUENCE_END:
+                self.states.append(FLOW_SEQUENCE_ENTRY_STATE)
                 return self.parse_flow_node()
-        token = self.get_token()
+        self.get_token()
         event = SequenceEndEvent(token.start_mark, token.end_mark)
         self.state = self.states.pop()
         self.marks.pop()
@@ -501,30 +595,31 @@ class Parser:
 
     def parse_flow_sequence_entry_mapping_key(self):
         token = self.get_token()
-        if not self.check_token(ValueToken,
-                FlowEntryToken, FlowSequenceEndToken):
-            self.states.append(self.parse_flow_sequence_entry_mapping_value)
+        kind = self.peek_token().kind
+        if kind != VALUE and kind != FLOW_ENTRY and kind != FLOW_SEQUENCE_END:
+            self.states.append(FLOW_SEQUENCE_ENTRY_MAPPING_VALUE_STATE)
             return self.parse_flow_node()
         else:
-            self.state = self.parse_flow_sequence_entry_mapping_value
+            self.state = FLOW_SEQUENCE_ENTRY_MAPPING_VALUE_STATE
             return self.process_empty_scalar(token.end_mark)
 
     def parse_flow_sequence_entry_mapping_value(self):
-        if self.check_token(ValueToken):
-            token = self.get_token()
-            if not self.check_token(FlowEntryToken, FlowSequenceEndToken):
-                self.states.append(self.parse_flow_sequence_entry_mapping_end)
+        token = self.peek_token()
+        if token.kind == VALUE:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != FLOW_ENTRY and kind != FLOW_SEQUENCE_END:
+                self.states.append(FLOW_SEQUENCE_ENTRY_MAPPING_END_STATE)
                 return self.parse_flow_node()
             else:
-                self.state = self.parse_flow_sequence_entry_mapping_end
+                self.state = FLOW_SEQUENCE_ENTRY_MAPPING_END_STATE
                 return self.process_empty_scalar(token.end_mark)
         else:
-            self.state = self.parse_flow_sequence_entry_mapping_end
-            token = self.peek_token()
+            self.state = FLOW_SEQUENCE_ENTRY_MAPPING_END_STATE
             return self.process_empty_scalar(token.start_mark)
 
     def parse_flow_sequence_entry_mapping_end(self):
-        self.state = self.parse_flow_sequence_entry
+        self.state = FLOW_SEQUENCE_ENTRY_STATE
         token = self.peek_token()
         return MappingEndEvent(token.start_mark, token.start_mark)
 
@@ -540,50 +635,51 @@ class Parser:
         return self.parse_flow_mapping_key(first=True)
 
     def parse_flow_mapping_key(self, first=False):
-        if not self.check_token(FlowMappingEndToken):
+        token = self.peek_token()
+        if token.kind != FLOW_MAPPING_END:
             if not first:
-                if self.check_token(FlowEntryToken):
+                if token.kind == FLOW_ENTRY:
                     self.get_token()
-                else:
                     token = self.peek_token()
+                else:
                     raise ParserError("while parsing a flow mapping", self.marks[-1],
                             "expected ',' or '}', but got %r" % token.id, token.start_mark)
-            if self.check_token(KeyToken):
-                token = self.get_token()
-                if not self.check_token(ValueToken,
-                        FlowEntryToken, FlowMappingEndToken):
-                    self.states.append(self.parse_flow_mapping_value)
+            if token.kind == KEY:
+                self.get_token()
+                kind = self.peek_token().kind
+                if kind != VALUE and kind != FLOW_ENTRY and kind != FLOW_MAPPING_END:
+                    self.states.append(FLOW_MAPPING_VALUE_STATE)
                     return self.parse_flow_node()
                 else:
-                    self.state = self.parse_flow_mapping_value
+                    self.state = FLOW_MAPPING_VALUE_STATE
                     return self.process_empty_scalar(token.end_mark)
-            elif not self.check_token(FlowMappingEndToken):
-                self.states.append(self.parse_flow_mapping_empty_value)
+            elif token.kind != FLOW_MAPPING_END:
+                self.states.append(FLOW_MAPPING_EMPTY_VALUE_STATE)
                 return self.parse_flow_node()
-        token = self.get_token()
+        self.get_token()
         event = MappingEndEvent(token.start_mark, token.end_mark)
         self.state = self.states.pop()
         self.marks.pop()
         return event
 
     def parse_flow_mapping_value(self):
-        if self.check_token(ValueToken):
-            token = self.get_token()
-            if not self.check_token(FlowEntryToken, FlowMappingEndToken):
-                self.states.append(self.parse_flow_mapping_key)
+        token = self.peek_token()
+        if token.kind == VALUE:
+            self.get_token()
+            kind = self.peek_token().kind
+            if kind != FLOW_ENTRY and kind != FLOW_MAPPING_END:
+                self.states.append(FLOW_MAPPING_KEY_STATE)
                 return self.parse_flow_node()
             else:
-                self.state = self.parse_flow_mapping_key
+                self.state = FLOW_MAPPING_KEY_STATE
                 return self.process_empty_scalar(token.end_mark)
         else:
-            self.state = self.parse_flow_mapping_key
-            token = self.peek_token()
+            self.state = FLOW_MAPPING_KEY_STATE
             return self.process_empty_scalar(token.start_mark)
 
     def parse_flow_mapping_empty_value(self):
-        self.state = self.parse_flow_mapping_key
+        self.state = FLOW_MAPPING_KEY_STATE
         return self.process_empty_scalar(self.peek_token().start_mark)
 
     def process_empty_scalar(self, mark):
         return ScalarEvent(None, None, (True, False), '', mark, mark)
-
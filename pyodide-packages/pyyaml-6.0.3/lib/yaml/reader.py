@@ -17,7 +17,7 @@
 
 __all__ = ['Reader', 'ReaderError']
 
-from .error import YAMLError, Mark
+from .error import YAMLError, Mark, MarkSource
 
 import codecs, re
 
@@ -62,6 +62,7 @@ class Reader(object):
         self.stream_pointer = 0
         self.eof = True
         self.buffer = ''
+        self.buffer_source = None
         self.pointer = 0
         self.raw_buffer = None
         self.raw_decode = None
@@ -113,8 +114,13 @@ class Reader(object):
 
     def get_mark(self):
         if self.stream is None:
+            # All marks share one source per buffer and only refer to it
+            # weakly; see MarkSource.
+            if self.buffer_source is None  \
+                    or self.buffer_source.buffer is not self.buffer:
+                self.buffer_source = MarkSource(self.buffer)
             return Mark(self.name, self.index, self.line, self.column,
-                    self.buffer, self.pointer)
+                    self.buffer_source, self.pointer)
         else:
             return Mark(self.name, self.index, self.line, self.column,
                     None, None)
@@ -15,20 +15,26 @@ class BaseRepresenter:
     yaml_representers = {}
     yaml_multi_representers = {}
 
+    SORTED_KEYS_CACHE_SIZE = 1024
+
     def __init__(self, default_style=None, default_flow_style=False, sort_keys=True):
         self.default_style = default_style
         self.sort_keys = sort_keys
         self.default_flow_style = default_flow_style
+        self.sorted_keys_cache = {}
         self.represented_objects = {}
         self.object_keeper = []
         self.alias_key = None
+        self.represented_tree = None
 
     def represent(self, data):
+        self.represented_tree = True
         node = self.represent_data(data)
         self.serialize(node)
         self.represented_objects = {}
         self.object_keeper = []
         self.alias_key = None
+        self.represented_tree = None
 
     def represent_data(self, data):
         if self.ignore_aliases(data):
@@ -40,6 +46,7 @@ class BaseRepresenter:
                 node = self.represented_objects[self.alias_key]
                 #if node is None:
                 #    raise RepresenterError("recursive objects are not allowed: %r" % data)
+                self.represented_tree = False
                 return node
             #self.represented_objects[alias_key] = None
             self.object_keeper.append(data)
@@ -87,10 +94,12 @@ class BaseRepresenter:
         node = SequenceNode(tag, value, flow_style=flow_style)
         if self.alias_key is not None:
             self.represented_objects[self.alias_key] = node
-        best_style = True
+        # The node-based style check is only needed when neither the caller
+        # nor the dumper has already decided the flow style.
+        best_style = flow_style is None and self.default_flow_style is None
         for item in sequence:
             node_item = self.represent_data(item)
-            if not (isinstance(node_item, ScalarNode) and not node_item.style):
+            if best_style and not (isinstance(node_item, ScalarNode) and not node_item.style):
                 best_style = False
             value.append(node_item)
         if flow_style is None:
@@ -105,20 +114,16 @@ class BaseRepresenter:
         node = MappingNode(tag, value, flow_style=flow_style)
         if self.alias_key is not None:
             self.represented_objects[self.alias_key] = node
-        best_style = True
+        best_style = flow_style is None and self.default_flow_style is None
         if hasattr(mapping, 'items'):
             mapping = list(mapping.items())
             if self.sort_keys:
-                try:
-                    mapping = sorted(mapping)
-                except TypeError:
-                    pass
+                mapping = self.sort_mapping_items(mapping)
         for item_key, item_value in mapping:
             node_key = self.represent_data(item_key)
             node_value = self.represent_data(item_value)
-            if not (isinstance(node_key, ScalarNode) and not node_key.style):
-                best_style = False
-            if not (isinstance(node_value, ScalarNode) and not node_value.style):
+            if best_style and not (isinstance(node_key, ScalarNode) and not node_key.style
+                    and isinstance(node_value, ScalarNode) and not node_value.style):
                 best_style = False
             value.append((node_key, node_value))
         if flow_style is None:
@@ -128,6 +133,25 @@ class BaseRepresenter:
                 node.flow_style = best_style
         return node
 
+    def sort_mapping_items(self, items):
+        # Generated data tends to repeat the same string keys in the same
+        # order for every record, so the sorting permutation is cached per
+        # key tuple. Other keys are sorted as before.
+        keys = tuple([item[0] for item in items])
+        order = self.sorted_keys_cache.get(keys)
+        if order is None:
+            for key in keys:
+                if key.__class__ is not str:
+                    try:
+                        return sorted(items)
+                    except TypeError:
+                        return items
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            if len(self.sorted_keys_cache) >= self.SORTED_KEYS_CACHE_SIZE:
+                self.sorted_keys_cache.clear()
+            self.sorted_keys_cache[keys] = order
+        return [items[index] for index in order]
+
     def ignore_aliases(self, data):
         return False
 
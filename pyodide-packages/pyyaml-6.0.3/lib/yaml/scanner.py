@@ -29,6 +29,8 @@ __all__ = ['Scanner', 'ScannerError']
 from .error import MarkedYAMLError
 from .tokens import *
 
+import re
+
 class ScannerError(MarkedYAMLError):
     pass
 
@@ -140,6 +142,53 @@ class Scanner:
             self.tokens_taken += 1
             return self.tokens.pop(0)
 
+    def skip_block_value(self):
+        # Skip the lines of a value in a block mapping without scanning them.
+        # This is only possible right after the ':' indicator, and when the
+        # rest of the line does not start a flow collection, a quoted scalar
+        # or a node property.  The skipped lines are the rest of the line
+        # and the following lines that are blank, comments, more indented
+        # than the mapping or entries of an indentless sequence.  The value
+        # is then scanned as empty.  Return True if the value was skipped.
+        if self.flow_level or not self.eof or len(self.tokens) != 1    \
+                or not isinstance(self.tokens[0], ValueToken):
+            return False
+        pattern = self.block_value_patterns.get(self.indent)
+        if pattern is None:
+            pattern = re.compile(self.BLOCK_VALUE_PATTERN
+                    % {'indent': self.indent, 'more': self.indent+1})
+            self.block_value_patterns[self.indent] = pattern
+        match = pattern.match(self.buffer, self.pointer)
+        if match is None:
+            return False
+        skipped = match.group()
+        line_start = None
+        for line_break in self.LINE_BREAK_PATTERN.finditer(skipped):
+            self.line += 1
+            line_start = line_break.end()
+        self.pointer = match.end()
+        self.index += len(skipped)
+        if line_start is None:
+            self.column += len(skipped)
+        else:
+            self.column = len(skipped)-line_start
+        self.allow_simple_key = True
+        return True
+
+    LINE_BREAK_PATTERN = re.compile('\r\n|[\n\r\x85\u2028\u2029]')
+
+    BLOCK_VALUE_PATTERN = (
+        # The rest of the line after ':'.
+        '[ \t]*(?:[^ \t\\[{"\'&!\n\r\x85\u2028\u2029\0][^\n\r\x85\u2028\u2029\0]*)?'
+        '(?:\r\n|[\n\r\x85\u2028\u2029]|(?=\0))'
+        # The following lines of the value.
+        '(?:(?:[ \t]*(?:#[^\n\r\x85\u2028\u2029\0]*)?'
+        '|[ ]{%(more)d}[^\n\r\x85\u2028\u2029\0]*'
+        '|[ ]{%(indent)d}-(?=[ \t\r\n\x85\u2028\u2029\0])[^\n\r\x85\u2028\u2029\0]*)'
+        '(?:\r\n|[\n\r\x85\u2028\u2029]|(?=\0)))*')
+
+    block_value_patterns = {}
+
     # Private methods.
 
     def need_more_tokens(self):
@@ -13,12 +13,16 @@ class Serializer:
     ANCHOR_TEMPLATE = 'id%03d'
 
     def __init__(self, encoding=None,
-            explicit_start=None, explicit_end=None, version=None, tags=None):
+            explicit_start=None, explicit_end=None, version=None, tags=None,
+            tree=False):
         self.use_encoding = encoding
         self.use_explicit_start = explicit_start
         self.use_explicit_end = explicit_end
         self.use_version = version
         self.use_tags = tags
+        # When set, the caller promises that no node is reachable twice, so
+        # the anchor discovery pass can be skipped entirely.
+        self.use_tree = tree
         self.serialized_nodes = {}
         self.anchors = {}
         self.last_anchor_id = 0
@@ -50,8 +54,14 @@ class Serializer:
             raise SerializerError("serializer is closed")
         self.emit(DocumentStartEvent(explicit=self.use_explicit_start,
             version=self.use_version, tags=self.use_tags))
-        self.anchor_node(node)
-        self.serialize_node(node, None, None)
+        # The representer sets `represented_tree` when it did not reuse any
+        # node while building the graph; in that case there is nothing to
+        # anchor either.
+        if self.use_tree or getattr(self, 'represented_tree', None):
+            self.serialize_tree(node, None, None)
+        else:
+            self.anchor_node(node)
+            self.serialize_node(node, None, None)
         self.emit(DocumentEndEvent(explicit=self.use_explicit_end))
         self.serialized_nodes = {}
         self.anchors = {}
@@ -109,3 +119,35 @@ class Serializer:
                 self.emit(MappingEndEvent())
             self.ascend_resolver()
 
+    def serialize_tree(self, node, parent, index):
+        # Single-pass variant of serialize_node() for node graphs without
+        # shared nodes: no anchors, no aliases, no serialized_nodes
+        # bookkeeping. A cyclic graph passed here recurses without bound.
+        self.descend_resolver(parent, index)
+        if isinstance(node, ScalarNode):
+            detected_tag = self.resolve(ScalarNode, node.value, (True, False))
+            default_tag = self.resolve(ScalarNode, node.value, (False, True))
+            implicit = (node.tag == detected_tag), (node.tag == default_tag)
+            self.emit(ScalarEvent(None, node.tag, implicit, node.value,
+                style=node.style))
+        elif isinstance(node, SequenceNode):
+            implicit = (node.tag
+                        == self.resolve(SequenceNode, node.value, True))
+            self.emit(SequenceStartEvent(None, node.tag, implicit,
+                flow_style=node.flow_style))
+            index = 0
+            for item in node.value:
+                self.serialize_tree(item, node, index)
+                index += 1
+            self.emit(SequenceEndEvent())
+        elif isinstance(node, MappingNode):
+            implicit = (node.tag
+                        == self.resolve(MappingNode, node.value, True))
+            self.emit(MappingStartEvent(None, node.tag, implicit,
+                flow_style=node.flow_style))
+            for key, value in node.value:
+                self.serialize_tree(key, node, None)
+                self.serialize_tree(value, node, key)
+            self.emit(MappingEndEvent())
+        self.ascend_resolver()
+
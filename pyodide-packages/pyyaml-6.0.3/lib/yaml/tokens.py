@@ -1,11 +1,18 @@
 
 class Token(object):
+    # `kind` is a small integer unique to each token class, so the parser can
+    # dispatch on it instead of running isinstance() checks.
+    kind = 0
+    __slots__ = ('start_mark', 'end_mark')
     def __init__(self, start_mark, end_mark):
         self.start_mark = start_mark
         self.end_mark = end_mark
     def __repr__(self):
-        attributes = [key for key in self.__dict__
-                if not key.endswith('_mark')]
+        attributes = [key for cls in self.__class__.__mro__
+                for key in cls.__dict__.get('__slots__', ())
+                if not key.endswith('_mark') and hasattr(self, key)]
+        attributes.extend(key for key in getattr(self, '__dict__', ())
+                if not key.endswith('_mark'))
         attributes.sort()
         arguments = ', '.join(['%s=%r' % (key, getattr(self, key))
                 for key in attributes])
@@ -16,6 +23,8 @@ class Token(object):
 
 class DirectiveToken(Token):
     id = '<directive>'
+    kind = 1
+    __slots__ = ('name', 'value')
     def __init__(self, name, value, start_mark, end_mark):
         self.name = name
         self.value = value
@@ -24,12 +33,18 @@ class DirectiveToken(Token):
 
 class DocumentStartToken(Token):
     id = '<document start>'
+    kind = 2
+    __slots__ = ()
 
 class DocumentEndToken(Token):
     id = '<document end>'
+    kind = 3
+    __slots__ = ()
 
 class StreamStartToken(Token):
     id = '<stream start>'
+    kind = 4
+    __slots__ = ('encoding',)
     def __init__(self, start_mark=None, end_mark=None,
             encoding=None):
         self.start_mark = start_mark
@@ -38,42 +53,68 @@ class StreamStartToken(Token):
 
 class StreamEndToken(Token):
     id = '<stream end>'
+    kind = 5
+    __slots__ = ()
 
 class BlockSequenceStartToken(Token):
     id = '<block sequence start>'
+    kind = 6
+    __slots__ = ()
 
 class BlockMappingStartToken(Token):
     id = '<block mapping start>'
+    kind = 7
+    __slots__ = ()
 
 class BlockEndToken(Token):
     id = '<block end>'
+    kind = 8
+    __slots__ = ()
 
 class FlowSequenceStartToken(Token):
     id = '['
+    kind = 9
+    __slots__ = ()
 
 class FlowMappingStartToken(Token):
     id = '{'
+    kind = 10
+    __slots__ = ()
 
 class FlowSequenceEndToken(Token):
     id = ']'
+    kind = 11
+    __slots__ = ()
 
 class FlowMappingEndToken(Token):
     id = '}'
+    kind = 12
+    __slots__ = ()
 
 class KeyToken(Token):
     id = '?'
+    kind = 13
+    __slots__ = ()
 
 class ValueToken(Token):
     id = ':'
+    kind = 14
+    __slots__ = ()
 
 class BlockEntryToken(Token):
     id = '-'
+    kind = 15
+    __slots__ = ()
 
 class FlowEntryToken(Token):
     id = ','
+    kind = 16
+    __slots__ = ()
 
 class AliasToken(Token):
     id = '<alias>'
+    kind = 17
+    __slots__ = ('value',)
     def __init__(self, value, start_mark, end_mark):
         self.value = value
         self.start_mark = start_mark
@@ -81,6 +122,8 @@ class AliasToken(Token):
 
 class AnchorToken(Token):
     id = '<anchor>'
+    kind = 18
+    __slots__ = ('value',)
     def __init__(self, value, start_mark, end_mark):
         self.value = value
         self.start_mark = start_mark
@@ -88,6 +131,8 @@ class AnchorToken(Token):
 
 class TagToken(Token):
     id = '<tag>'
+    kind = 19
+    __slots__ = ('value',)
     def __init__(self, value, start_mark, end_mark):
         self.value = value
         self.start_mark = start_mark
@@ -95,6 +140,8 @@ class TagToken(Token):
 
 class ScalarToken(Token):
     id = '<scalar>'
+    kind = 20
+    __slots__ = ('value', 'plain', 'style')
     def __init__(self, value, plain, start_mark, end_mark, style=None):
         self.value = value
         self.plain = plain
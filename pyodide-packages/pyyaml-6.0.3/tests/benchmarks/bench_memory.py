@@ -0,0 +1,82 @@
+
+# Measures the memory retained by the token, event and node objects produced
+# for one Sigma-rule-sized document, and by the error of a failed parse.
+#
+#   PYTHONPATH=lib python tests/benchmarks/bench_memory.py [documents]
+
+import sys
+import tracemalloc
+
+import yaml
+
+DOCUMENT = """\
+title: Suspicious PowerShell Download and Execute Pattern
+id: 3b6ab547-8ec2-4991-b9d2-2b06702a48d7
+status: test
+description: Detects PowerShell command lines that download and execute a payload.
+references:
+    - https://example.com/research/powershell-download-cradles
+author: detection.studio
+date: 2024-01-01
+tags:
+    - attack.execution
+    - attack.t1059.001
+logsource:
+    category: process_creation
+    product: windows
+detection:
+    selection_img:
+        - Image|endswith:
+            - '\\\\powershell.exe'
+            - '\\\\pwsh.exe'
+        - OriginalFileName:
+            - 'PowerShell.EXE'
+            - 'pwsh.dll'
+    selection_cli:
+        CommandLine|contains:
+            - 'IEX ('
+            - 'Invoke-Expression'
+            - 'DownloadString'
+            - 'DownloadFile'
+            - 'Net.WebClient'
+    condition: all of selection_*
+falsepositives:
+    - Administrative scripts
+level: high
+"""
+
+def retained(produce, documents):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [produce() for _ in range(documents)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    count = sum(len(item) if isinstance(item, list) else 1 for item in kept)
+    return size // documents, count // documents
+
+def failed_parse():
+    try:
+        yaml.safe_load(DOCUMENT.replace('condition:', 'condition: [', 1))
+    except yaml.YAMLError as exc:
+        # Keep what a caller reporting the error keeps, not the loader
+        # frames of the traceback.
+        return exc.with_traceback(None)
+
+def main(documents=100):
+    stages = [
+        ('tokens', lambda: list(yaml.scan(DOCUMENT, Loader=yaml.SafeLoader))),
+        ('events', lambda: list(yaml.parse(DOCUMENT, Loader=yaml.SafeLoader))),
+        ('nodes', lambda: yaml.compose(DOCUMENT, Loader=yaml.SafeLoader)),
+        ('error', failed_parse),
+    ]
+    print("%-8s %14s %10s" % ('stage', 'bytes/doc', 'objects'))
+    for name, produce in stages:
+        size, count = retained(produce, documents)
+        print("%-8s %14d %10s" % (name, size, count if name in ('tokens', 'events') else '-'))
+    for cls in [yaml.ScalarToken, yaml.ScalarEvent, yaml.ScalarNode]:
+        print("%s: __dict__ %s" % (cls.__name__,
+            'yes' if hasattr(cls(*[None]*4), '__dict__') else 'no'))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,49 @@
+
+# Times the pure-Python parser (scanner + parser, no composition) over the
+# legacy test corpus and over a Sigma-rule-sized document.
+#
+#   PYTHONPATH=lib python tests/benchmarks/bench_parser.py [repeat]
+
+import os
+import sys
+import timeit
+
+import yaml
+
+from bench_memory import DOCUMENT
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'legacy_tests', 'data')
+
+def load_corpus():
+    corpus = []
+    for filename in sorted(os.listdir(DATA)):
+        if os.path.splitext(filename)[1] not in ['.data', '.canonical']:
+            continue
+        with open(os.path.join(DATA, filename), 'rb') as file:
+            data = file.read()
+        try:
+            list(yaml.parse(data, Loader=yaml.SafeLoader))
+        except yaml.YAMLError:
+            continue
+        corpus.append(data)
+    return corpus
+
+def parse_all(documents):
+    count = 0
+    for document in documents:
+        for event in yaml.parse(document, Loader=yaml.SafeLoader):
+            count += 1
+    return count
+
+def main(repeat=5):
+    corpus = load_corpus()
+    rules = [DOCUMENT]*200
+    for name, documents in [('corpus', corpus), ('rules', rules)]:
+        events = parse_all(documents)
+        best = min(timeit.repeat(lambda: parse_all(documents),
+                number=1, repeat=repeat))
+        print("%-8s %6d docs %8d events %8.3fs %10.0f events/s"
+                % (name, len(documents), events, best, events/best))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -27,6 +27,72 @@ def test_marks(marks_filename, verbose=False):
 
 test_marks.unittest = ['.marks']
 
+def test_mark_source_is_released(verbose=False):
+    data = 'a: b\nc: [1, 2\nd: e\n' + 'key: value\n'*1000
+    node = None
+    try:
+        yaml.safe_load(data)
+    except yaml.MarkedYAMLError as exc:
+        error = exc
+    node = yaml.compose('- '+'x'*1000+'\n', Loader=yaml.SafeLoader)
+    if verbose:
+        print(error)
+    for mark in [error.context_mark, error.problem_mark]:
+        assert len(mark.buffer) <= 2*75+1, len(mark.buffer)
+    assert str(error).endswith('    d: e\n     ^'), str(error)
+    assert node.start_mark.buffer is None, node.start_mark.buffer
+
+test_mark_source_is_released.unittest = True
+
+def test_error_keeps_node_marks(verbose=False):
+    data = 'title: rule\n' + 'key: value\n'*20 + 'detection: {[a]: b}\n'
+    loader = yaml.SafeLoader(data)
+    try:
+        node = loader.get_single_node()
+        marks = [(mark, mark.index, mark.pointer, mark.buffer)
+                for mark in [node.start_mark, node.end_mark, node.value[-1][1].start_mark]]
+        try:
+            loader.construct_document(node)
+        except yaml.MarkedYAMLError as exc:
+            error = exc
+        else:
+            raise AssertionError("expected an unhashable key error")
+        if verbose:
+            print(error)
+        for mark, index, pointer, buffer in marks:
+            assert mark.index == index == mark.pointer == pointer, (mark.index, mark.pointer)
+            assert mark.buffer is buffer and buffer.startswith(data), len(mark.buffer)
+        assert error.context_mark is not node.value[-1][1].start_mark
+        assert str(error).endswith('    detection: {[a]: b}\n                ^'), str(error)
+    finally:
+        loader.dispose()
+
+test_error_keeps_node_marks.unittest = True
+
+def test_marks_pickle_and_copy(verbose=False):
+    import copy, pickle
+    data = 'title: rule\ntags: [a, b]\n'
+    loader = yaml.SafeLoader(data)
+    try:
+        node = loader.get_single_node()
+    finally:
+        loader.dispose()
+    for clone in [pickle.loads(pickle.dumps(node)), copy.deepcopy(node)]:
+        mark = clone.value[1][1].start_mark
+        if verbose:
+            print(mark)
+        assert mark.buffer == data+'\0', mark.buffer
+        assert (mark.index, mark.line, mark.column) == (18, 1, 6), (mark.index, mark.line, mark.column)
+        assert mark.get_snippet() == node.value[1][1].start_mark.get_snippet()
+        # Marks of one document still share one source
+        assert clone.start_mark.source is mark.source
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL+1):
+        clone = pickle.loads(pickle.dumps(yaml.compose(data), protocol))
+        assert clone.value[0][0].value == 'title'
+        assert clone.start_mark.buffer is None
+
+test_marks_pickle_and_copy.unittest = True
+
 if __name__ == '__main__':
     import test_appliance
     test_appliance.run(globals())
@@ -0,0 +1,117 @@
+
+import yaml
+
+def _is_plain_mapping(node):
+    # Partial loading keeps the first occurrence of a key and does not
+    # resolve merge keys or aliases into skipped values.
+    if not isinstance(node, yaml.MappingNode):
+        return False
+    keys = [key.value for key, value in node.value]
+    return len(set(keys)) == len(keys) and '<<' not in keys
+
+def test_partial_loader(data_filename, verbose=False):
+    with open(data_filename, 'rb') as file:
+        data = file.read()
+    try:
+        native = yaml.safe_load(data)
+        events = list(yaml.parse(data, Loader=yaml.SafeLoader))
+        node = yaml.compose(data, Loader=yaml.SafeLoader)
+    except yaml.YAMLError:
+        return
+    if not isinstance(native, dict) or not _is_plain_mapping(node)  \
+            or any(isinstance(event, yaml.AliasEvent) for event in events):
+        return
+    keys = [key for key in native if isinstance(key, str)]
+    for index in range(len(keys)):
+        for wanted in [keys[index:index+1], keys[:index]+keys[index+1:]]:
+            for stream in [data, data.decode('utf-8')]:
+                partial = yaml.safe_load_keys(stream, wanted)
+                expected = dict((key, native[key]) for key in wanted)
+                if verbose:
+                    print(wanted)
+                    print(partial)
+                assert repr(partial) == repr(expected), (wanted, partial, expected)
+
+test_partial_loader.unittest = ['.data']
+
+RULE = """\
+title: Rule
+id: 1234
+references:
+    - https://example.com/a
+    - https://example.com/b
+logsource:
+    product: windows
+    definition: 'Sysmon'
+detection:   # skipped
+    selection:
+        Image|endswith:
+          - '\\\\a.exe'
+          - [unclosed
+    condition: selection
+falsepositives:
+- Unknown
+
+level: high
+"""
+
+def test_partial_loader_skips_values(verbose=False):
+    partial = yaml.safe_load_keys(RULE, ['title', 'logsource', 'level'])
+    if verbose:
+        print(partial)
+    assert partial == {'title': 'Rule', 'logsource': {'product': 'windows',
+            'definition': 'Sysmon'}, 'level': 'high'}, partial
+    try:
+        yaml.safe_load(RULE)
+    except yaml.YAMLError as exc:
+        if verbose:
+            print(exc)
+    else:
+        raise AssertionError("expected an exception")
+
+test_partial_loader_skips_values.unittest = True
+
+def test_partial_loader_stops_early(verbose=False):
+    data = "title: Rule\nid: 1234\n...\n--- [broken\n"
+    partial = yaml.safe_load_keys(data, ['id', 'title'])
+    if verbose:
+        print(partial)
+    assert partial == {'title': 'Rule', 'id': 1234}, partial
+    data = "a: 1 # one\nb: [1,\n 2]\nc: |\n  text\nd: 'x'\ne: x"
+    partial = yaml.safe_load_keys(data, ['b', 'd', 'e'])
+    assert partial == {'b': [1, 2], 'd': 'x', 'e': 'x'}, partial
+    assert yaml.safe_load_keys("- a\n- b\n", ['a']) == ['a', 'b']
+    assert yaml.safe_load_keys("", ['a']) is None
+
+test_partial_loader_stops_early.unittest = True
+
+def test_partial_loader_marks(verbose=False):
+    for data in [RULE, RULE.replace('\n', '\r\n'), RULE.encode('utf-8')]:
+        loader = yaml.SafeLoader(data)
+        try:
+            node = loader.get_partial_node(['level'])
+        finally:
+            loader.dispose()
+        key, value = node.value[0]
+        if verbose:
+            print(key.start_mark)
+        assert (key.start_mark.line, key.start_mark.column) == (17, 0), key.start_mark
+        assert (value.start_mark.line, value.start_mark.column) == (17, 7), value.start_mark
+
+test_partial_loader_marks.unittest = True
+
+def test_partial_loader_skipped_anchor(verbose=False):
+    data = "skipped: &anchor\n    a: 1\nwanted: *anchor\n"
+    try:
+        yaml.safe_load_keys(data, ['wanted'])
+    except yaml.composer.ComposerError as exc:
+        if verbose:
+            print(exc)
+    else:
+        raise AssertionError("expected an exception")
+
+test_partial_loader_skipped_anchor.unittest = True
+
+if __name__ == '__main__':
+    import test_appliance
+    test_appliance.run(globals())
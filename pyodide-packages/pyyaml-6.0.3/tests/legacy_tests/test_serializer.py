@@ -0,0 +1,82 @@
+
+import yaml
+import test_constructor
+
+def test_tree_serializer(code_filename, verbose=False):
+    test_constructor._make_objects()
+    with open(code_filename, 'rb') as file:
+        native = test_constructor._load_code(file.read())
+    class AnchorDumper(test_constructor.MyDumper):
+        # Never report a tree, so serialize() always takes the anchor
+        # tracking path for the reference output.
+        represented_tree = property(lambda self: None, lambda self, value: None)
+    output1 = yaml.dump(native, Dumper=AnchorDumper)
+    output2 = output3 = None
+    try:
+        if '&id' in output1:
+            # Not a tree; tree=True would drop the aliases.
+            return
+        output2 = yaml.dump(native, Dumper=test_constructor.MyDumper, tree=True)
+        assert output1 == output2, (output1, output2)
+        output3 = yaml.dump(native, Dumper=test_constructor.MyDumper)
+        assert output1 == output3, (output1, output3)
+    finally:
+        if verbose:
+            print("OUTPUT1:")
+            print(output1)
+            print("OUTPUT2:")
+            print(output2)
+            print("OUTPUT3:")
+            print(output3)
+
+test_tree_serializer.unittest = ['.code']
+
+def test_tree_serializer_anchor_path(verbose=False):
+    # The reference dumper of test_tree_serializer must not pick the tree path.
+    calls = []
+    class AnchorDumper(yaml.Dumper):
+        represented_tree = property(lambda self: None, lambda self, value: None)
+        def anchor_node(self, node):
+            calls.append(node)
+            return super().anchor_node(node)
+    yaml.dump({'a': [1, 2]}, Dumper=AnchorDumper)
+    assert calls, calls
+
+test_tree_serializer_anchor_path.unittest = True
+
+def test_tree_serializer_shared_nodes(verbose=False):
+    item = {'title': 'shared'}
+    output = yaml.safe_dump([item, item])
+    if verbose:
+        print(output)
+    assert '&id001' in output, output
+    assert '*id001' in output, output
+    value = yaml.safe_load(output)
+    assert value[0] is value[1], value
+
+test_tree_serializer_shared_nodes.unittest = True
+
+def test_tree_serializer_events(verbose=False):
+    data = {'title': 'rule', 'tags': ['a', 'b'], 'logsource': {'product': 'windows'}}
+    node = yaml.compose(yaml.safe_dump(data), Loader=yaml.SafeLoader)
+    events1 = []
+    events2 = []
+    for events, tree in [(events1, False), (events2, True)]:
+        dumper = yaml.SafeDumper(None, tree=tree)
+        dumper.emit = events.append
+        dumper.open()
+        dumper.serialize(node)
+        dumper.close()
+    if verbose:
+        print(events1)
+        print(events2)
+    assert len(events1) == len(events2), (events1, events2)
+    for event1, event2 in zip(events1, events2):
+        assert event1.__class__ == event2.__class__, (event1, event2)
+        assert getattr(event1, 'anchor', None) is None, event1
+
+test_tree_serializer_events.unittest = True
+
+if __name__ == '__main__':
+    import test_appliance
+    test_appliance.run(globals())
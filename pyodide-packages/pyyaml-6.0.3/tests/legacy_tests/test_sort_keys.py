@@ -25,6 +25,23 @@ def test_sort_keys(input_filename, sorted_filename, verbose=False):
 
 test_sort_keys.unittest = ['.sort', '.sorted']
 
+def test_sort_keys_cached_order(verbose=False):
+    records = [{'title': 'rule %d' % index, 'id': index, 'level': 'high'}
+            for index in range(3)]
+    records.append({'level': 'low', 'title': 'reordered', 'id': 3})
+    records.append({1: 'int', 'a': 'str'})
+    records.append({True: 'bool', 1.5: 'float'})
+    output = yaml.safe_dump(records, sort_keys=True)
+    if verbose:
+        print(output)
+    expected = [sorted(record.items()) for record in records[:4]]
+    loaded = yaml.safe_load(output)
+    assert [list(record.items()) for record in loaded[:4]] == expected, loaded
+    assert list(loaded[4]) == [1, 'a'], loaded[4]
+    assert list(loaded[5]) == [True, 1.5], loaded[5]
+
+test_sort_keys_cached_order.unittest = True
+
 if __name__ == '__main__':
     import test_appliance
     test_appliance.run(globals())
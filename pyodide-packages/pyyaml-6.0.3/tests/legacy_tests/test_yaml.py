@@ -13,6 +13,8 @@ from test_representer import *
 from test_recursive import *
 from test_input_output import *
 from test_sort_keys import *
+from test_serializer import *
+from test_partial_load import *
 from test_multi_constructor import *
 
 from test_schema import *
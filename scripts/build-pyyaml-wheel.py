@@ -0,0 +1,101 @@
+"""
+Rebuilds the PyYAML wheel the web worker installs from the vendored sources.
+
+public/wheels/pyyaml-6.0.3-cp313-cp313-pyodide_2025_0_wasm32.whl only holds
+pure Python modules, so it is rebuilt by replacing the yaml package in the
+wheel with pyodide-packages/pyyaml-6.0.3/lib/yaml and recomputing the
+RECORD. Run it after changing the vendored PyYAML:
+
+    python scripts/build-pyyaml-wheel.py
+
+With --check it only reports whether the wheel is up to date, which CI uses
+to catch changes that were not rebuilt. The native tools (sigma_bulk.py,
+sigma_server.py) import the PyYAML installed in their environment; install
+the vendored sources there with pip install ./pyodide-packages/pyyaml-6.0.3.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+import zipfile
+from typing import Dict, Optional, Sequence
+
+WHEEL_PATH = os.path.join("public", "wheels", "pyyaml-6.0.3-cp313-cp313-pyodide_2025_0_wasm32.whl")
+SOURCE_PATH = os.path.join("pyodide-packages", "pyyaml-6.0.3", "lib", "yaml")
+RECORD_PATH = "pyyaml-6.0.3.dist-info/RECORD"
+
+def _record_hash(content: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest()).rstrip(b"=").decode("ascii")
+    return f"sha256={digest}"
+
+def build_wheel(wheel: bytes, source_path: str) -> bytes:
+    """
+    Wheel with the yaml package replaced by the modules in source_path.
+
+    Args:
+        wheel: Content of the wheel to rebuild
+        source_path: Directory of the yaml package
+
+    Returns:
+        Content of the rebuilt wheel, byte-identical for the same input
+    """
+    with zipfile.ZipFile(io.BytesIO(wheel)) as original:
+        infos = [info for info in original.infolist() if info.filename != RECORD_PATH]
+        files: Dict[str, bytes] = {
+            info.filename: original.read(info.filename)
+            for info in infos
+            if not info.filename.startswith("yaml/")
+        }
+        # Timestamps of the original entries keep the output reproducible
+        date_time = original.getinfo(RECORD_PATH).date_time
+
+    modules = {
+        f"yaml/{name}": open(os.path.join(source_path, name), "rb").read()
+        for name in sorted(os.listdir(source_path))
+        if name.endswith(".py")
+    }
+    # Keep the order of the original wheel, the dist-info directory last
+    order = [info.filename for info in infos if not info.filename.startswith("yaml/")]
+    dist_info = [name for name in order if ".dist-info/" in name]
+    entries = [name for name in order if name not in dist_info] + list(modules) + dist_info
+    files.update(modules)
+
+    record = "".join(f"{name},{_record_hash(files[name])},{len(files[name])}\n" for name in entries)
+    record += f"{RECORD_PATH},,\n"
+    files[RECORD_PATH] = record.encode("utf-8")
+    entries.append(RECORD_PATH)
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as rebuilt:
+        for name in entries:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            rebuilt.writestr(info, files[name])
+    return output.getvalue()
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the Pyodide PyYAML wheel from the vendored sources.")
+    parser.add_argument("--wheel", default=WHEEL_PATH, help="Wheel to rebuild in place")
+    parser.add_argument("--source", default=SOURCE_PATH, help="Directory of the yaml package")
+    parser.add_argument("--check", action="store_true", help="Only check that the wheel is up to date")
+    args = parser.parse_args(argv)
+
+    with open(args.wheel, "rb") as f:
+        wheel = f.read()
+    rebuilt = build_wheel(wheel, args.source)
+    if rebuilt == wheel:
+        print(f"{args.wheel} is up to date")
+        return 0
+    if args.check:
+        print(f"{args.wheel} is out of date, run scripts/build-pyyaml-wheel.py", file=sys.stderr)
+        return 1
+    with open(args.wheel, "wb") as f:
+        f.write(rebuilt)
+    print(f"Rebuilt {args.wheel} from {args.source}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Downloads the wheelhouse the web worker installs pySigma from, and locks it.
+
+Resolves pySigma and the base pipelines, then each backend listed in
+src/types/SIEMs.ts together with them, downloads the wheels into public/wheels
+and writes its lock manifest with sigma_provisioning.py:
+
+    python scripts/build-wheelhouse.py
+    python scripts/build-wheelhouse.py pysigma-backend-extra
+
+The web worker installs one backend at a time, so backends are resolved
+separately: a backend that can't be installed with the pinned pySigma, or that
+needs other versions of shared dependencies, is left out of the wheelhouse and
+installed from the package index instead.
+
+pip resolves for CPython on Linux, but only pure Python wheels are kept.
+Dependencies without one, e.g. packages with compiled extensions that the
+Pyodide distribution provides, are listed as external in the lock. Other
+wheels in the wheelhouse are Pyodide builds, such as the PyYAML wheel of
+build-pyyaml-wheel.py, and are kept as they are; pure Python wheels are
+replaced on every run.
+
+Requires pip and packaging in the running Python environment, and network
+access. Without a lock the web worker installs from the package index.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "lib", "sigma", "python"))
+import sigma_provisioning  # noqa: E402
+from sigma_provisioning import ProvisioningError, normalize_name  # noqa: E402
+
+WHEELHOUSE_PATH = os.path.join("public", "wheels")
+SIEMS_PATH = os.path.join("src", "types", "SIEMs.ts")
+
+# Must match the version the web worker installs without a wheelhouse
+PYSIGMA_REQUIREMENT = "pysigma==1.3.2"
+
+# Platforms pip resolves for, compiled wheels only stand in for the Pyodide builds of a package
+PIP_PLATFORMS = ["any", "manylinux_2_28_x86_64", "manylinux_2_17_x86_64", "manylinux2014_x86_64"]
+
+def siem_backends(path: str) -> List[str]:
+    """
+    Backend packages of the supported SIEMs, in order and without duplicates.
+    Commented out SIEMs are skipped.
+    """
+    backends: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.lstrip().startswith("//"):
+                continue
+            for backend in re.findall(r'backend:\s*["\']([^"\']+)["\']', line):
+                if backend not in backends:
+                    backends.append(backend)
+    return backends
+
+def download_wheels(requirements: Sequence[str], directory: str) -> None:
+    """
+    Resolve requirements for the Pyodide Python version and download their wheels.
+    """
+    python_version = sigma_provisioning.PYODIDE_ENVIRONMENT["python_version"]
+    command = [
+        sys.executable, "-m", "pip", "download", "--quiet", "--only-binary=:all:",
+        "--python-version", python_version, "--implementation", "cp",
+        "--abi", "cp" + python_version.replace(".", ""), "--abi", "abi3", "--abi", "none",
+    ]
+    for platform in PIP_PLATFORMS:
+        command += ["--platform", platform]
+    result = subprocess.run([*command, "--dest", directory, *requirements], capture_output=True, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if line.startswith("ERROR:")]
+        raise ProvisioningError(errors[0] if errors else result.stderr.strip())
+
+def _is_pure(file: str) -> bool:
+    return file.endswith("-none-any.whl")
+
+def _wheel_names(directory: str) -> Dict[str, str]:
+    # Normalized package name -> wheel file
+    return {
+        normalize_name(sigma_provisioning.read_wheel_metadata(os.path.join(directory, file))["name"]): file
+        for file in sorted(os.listdir(directory))
+        if file.endswith(".whl")
+    }
+
+def build_wheelhouse(
+    base: Sequence[str],
+    backends: Sequence[str],
+    wheelhouse: str,
+    download: Callable[[Sequence[str], str], None] = download_wheels,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Download the base requirements and each backend with them into a wheelhouse and lock it.
+
+    Args:
+        base: Requirement strings installed before any backend
+        backends: Requirement strings of the backends, resolved one at a time
+        wheelhouse: Directory of the wheels and the lock manifest
+        download: Resolves requirements and downloads their wheels into a directory, see download_wheels()
+
+    Returns:
+        Lock manifest and the backends left out of the wheelhouse
+    """
+    resolved: Dict[str, str] = {}
+    skipped: List[str] = []
+    with tempfile.TemporaryDirectory() as staging:
+        for index, backend in enumerate([None, *backends]):
+            directory = os.path.join(staging, str(index))
+            os.makedirs(directory)
+            try:
+                download([*base, *([backend] if backend else [])], directory)
+            except ProvisioningError as e:
+                if backend is None:
+                    raise
+                print(f"Leaving out {backend}: {e}", file=sys.stderr)
+                skipped.append(backend)
+                continue
+            wheels = {name: os.path.join(directory, file) for name, file in _wheel_names(directory).items()}
+            conflicts = sorted(
+                name for name, path in wheels.items()
+                if name in resolved and os.path.basename(resolved[name]) != os.path.basename(path)
+            )
+            if conflicts:
+                print(f"Leaving out {backend}: needs other versions of {', '.join(conflicts)}", file=sys.stderr)
+                skipped.append(backend)
+                continue
+            resolved.update(wheels)
+
+        os.makedirs(wheelhouse, exist_ok=True)
+        existing = _wheel_names(wheelhouse)
+        for file in existing.values():
+            if _is_pure(file):
+                os.remove(os.path.join(wheelhouse, file))
+        pyodide_builds = {name for name, file in existing.items() if not _is_pure(file)}
+        for name, path in sorted(resolved.items()):
+            if _is_pure(path) and name not in pyodide_builds:
+                shutil.copy(path, wheelhouse)
+
+    lock = sigma_provisioning.build_lock(wheelhouse)
+    sigma_provisioning.write_lock(wheelhouse, lock)
+    return lock, skipped
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Download and lock the wheelhouse of the web worker.")
+    parser.add_argument("packages", nargs="*", help="Backends to provide besides those of the supported SIEMs")
+    parser.add_argument("--wheelhouse", default=WHEELHOUSE_PATH, help="Directory of the wheels and the lock")
+    parser.add_argument("--siems", default=SIEMS_PATH, help="SIEM list to read the backend packages from")
+    args = parser.parse_args(argv)
+
+    base = [PYSIGMA_REQUIREMENT] + [package for package in sigma_provisioning.BASE_PACKAGES if package != "pysigma"]
+    try:
+        lock, skipped = build_wheelhouse(base, siem_backends(args.siems) + args.packages, args.wheelhouse)
+    except (ProvisioningError, OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(lock['packages'])} wheels locked in {os.path.join(args.wheelhouse, sigma_provisioning.LOCK_NAME)}")
+    for name in lock["external"]:
+        print(f"External: {name}", file=sys.stderr)
+    for backend in skipped:
+        print(f"Installed from the package index: {backend}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
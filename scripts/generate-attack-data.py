@@ -0,0 +1,81 @@
+"""
+Generates the MITRE ATT&CK snapshot used by the converter in the browser.
+
+pySigma downloads the ATT&CK STIX bundle on first use, which doesn't work in
+Pyodide. This script parses the bundle with pySigma's own loader and writes
+the resulting ID to name tables as gzip-compressed JSON (a few hundred KB
+instead of the ~45 MB bundle), which the web worker passes to
+sigma_converter.set_mitre_attack_snapshot():
+
+    python scripts/generate-attack-data.py
+    python scripts/generate-attack-data.py --source enterprise-attack.json
+
+Requires pySigma in the running Python environment. The output is
+deterministic for a given bundle, so it only changes with the ATT&CK data.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Optional, Sequence
+
+from sigma.data import mitre_attack
+
+OUTPUT_PATH = os.path.join("public", "mitre-attack.json.gz")
+
+# Version of the snapshot layout, must match MITRE_ATTACK_SNAPSHOT_FORMAT in sigma_converter.py
+SNAPSHOT_FORMAT = 1
+
+def load_attack_data(source: str) -> Dict[str, Any]:
+    """
+    Parse an ATT&CK STIX bundle with pySigma.
+
+    Args:
+        source: URL or path of the STIX bundle
+
+    Returns:
+        Data as returned by sigma.data.mitre_attack._load_mitre_attack_data()
+    """
+    # Keep pySigma's download cache out of the user's cache directory
+    with tempfile.TemporaryDirectory() as cache_dir:
+        mitre_attack.set_cache_dir(cache_dir)
+        mitre_attack.set_url(source)
+        try:
+            return mitre_attack._load_mitre_attack_data()
+        finally:
+            mitre_attack._get_cache().close()
+
+def encode_snapshot(data: Dict[str, Any]) -> bytes:
+    """
+    Compressed snapshot of ATT&CK data.
+    """
+    snapshot = {"format": SNAPSHOT_FORMAT, **data}
+    text = json.dumps(snapshot, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    # No timestamp in the header, the same data gives the same file
+    return gzip.compress(text.encode("utf-8"), compresslevel=9, mtime=0)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the MITRE ATT&CK snapshot.")
+    parser.add_argument(
+        "--source",
+        default=mitre_attack.MITRE_ATTACK_ENTERPRISE_URL,
+        help="URL or path of the ATT&CK enterprise STIX bundle",
+    )
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="Snapshot file")
+    args = parser.parse_args(argv)
+
+    data = load_attack_data(args.source)
+    content = encode_snapshot(data)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(content)
+    print(
+        f"ATT&CK {data['mitre_attack_version']}: {len(data['mitre_attack_techniques'])} techniques, "
+        f"{len(data['mitre_attack_tactics'])} tactics, {len(content):,} bytes written to {args.output}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Generates the sigma-rules-index.json file from the .sigma-repo directory.
+
+Produces the same index as generate-sigma-index.ts, but only parses the
+top-level keys the index needs. The vendored PyYAML's partial loader skips
+the detection, references and other blocks of every rule without scanning
+them, which makes indexing the SigmaHQ repository several times faster than
+loading each rule in full:
+
+    python scripts/generate-sigma-index.py
+
+Rule files are parsed in a process pool. Index entries are cached per file,
+keyed by the git blob hash of unmodified files in a git checkout and by
+modification time and size otherwise, so that only changed rules are parsed
+again on the next run.
+
+Next to the JSON index a compact columnar sigma-rules-index.bin is written,
+which the search worker loads in preference to the JSON (see
+encode_columnar() for the layout).
+
+Values are resolved with PyYAML's YAML 1.1 rules, which only differ from
+js-yaml on values that never appear in the indexed fields of SigmaHQ rules.
+"""
+import argparse
+import array
+import datetime
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyodide-packages", "pyyaml-6.0.3", "lib"))
+import yaml  # noqa: E402
+
+REPO_PATH = ".sigma-repo"
+INDEX_PATH = os.path.join("public", "sigma-rules-index.json")
+CACHE_PATH = ".sigma-index-cache.json"
+INDEX_KEYS = ["id", "title", "description", "status", "author", "tags", "level", "logsource"]
+
+# Version of the cached index entries, bump when index_rule() changes
+CACHE_VERSION = 1
+
+# Below this number of files to parse, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+COLUMNAR_MAGIC = b"SGIX"
+COLUMNAR_VERSION = 1
+COLUMNAR_FIELDS = ["id", "title", "description", "status", "author", "level", "path"]
+# Value references with this bit set point to JSON text instead of a plain string
+COLUMNAR_JSON_VALUE = 0x80000000
+# Rule flags
+COLUMNAR_TAGS_VALUE = 1
+COLUMNAR_LOGSOURCE_VALUE = 2
+
+def _truthy(value: Any) -> bool:
+    # JavaScript truthiness, empty lists and objects are truthy
+    return isinstance(value, (list, dict)) or (bool(value) and value == value)
+
+def _or(value: Any, default: Any) -> Any:
+    return value if _truthy(value) else default
+
+def _json_default(value: Any) -> str:
+    # js-yaml loads timestamps as Date objects
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec="milliseconds") + "Z"
+    if isinstance(value, datetime.date):
+        return value.isoformat() + "T00:00:00.000Z"
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def index_rule(content: str, relative_path: str, full: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Index entry of a single rule.
+
+    Args:
+        content: Rule YAML
+        relative_path: Rule path relative to the repository
+        full: Load the whole rule instead of the indexed keys only
+
+    Returns:
+        Index entry, or None if the file is not a rule
+    """
+    data = yaml.safe_load(content) if full else yaml.safe_load_keys(content, INDEX_KEYS)
+    if not _truthy(data) or isinstance(data, list):
+        return None
+    if not isinstance(data, dict):
+        data = {}
+
+    logsource = data.get("logsource")
+    if isinstance(logsource, dict) and _truthy(logsource.get("definition")):
+        del logsource["definition"]
+
+    return {
+        "id": _or(data.get("id"), ""),
+        "title": _or(data.get("title"), ""),
+        "description": _or(data.get("description"), ""),
+        "status": _or(data.get("status"), ""),
+        "author": _or(data.get("author"), ""),
+        "tags": _or(data.get("tags"), []),
+        "level": _or(data.get("level"), ""),
+        "path": relative_path,
+        "logsource": _or(logsource, {}),
+    }
+
+def _git_blob_keys(repo_path: str) -> Dict[str, str]:
+    """
+    Cache keys of the rule files that are unmodified in a git checkout.
+
+    Returns:
+        Cache key by path relative to the repository, empty if the
+        repository is not a git checkout
+    """
+    def ls_files(*args: str) -> List[str]:
+        output = subprocess.run(
+            ["git", "-C", repo_path, "ls-files", "-z", *args, "--", "rules"],
+            check=True, capture_output=True,
+        ).stdout
+        return [entry for entry in os.fsdecode(output).split("\0") if entry]
+
+    try:
+        staged = ls_files("--stage")
+        modified = set(ls_files("--modified"))
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    keys = {}
+    for entry in staged:
+        # <mode> <blob> <stage>\t<path>
+        info, path = entry.split("\t", 1)
+        if path not in modified:
+            keys[os.path.normpath(path)] = "git:" + info.split()[1]
+    return keys
+
+def _rule_files(repo_path: str) -> List[Tuple[str, str, str]]:
+    """
+    Rule files below the rules directory of a Sigma repository.
+
+    Directories are walked in the same (name) order as Node's readdir.
+
+    Returns:
+        Path, path relative to the repository and cache key of every rule file
+    """
+    blob_keys = _git_blob_keys(repo_path)
+    files = []
+
+    def process_directory(dir_path: str):
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                process_directory(entry.path)
+            elif entry.is_file(follow_symlinks=False) and entry.name.endswith((".yml", ".yaml")):
+                relative_path = os.path.relpath(entry.path, repo_path)
+                key = blob_keys.get(relative_path)
+                if key is None:
+                    stat = entry.stat(follow_symlinks=False)
+                    key = f"stat:{stat.st_mtime_ns}:{stat.st_size}"
+                files.append((entry.path, relative_path, key))
+
+    process_directory(os.path.join(repo_path, "rules"))
+    return files
+
+def _index_file(path: str, relative_path: str, full: bool) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    # Runs in the worker processes
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        return index_rule(content, relative_path, full), None
+    except Exception as e:
+        return None, f"Error processing rule file {path}: {e}"
+
+def load_cache(cache_path: str) -> Dict[str, Any]:
+    """
+    Load the per-file index cache, an empty cache if it is missing or outdated.
+    """
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        cache = {"version": CACHE_VERSION, "files": {}}
+    return cache
+
+def save_cache(cache: Dict[str, Any], cache_path: str):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, cache_path)
+
+def index_rules(
+    repo_path: str,
+    full: bool = False,
+    max_workers: Optional[int] = None,
+    cache: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Index all rules below the rules directory of a Sigma repository.
+
+    Args:
+        repo_path: Sigma repository checkout
+        full: Load whole rules instead of the indexed keys only
+        max_workers: Number of worker processes (defaults to the CPU count)
+        cache: Per-file index cache from load_cache(), updated in place
+
+    Returns:
+        Index entries and the number of files that were parsed
+    """
+    files = _rule_files(repo_path)
+    cached = cache["files"] if cache is not None else {}
+    results: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+    todo = []
+    for path, relative_path, key in files:
+        hit = cached.get(relative_path)
+        if hit is not None and hit[0] == key:
+            results[relative_path] = (hit[1], None)
+        else:
+            todo.append((path, relative_path, key))
+
+    if todo:
+        paths, relative_paths, _ = zip(*todo)
+        workers = max_workers or os.cpu_count() or 1
+        executor = None
+        if workers == 1 or len(todo) < PARALLEL_THRESHOLD:
+            parsed = map(_index_file, paths, relative_paths, [full] * len(todo))
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            parsed = executor.map(
+                _index_file, paths, relative_paths, [full] * len(todo),
+                chunksize=max(1, len(todo) // (workers * 8)),
+            )
+        try:
+            for (_, relative_path, key), (rule, error) in zip(todo, parsed):
+                results[relative_path] = (rule, error)
+                if error is None:
+                    cached[relative_path] = [key, rule]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    if cache is not None:
+        cache["files"] = {relative_path: cached[relative_path] for _, relative_path, _ in files if relative_path in cached}
+
+    rules = []
+    for _, relative_path, _ in files:
+        rule, error = results[relative_path]
+        if error is not None:
+            print(error, file=sys.stderr)
+        elif rule is not None:
+            rules.append(rule)
+    return rules, len(todo)
+
+def encode_columnar(rules: List[Dict[str, Any]]) -> bytes:
+    """
+    Encode index entries in the compact columnar format.
+
+    All strings are interned in one string table. Values are referenced by
+    their index in the table; values that are not strings are stored as JSON
+    text and referenced with the COLUMNAR_JSON_VALUE bit set. All integers
+    are little-endian uint32, n is the number of rules:
+
+        magic "SGIX", version, n, string count, tag count, logsource pair count
+        string offsets        (string count + 1) byte offsets into the string data
+        one column per COLUMNAR_FIELDS entry, n value references each
+        rule flags            n
+        tag offsets           n + 1 offsets into the tag references
+        tag references        tag count
+        logsource offsets     n + 1 offsets into the logsource pairs
+        logsource pairs       logsource pair count key and value references
+        string data           UTF-8
+
+    Tags and logsource values of rules where they are not a list or mapping
+    are stored as a single value (with key reference 0 for the logsource),
+    marked by the COLUMNAR_TAGS_VALUE and COLUMNAR_LOGSOURCE_VALUE flags.
+
+    Returns:
+        Encoded index
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        ref = strings.get(value)
+        if ref is None:
+            ref = strings[value] = len(strings)
+        return ref
+
+    def value_ref(value: Any) -> int:
+        if isinstance(value, str):
+            return intern(value)
+        return intern(json.dumps(value, ensure_ascii=False, default=_json_default)) | COLUMNAR_JSON_VALUE
+
+    def key_ref(key: Any) -> int:
+        # Object keys are strings in JSON
+        return intern(key if isinstance(key, str) else json.dumps(key))
+
+    columns = [array.array("I") for _ in COLUMNAR_FIELDS]
+    flags = array.array("I")
+    tag_offsets = array.array("I", [0])
+    tags = array.array("I")
+    logsource_offsets = array.array("I", [0])
+    logsource = array.array("I")
+    for rule in rules:
+        for column, field in zip(columns, COLUMNAR_FIELDS):
+            column.append(value_ref(rule[field]))
+        rule_flags = 0
+        if isinstance(rule["tags"], list):
+            tags.extend(value_ref(tag) for tag in rule["tags"])
+        else:
+            rule_flags |= COLUMNAR_TAGS_VALUE
+            tags.append(value_ref(rule["tags"]))
+        if isinstance(rule["logsource"], dict):
+            for key, value in rule["logsource"].items():
+                logsource.extend((key_ref(key), value_ref(value)))
+        else:
+            rule_flags |= COLUMNAR_LOGSOURCE_VALUE
+            logsource.extend((0, value_ref(rule["logsource"])))
+        flags.append(rule_flags)
+        tag_offsets.append(len(tags))
+        logsource_offsets.append(len(logsource) // 2)
+
+    data = [value.encode("utf-8") for value in strings]
+    string_offsets = array.array("I", [0])
+    for value in data:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    tables = [string_offsets, *columns, flags, tag_offsets, tags, logsource_offsets, logsource]
+    if sys.byteorder == "big":
+        for table in tables:
+            table.byteswap()
+    header = COLUMNAR_MAGIC + struct.pack(
+        "<5I", COLUMNAR_VERSION, len(rules), len(strings), len(tags), len(logsource) // 2,
+    )
+    return b"".join([header, *(table.tobytes() for table in tables), *data])
+
+def _write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the Sigma rules index.")
+    parser.add_argument("--repo", default=REPO_PATH, help="Sigma repository checkout")
+    parser.add_argument("-o", "--output", default=INDEX_PATH, help="JSON index file")
+    parser.add_argument(
+        "--columnar-output",
+        help="Columnar index file (default: the JSON index file with a .bin extension)",
+    )
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--cache", default=CACHE_PATH, help="Per-file index cache")
+    parser.add_argument("--no-cache", action="store_true", help="Parse all rules, do not read or write the cache")
+    parser.add_argument("--full", action="store_true", help="Load whole rules (slower, for comparison)")
+    args = parser.parse_args(argv)
+
+    print("Generating Sigma rules index...")
+    start = time.perf_counter()
+    cache = None if args.no_cache else load_cache(args.cache)
+    index_data, parsed = index_rules(os.path.abspath(args.repo), args.full, args.workers, cache)
+    if cache is not None:
+        save_cache(cache, args.cache)
+    json_data = json.dumps(index_data, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+    columnar_data = encode_columnar(index_data)
+    elapsed = time.perf_counter() - start
+
+    _write(args.output, json_data)
+    _write(args.columnar_output or os.path.splitext(args.output)[0] + ".bin", columnar_data)
+    print(
+        f"Sigma rules index generated: {len(index_data)} rules ({parsed} parsed) in {elapsed:.2f}s, "
+        f"{len(json_data):,} B JSON, {len(columnar_data):,} B columnar"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,10 @@
 /**
  * Generates the sigma-rules-index.json file from the .sigma-repo directory.
- * Used in CI to pre-generate the index before running tests,
- * since the Vite plugin skips the clone/index step in CI.
+ * CI and the Vite plugin use the faster generate-sigma-index.py, which also
+ * writes the columnar index; this script is kept for setups without Python.
  */
 import path from "path";
-import { mkdir, writeFile, readdir, readFile } from "fs/promises";
+import { mkdir, writeFile, readdir, readFile, rm } from "fs/promises";
 import yaml from "js-yaml";
 
 const REPO_PATH = path.resolve(".sigma-repo");
@@ -66,4 +66,6 @@ const indexData = await indexRules(REPO_PATH);
 const indexPath = path.join("public", "sigma-rules-index.json");
 await mkdir(path.dirname(indexPath), { recursive: true });
 await writeFile(indexPath, JSON.stringify(indexData, null, 2), "utf-8");
+// The search worker prefers the columnar index of generate-sigma-index.py, drop a stale one
+await rm(path.join("public", "sigma-rules-index.bin"), { force: true });
 console.log(`Sigma rules index generated: ${indexData.length} rules`);
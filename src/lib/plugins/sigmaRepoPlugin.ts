@@ -1,8 +1,10 @@
 // Function to clone or update the Sigma repository at build time
 import path from "path";
 import simpleGit from "simple-git";
-import { mkdir, access, writeFile, readdir, readFile } from "fs/promises";
+import { mkdir, access, writeFile, readdir, readFile, rm } from "fs/promises";
 import { constants } from "fs";
+import { execFile } from "child_process";
+import { promisify } from "util";
 
 export default function sigmaRepoPlugin() {
     const REPO_URL = "https://github.com/SigmaHQ/sigma.git";
@@ -64,11 +66,18 @@ export default function sigmaRepoPlugin() {
                     console.log("Repository cloned successfully.");
                 }
 
-                // Generate an index file with metadata of all rules
-                const indexData = await indexRules(repoPath);
-                const indexPath = path.join("public", "sigma-rules-index.json");
-                await mkdir(path.dirname(indexPath), { recursive: true });
-                await writeFile(indexPath, JSON.stringify(indexData, null, 2), "utf-8");
+                // Generate an index file with metadata of all rules, along with the columnar index
+                try {
+                    await generateIndexWithPython(repoPath);
+                } catch (error) {
+                    console.warn("Python indexer unavailable, falling back to the JavaScript indexer:", error);
+                    const indexData = await indexRules(repoPath);
+                    const indexPath = path.join("public", "sigma-rules-index.json");
+                    await mkdir(path.dirname(indexPath), { recursive: true });
+                    await writeFile(indexPath, JSON.stringify(indexData, null, 2), "utf-8");
+                    // The search worker prefers the columnar index, drop a stale one
+                    await rm(path.join("public", "sigma-rules-index.bin"), { force: true });
+                }
                 console.log("Sigma rules index generated successfully.");
             } catch (error) {
                 console.error("Error in sigma-repo-plugin:", error);
@@ -77,6 +86,16 @@ export default function sigmaRepoPlugin() {
     };
 }
 
+// Function to generate the JSON and columnar indexes with scripts/generate-sigma-index.py
+async function generateIndexWithPython(repoPath: string) {
+    const { stdout } = await promisify(execFile)("python3", [
+        path.join("scripts", "generate-sigma-index.py"),
+        "--repo",
+        repoPath,
+    ]);
+    process.stdout.write(stdout);
+}
+
 // Function to index all Sigma rules and generate metadata
 async function indexRules(repoPath: string) {
     const rulesPath = path.join(repoPath, "rules");
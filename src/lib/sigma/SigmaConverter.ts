@@ -2,7 +2,9 @@ import type { SigmaConversionResult } from "./types";
 import { SIGMA_TARGETS } from "@/types/SIEMs";
 import {
     convert,
+    cancelConversion,
     installBackend,
+    preinstallBackends,
     getWorkerStatus,
     addStatusListener,
     type WorkerStatus,
@@ -95,6 +97,38 @@ export class SigmaConverter {
         };
     }
 
+    /**
+     * Install the backends of targets the workspace is known to use in the background
+     */
+    public preinstall(targets: string[]): void {
+        // Skip in SSR/SSG environment
+        if (typeof Worker === "undefined") {
+            return;
+        }
+
+        const missing = targets.filter(
+            (target) =>
+                SIGMA_TARGETS.has(target) && !this.currentStatus.installedBackends.includes(target),
+        );
+        if (missing.length) {
+            preinstallBackends(missing).catch((error) => {
+                console.error("Error preinstalling backends:", error);
+            });
+        }
+    }
+
+    /**
+     * Cancel the conversion currently running in the worker, e.g. when a newer one supersedes it.
+     * Returns false if cancellation is unavailable (the page is not cross-origin isolated).
+     */
+    public cancel(): boolean {
+        // Skip in SSR/SSG environment
+        if (typeof Worker === "undefined") {
+            return false;
+        }
+        return cancelConversion();
+    }
+
     /**
      * Convert a Sigma rule to a SIEM query
      */
@@ -107,6 +141,7 @@ export class SigmaConverter {
         format: string = "",
         correlationMethod: string = "",
         backendOptions: Record<string, any> = {},
+        timeBudget?: number,
     ): Promise<SigmaConversionResult> {
         // Skip conversion in SSR/SSG environment
         if (typeof Worker === "undefined") {
@@ -147,6 +182,7 @@ export class SigmaConverter {
                 format,
                 correlationMethod,
                 backendOptions,
+                timeBudget,
             };
 
             // Use JSON.parse(JSON.stringify()) to deeply clone and strip all proxies
@@ -154,6 +190,14 @@ export class SigmaConverter {
 
             const result = await convert(plainParams);
 
+            if (result.conversionStatus === "cancelled") {
+                return {
+                    query: "",
+                    error: result.error,
+                    cancelled: true,
+                };
+            }
+
             if (result.error) {
                 return {
                     query: "",
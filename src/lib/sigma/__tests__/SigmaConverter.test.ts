@@ -41,6 +41,7 @@ describe("SigmaConverter", () => {
             return statusListenerCleanup;
         });
         mockWorkerApi.installBackend.mockResolvedValue({ success: true });
+        mockWorkerApi.preinstallBackends.mockResolvedValue({ success: true });
         mockWorkerApi.convert.mockResolvedValue({ result: "converted query", error: null });
     });
 
@@ -309,6 +310,79 @@ describe("SigmaConverter", () => {
         });
     });
 
+    describe("Preinstall", () => {
+        it("should preinstall supported backends that are not installed yet", () => {
+            converter = new SigmaConverter();
+            mockStatusListener(mockReadyStatus);
+
+            converter.preinstall(["splunk", "elastic", "unknown"]);
+
+            expect(mockWorkerApi.preinstallBackends).toHaveBeenCalledWith(["elastic"]);
+        });
+
+        it("should not message the worker if all backends are installed", () => {
+            converter = new SigmaConverter();
+            mockStatusListener(mockReadyStatus);
+
+            converter.preinstall(["splunk"]);
+
+            expect(mockWorkerApi.preinstallBackends).not.toHaveBeenCalled();
+        });
+    });
+
+    describe("Cancellation", () => {
+        beforeEach(() => {
+            converter = new SigmaConverter();
+            mockStatusListener(mockReadyStatus);
+        });
+
+        it("should cancel the running conversion in the worker", () => {
+            mockWorkerApi.cancelConversion.mockReturnValue(true);
+
+            expect(converter.cancel()).toBe(true);
+            expect(mockWorkerApi.cancelConversion).toHaveBeenCalledTimes(1);
+        });
+
+        it("should pass the time budget to the worker", async () => {
+            await converter.convert("rule", "splunk", [], [], "", "", "", {}, 10);
+
+            expect(mockWorkerApi.convert).toHaveBeenCalledWith(
+                expect.objectContaining({ timeBudget: 10 }),
+            );
+        });
+
+        it("should flag cancelled conversions", async () => {
+            mockWorkerApi.convert.mockResolvedValue({
+                result: null,
+                error: "ConversionCancelled: Conversion cancelled.",
+                conversionStatus: "cancelled",
+            });
+
+            const result = await converter.convert("rule", "splunk");
+
+            expect(result).toEqual({
+                query: "",
+                error: "ConversionCancelled: Conversion cancelled.",
+                cancelled: true,
+            });
+        });
+
+        it("should report exceeded time budgets as errors", async () => {
+            mockWorkerApi.convert.mockResolvedValue({
+                result: null,
+                error: "ConversionBudgetExceeded: Conversion exceeded its time budget.",
+                conversionStatus: "budget_exceeded",
+            });
+
+            const result = await converter.convert("rule", "splunk");
+
+            expect(result).toEqual({
+                query: "",
+                error: "ConversionBudgetExceeded: Conversion exceeded its time budget.",
+            });
+        });
+    });
+
     describe("Dispose", () => {
         it("should clean up resources when disposed", () => {
             converter = new SigmaConverter();
@@ -0,0 +1,44 @@
+import { describe, it, expect } from "vitest";
+import {
+    createInterruptBuffer,
+    requestInterrupt,
+    beginInterruptible,
+    endInterruptible,
+} from "../worker/interrupt";
+
+describe("Conversion interrupts", () => {
+    it("does not signal while no conversion runs", () => {
+        const buffer = createInterruptBuffer();
+
+        requestInterrupt(buffer);
+
+        expect(buffer[0]).toBe(0);
+    });
+
+    it("signals the running conversion", () => {
+        const buffer = createInterruptBuffer();
+        beginInterruptible(buffer);
+
+        requestInterrupt(buffer);
+        expect(buffer[0]).toBe(2);
+
+        endInterruptible(buffer);
+        expect(buffer[0]).toBe(0);
+
+        // Later Python calls are not interrupted
+        requestInterrupt(buffer);
+        expect(buffer[0]).toBe(0);
+    });
+
+    it("drops a signal left from an earlier conversion", () => {
+        const buffer = createInterruptBuffer();
+        buffer[0] = 2;
+
+        beginInterruptible(buffer);
+        expect(buffer[0]).toBe(0);
+
+        endInterruptible(buffer);
+        requestInterrupt(buffer);
+        expect(buffer[0]).toBe(0);
+    });
+});
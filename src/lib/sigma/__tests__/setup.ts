@@ -16,11 +16,13 @@ export interface ConversionParams {
     format: string;
     correlationMethod: string;
     backendOptions: Record<string, any>;
+    timeBudget?: number;
 }
 
 export interface ConversionResult {
     result: string | null;
     error: string | null;
+    conversionStatus?: "cancelled" | "budget_exceeded";
 }
 
 export interface InstallResult {
@@ -31,7 +33,9 @@ export interface InstallResult {
 // Mock implementations
 export const mockWorkerApi = {
     convert: vi.fn<[ConversionParams], Promise<ConversionResult>>(),
+    cancelConversion: vi.fn<[], boolean>(),
     installBackend: vi.fn<[string], Promise<InstallResult>>(),
+    preinstallBackends: vi.fn<[string[]], Promise<InstallResult>>(),
     getWorkerStatus: vi.fn<[], Promise<WorkerStatus>>(),
     addStatusListener: vi.fn<[(status: WorkerStatus) => void], () => void>(),
 };
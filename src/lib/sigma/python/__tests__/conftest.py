@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# The converter modules are plain scripts next to this directory, not a package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
@@ -0,0 +1,152 @@
+import multiprocessing
+
+import pytest
+from sigma.exceptions import SigmaError
+
+import sigma_bulk
+import sigma_converter
+
+pytestmark = pytest.mark.skipif("splunk" not in sigma_converter.get_plugins().backends, reason="backend splunk is not installed")
+
+def make_rule(image):
+    return f"title: {image}\nlogsource:\n  product: windows\ndetection:\n  sel:\n    Image: {image}\n  condition: sel\n"
+
+BROKEN_RULE = "title: broken\nlogsource:\n  product: windows\ndetection:\n  condition: sel\n"
+
+@pytest.fixture(autouse=True)
+def reset_cancel_flag():
+    yield
+    sigma_converter.set_cancel_flag(None)
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_convert_rules_keeps_order_and_errors(max_workers):
+    rules = [make_rule(f"x{i}.exe") for i in range(9)]
+    rules.insert(4, BROKEN_RULE)
+    results = sigma_bulk.convert_rules(rules, "splunk", max_workers=max_workers, chunk_size=2)
+    assert len(results) == 10
+    assert "error" in results[4] and "status" not in results[4]
+    expected = [f"x{i}.exe" for i in range(9)]
+    assert [entry["result"] for entry in results[:4] + results[5:]] == [f'Image="{image}"' for image in expected]
+
+def test_convert_rules_raises_configuration_errors():
+    with pytest.raises(SigmaError):
+        sigma_bulk.convert_rules([make_rule("x.exe")], "nope")
+    with pytest.raises(SigmaError):
+        sigma_bulk.convert_rules([make_rule("x.exe")], "splunk", pipeline_names=["nope"])
+
+def test_init_worker_builds_the_backend_once():
+    sigma_bulk._init_worker("splunk", None, None, None, "default", None, None, False)
+    backend = sigma_bulk._worker_state["backend"]
+    assert sigma_bulk._convert_one(make_rule("a.exe")) == {"result": 'Image="a.exe"'}
+    assert sigma_bulk._convert_one(make_rule("b.exe")) == {"result": 'Image="b.exe"'}
+    assert sigma_bulk._worker_state["backend"] is backend
+    assert set(sigma_bulk._convert_one(BROKEN_RULE)) == {"error"}
+
+def test_convert_one_reports_cancellation_and_budget():
+    flag = multiprocessing.Array("i", 1)
+    sigma_bulk._init_worker("splunk", None, None, None, "default", None, None, False, None, flag)
+    flag[0] = 1
+    assert sigma_bulk._convert_one(make_rule("a.exe"))["status"] == "cancelled"
+    flag[0] = 0
+    assert "result" in sigma_bulk._convert_one(make_rule("a.exe"))
+
+    sigma_bulk._init_worker("splunk", None, None, None, "default", None, None, False, -1)
+    assert sigma_bulk._convert_one(make_rule("a.exe"))["status"] == "budget_exceeded"
+
+def test_main_mirrors_rule_paths(tmp_path):
+    for directory in ["a", "b/c"]:
+        (tmp_path / "rules" / directory).mkdir(parents=True)
+        (tmp_path / "rules" / directory / "rule.yml").write_text(make_rule(directory.replace("/", "_")), encoding="utf-8")
+    output = tmp_path / "out"
+    assert sigma_bulk.main(["splunk", str(tmp_path / "rules" / "a"), str(tmp_path / "rules" / "b"), "-j", "1", "-o", str(output)]) == 0
+    assert sorted(p.relative_to(output).as_posix() for p in output.rglob("*.txt")) == ["a/rule.txt", "b/c/rule.txt"]
+    assert 'Image="b_c"' in (output / "b" / "c" / "rule.txt").read_text(encoding="utf-8")
+
+    single = tmp_path / "single"
+    assert sigma_bulk.main(["splunk", str(tmp_path / "rules" / "a" / "rule.yml"), "-j", "1", "-o", str(single)]) == 0
+    assert [p.name for p in single.iterdir()] == ["rule.txt"]
+
+PIPELINE = """
+name: rename
+priority: 20
+transformations:
+  - type: field_name_mapping
+    mapping:
+      Image: {field}
+"""
+
+def test_convert_tree_is_incremental(tmp_path):
+    rules = tmp_path / "rules"
+    (rules / "sub").mkdir(parents=True)
+    (rules / "a.yml").write_text(make_rule("a.exe"), encoding="utf-8")
+    (rules / "sub" / "b.yml").write_text(make_rule("b.exe"), encoding="utf-8")
+    (rules / "broken.yml").write_text(BROKEN_RULE, encoding="utf-8")
+    output = tmp_path / "out"
+
+    summary = sigma_bulk.convert_tree(str(rules), str(output), "splunk", max_workers=1)
+    assert sorted(summary["converted"]) == ["a.yml", "broken.yml", "sub/b.yml"]
+    assert list(summary["errors"]) == ["broken.yml"]
+    manifest = sigma_bulk._load_manifest(output / sigma_bulk.MANIFEST_NAME)
+    assert manifest["target"] == "splunk"
+    assert manifest["rules"]["sub/b.yml"]["output"] == "sub/b.txt"
+    assert manifest["rules"]["broken.yml"]["output"] is None
+    assert (output / "sub" / "b.txt").read_text(encoding="utf-8") == 'Image="b.exe"'
+
+    # Nothing changed, failed rules keep their error
+    summary = sigma_bulk.convert_tree(str(rules), str(output), "splunk", max_workers=1)
+    assert summary["converted"] == []
+    assert sorted(summary["unchanged"]) == ["a.yml", "broken.yml", "sub/b.yml"]
+    assert list(summary["errors"]) == ["broken.yml"]
+
+    # Changed, deleted and lost outputs
+    (rules / "a.yml").write_text(make_rule("c.exe"), encoding="utf-8")
+    (rules / "sub" / "b.yml").unlink()
+    (rules / "broken.yml").unlink()
+    summary = sigma_bulk.convert_tree(str(rules), str(output), "splunk", max_workers=1)
+    assert summary["converted"] == ["a.yml"]
+    assert sorted(summary["removed"]) == ["broken.yml", "sub/b.yml"]
+    assert not (output / "sub").exists()
+    assert (output / "a.txt").read_text(encoding="utf-8") == 'Image="c.exe"'
+    (output / "a.txt").unlink()
+    assert sigma_bulk.convert_tree(str(rules), str(output), "splunk", max_workers=1)["converted"] == ["a.yml"]
+
+    # A different configuration converts everything again
+    summary = sigma_bulk.convert_tree(str(rules), str(output), "splunk", format="default", skip_unsupported=True, max_workers=1)
+    assert summary["converted"] == ["a.yml"]
+
+def test_convert_tree_tracks_pipeline_files(tmp_path):
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "a.yml").write_text(make_rule("a.exe"), encoding="utf-8")
+    pipeline = tmp_path / "pipeline.yml"
+    pipeline.write_text(PIPELINE.format(field="first"), encoding="utf-8")
+    output = tmp_path / "out"
+
+    def convert():
+        return sigma_bulk.convert_tree(str(rules), str(output), "splunk", pipeline_names=[str(pipeline)], max_workers=1)
+
+    assert convert()["converted"] == ["a.yml"]
+    assert (output / "a.txt").read_text(encoding="utf-8") == 'first="a.exe"'
+    assert convert()["converted"] == []
+    pipeline.write_text(PIPELINE.format(field="second"), encoding="utf-8")
+    assert convert()["converted"] == ["a.yml"]
+    assert (output / "a.txt").read_text(encoding="utf-8") == 'second="a.exe"'
+
+def test_backend_version_is_shared_with_the_persistent_cache(tmp_path, monkeypatch):
+    backend_module = sigma_converter.get_plugins().backends["splunk"].__module__
+    distribution = sigma_converter.module_distribution(backend_module)
+    assert distribution.lower().startswith("pysigma-backend-splunk==")
+    assert distribution in sigma_converter._package_versions("splunk")
+
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "a.yml").write_text(make_rule("a.exe"), encoding="utf-8")
+    sigma_bulk.convert_tree(str(rules), str(tmp_path / "out"), "splunk", max_workers=1)
+    manifest = sigma_bulk._load_manifest(tmp_path / "out" / sigma_bulk.MANIFEST_NAME)
+    assert manifest["backend"] == distribution.split("==")[0]
+
+    # Another backend version changes the fingerprint of the bulk conversion
+    fingerprint = sigma_bulk.conversion_fingerprint("splunk")
+    monkeypatch.setitem(sigma_converter._distribution_versions, backend_module.replace(".", "/"), "pySigma-backend-splunk==0")
+    assert sigma_converter.module_distribution(backend_module) == "pySigma-backend-splunk==0"
+    assert sigma_bulk.conversion_fingerprint("splunk") != fingerprint
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from sigma.exceptions import SigmaError
+
+import sigma_converter
+from sigma_converter import ConversionBudgetExceeded, ConversionCancelled, check_cancelled
+
+RULES = "\n---\n".join(
+    f"title: r{i}\nlogsource:\n  product: windows\ndetection:\n  sel:\n    Image: x{i}.exe\n  condition: sel\n"
+    for i in range(5)
+)
+
+class CountdownFlag:
+    """Flag that is set once it has been read the given number of times."""
+
+    def __init__(self, reads):
+        self.reads = reads
+
+    def __getitem__(self, index):
+        self.reads -= 1
+        return 1 if self.reads < 0 else 0
+
+@pytest.fixture(autouse=True)
+def reset_cancel_flag():
+    sigma_converter._conversion_cache.clear()
+    yield
+    sigma_converter.set_cancel_flag(None)
+    sigma_converter._conversion_cache.clear()
+
+def test_check_cancelled():
+    check_cancelled()
+    check_cancelled(time.monotonic() + 60)
+    with pytest.raises(ConversionBudgetExceeded):
+        check_cancelled(time.monotonic() - 1)
+
+    flag = [0]
+    sigma_converter.set_cancel_flag(flag)
+    check_cancelled()
+    flag[0] = 2
+    with pytest.raises(ConversionCancelled):
+        check_cancelled(time.monotonic() - 1)
+    sigma_converter.set_cancel_flag(None)
+    check_cancelled()
+
+def test_errors_are_sigma_errors_with_a_status():
+    assert issubclass(ConversionCancelled, SigmaError) and ConversionCancelled.status == "cancelled"
+    assert issubclass(ConversionBudgetExceeded, SigmaError) and ConversionBudgetExceeded.status == "budget_exceeded"
+
+def test_convert_rule_is_cancelled_between_rules():
+    if "splunk" not in sigma_converter.get_plugins().backends:
+        pytest.skip("backend splunk is not installed")
+    flag = CountdownFlag(6)
+    sigma_converter.set_cancel_flag(flag)
+    with pytest.raises(ConversionCancelled):
+        sigma_converter.convert_rule(RULES, "splunk")
+    # Three phase checks passed, cancelled by a check between the rules
+    assert flag.reads < 0
+
+    sigma_converter.set_cancel_flag([0])
+    assert sigma_converter.convert_rule(RULES, "splunk").count("Image=") == 5
+
+def test_convert_rule_time_budget():
+    if "splunk" not in sigma_converter.get_plugins().backends:
+        pytest.skip("backend splunk is not installed")
+    with pytest.raises(ConversionBudgetExceeded):
+        sigma_converter.convert_rule(RULES, "splunk", time_budget=-1)
+    # Failed conversions are not cached
+    assert sigma_converter.convert_rule(RULES, "splunk", time_budget=60).count("Image=") == 5
+
+def test_interrupt_is_reported_as_cancellation():
+    with pytest.raises(KeyboardInterrupt):
+        with sigma_converter._interrupt_as_cancellation():
+            raise KeyboardInterrupt
+    sigma_converter.set_cancel_flag([2])
+    with pytest.raises(ConversionCancelled):
+        with sigma_converter._interrupt_as_cancellation():
+            raise KeyboardInterrupt
+
+def test_interrupt_while_fingerprinting_is_reported_as_cancellation(monkeypatch):
+    def interrupted(*args):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(sigma_converter, "_rule_fingerprint", interrupted)
+    sigma_converter.set_cancel_flag([2])
+    with pytest.raises(ConversionCancelled):
+        sigma_converter.convert_rule(RULES, "splunk")
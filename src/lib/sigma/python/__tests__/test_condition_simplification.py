@@ -0,0 +1,191 @@
+import itertools
+import random
+
+import pytest
+from sigma.collection import SigmaCollection
+from sigma.conditions import (
+    ConditionAND,
+    ConditionFieldEqualsValueExpression,
+    ConditionItem,
+    ConditionNOT,
+    ConditionOR,
+    ConditionValueExpression,
+)
+from sigma.types import SigmaString
+
+import sigma_converter
+from sigma_converter import simplify_condition
+
+def leaves_of(cond):
+    if isinstance(cond, ConditionItem):
+        for arg in cond.args:
+            yield from leaves_of(arg)
+    else:
+        yield cond
+
+def leaf_key(leaf):
+    return sigma_converter._condition_key(leaf, {})
+
+def evaluate(cond, assignment):
+    """Evaluate a condition tree with leaf match results taken from assignment."""
+    if isinstance(cond, ConditionAND):
+        return all(evaluate(arg, assignment) for arg in cond.args)
+    if isinstance(cond, ConditionOR):
+        return any(evaluate(arg, assignment) for arg in cond.args)
+    if isinstance(cond, ConditionNOT):
+        return not evaluate(cond.args[0], assignment)
+    return assignment[leaf_key(cond)]
+
+def assert_equivalent(before, after):
+    """Compare the match results of both trees for every combination of leaf matches."""
+    keys = sorted({leaf_key(leaf) for leaf in leaves_of(before)}, key=repr)
+    assert {leaf_key(leaf) for leaf in leaves_of(after)} <= set(keys)
+    for values in itertools.product((False, True), repeat=len(keys)):
+        assignment = dict(zip(keys, values))
+        assert evaluate(before, assignment) == evaluate(after, assignment), assignment
+
+def truth_table(cond, columns, mask):
+    """
+    Match results of a condition tree for all combinations of leaf matches at
+    once, as an integer with one bit per combination.
+    """
+    if isinstance(cond, ConditionAND):
+        result = mask
+        for arg in cond.args:
+            result &= truth_table(arg, columns, mask)
+        return result
+    if isinstance(cond, ConditionOR):
+        result = 0
+        for arg in cond.args:
+            result |= truth_table(arg, columns, mask)
+        return result
+    if isinstance(cond, ConditionNOT):
+        return ~truth_table(cond.args[0], columns, mask) & mask
+    return columns[leaf_key(cond)]
+
+def assert_truth_tables_equal(before, after, message=None):
+    """assert_equivalent() for larger trees."""
+    keys = sorted({leaf_key(leaf) for leaf in leaves_of(before)}, key=repr)
+    assert {leaf_key(leaf) for leaf in leaves_of(after)} <= set(keys)
+    rows = 1 << len(keys)
+    mask = (1 << rows) - 1
+    # Column i is set in the rows whose bit i is set
+    columns = {
+        key: sum(1 << row for row in range(rows) if row >> i & 1)
+        for i, key in enumerate(keys)
+    }
+    assert truth_table(before, columns, mask) == truth_table(after, columns, mask), message
+
+def assert_parents(cond, parent=None):
+    assert cond.parent is parent
+    if isinstance(cond, ConditionItem):
+        for arg in cond.args:
+            assert_parents(arg, cond)
+
+def field(name, value):
+    return ConditionFieldEqualsValueExpression(name, SigmaString(value))
+
+def random_tree(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        if rng.random() < 0.1:
+            return ConditionValueExpression(SigmaString(rng.choice("xy")))
+        return field(rng.choice("ABC"), rng.choice("123"))
+    kind = rng.choice((ConditionAND, ConditionOR, ConditionOR, ConditionNOT))
+    if kind is ConditionNOT:
+        return ConditionNOT([random_tree(rng, depth - 1)])
+    return kind([random_tree(rng, depth - 1) for _ in range(rng.randint(2, 4))])
+
+@pytest.mark.parametrize("chunk", range(10))
+def test_random_trees_equivalent(chunk):
+    # The simplifier creates and drops many nodes per tree, this catches keys of
+    # freed nodes being found again for new nodes that reuse their ids
+    for seed in range(chunk * 1000, (chunk + 1) * 1000):
+        rng = random.Random(seed)
+        before = random_tree(rng, rng.choice((3, 4, 5)))
+        after = simplify_condition(before)
+        assert_truth_tables_equal(before, after, f"seed {seed}")
+        assert_parents(after)
+
+def test_flatten_and_merge_in_list():
+    a1, a2, a3 = field("A", "1"), field("A", "2"), field("A", "3")
+    after = simplify_condition(ConditionOR([ConditionOR([a1, a2]), ConditionOR([a3, field("B", "1")])]))
+    assert isinstance(after, ConditionOR) and len(after.args) == 2
+    in_list, other = after.args
+    assert isinstance(in_list, ConditionOR)
+    assert [arg.value for arg in in_list.args] == [a1.value, a2.value, a3.value]
+    assert other.field == "B"
+
+def test_duplicates_removed():
+    after = simplify_condition(ConditionAND([field("A", "1"), field("A", "1"), field("B", "1")]))
+    assert [(arg.field, str(arg.value)) for arg in after.args] == [("A", "1"), ("B", "1")]
+
+def test_absorption():
+    a = field("A", "1")
+    after = simplify_condition(ConditionAND([a, ConditionOR([field("A", "1"), field("B", "1")])]))
+    assert isinstance(after, ConditionFieldEqualsValueExpression) and after.field == "A"
+
+def test_common_factor_hoisted():
+    before = ConditionOR([
+        ConditionAND([field("E", "1"), field("A", "1")]),
+        ConditionAND([field("E", "1"), field("B", "1")]),
+    ])
+    after = simplify_condition(before)
+    assert isinstance(after, ConditionAND)
+    assert after.args[0].field == "E"
+    assert isinstance(after.args[1], ConditionOR)
+    assert_equivalent(before, after)
+
+def test_double_negation():
+    after = simplify_condition(ConditionNOT([ConditionNOT([ConditionNOT([field("A", "1")])])]))
+    assert isinstance(after, ConditionNOT)
+    assert isinstance(after.args[0], ConditionFieldEqualsValueExpression)
+    assert after.args[0].parent is after
+
+RULES = [
+    """
+title: selectors
+logsource: {product: windows, category: process_creation}
+detection:
+  sel_1: {EventID: 1, Image|endswith: [a.exe, b.exe]}
+  sel_2: {EventID: 1, Image|endswith: c.exe}
+  sel_3: {EventID: 1, CommandLine|contains|all: [x, y]}
+  filter: {User: [SYSTEM, LOCAL SERVICE]}
+  condition: 1 of sel_* and not not not filter
+""",
+    """
+title: repeated
+logsource: {product: windows, category: process_creation}
+detection:
+  a: {Image|endswith: powershell.exe}
+  b: {CommandLine|contains: [-enc, bypass]}
+  keywords: [mimikatz, sekurlsa]
+  condition: a and (a or b) or (keywords and a) or all of them
+""",
+    """
+title: nested
+logsource: {product: windows, category: process_creation}
+detection:
+  a: {A: 1}
+  b: {B: 2}
+  c: {C: [3, 4]}
+  condition: (a and b) or (a and c) or not (not a and not (b or c))
+""",
+]
+
+@pytest.mark.parametrize("rule_yaml", RULES)
+def test_rule_conditions_equivalent(rule_yaml):
+    rule = SigmaCollection.from_yaml(rule_yaml).rules[0]
+    for condition in rule.detection.parsed_condition:
+        before = condition.parsed
+        after = simplify_condition(condition.parsed)
+        assert_equivalent(before, after)
+        assert_parents(after)
+
+@pytest.mark.parametrize("rule_yaml", RULES)
+def test_simplified_rule_conversion(rule_yaml):
+    pytest.importorskip("sigma.backends.splunk")
+    collection = SigmaCollection.from_yaml(rule_yaml)
+    sigma_converter.simplify_rule_conditions(collection)
+    condition = collection.rules[0].detection.parsed_condition[0]
+    assert isinstance(condition, sigma_converter.SimplifiedSigmaCondition)
+    assert sigma_converter.convert_rule(rule_yaml, "splunk", simplify_conditions=True)
@@ -0,0 +1,136 @@
+import pytest
+import yaml
+
+import sigma_converter
+
+pytestmark = pytest.mark.skipif("splunk" not in sigma_converter.get_plugins().backends, reason="backend splunk is not installed")
+
+RULE = """
+title: {title}
+description: {title}
+tags:
+  - {tag}
+logsource:
+  product: windows
+detection:
+  sel:
+    Image: x.exe
+  condition: sel
+"""
+
+TAG_PIPELINE = """
+name: tagged
+priority: 20
+transformations:
+  - type: field_name_mapping
+    mapping:
+      Image: tagged
+    rule_conditions:
+      - type: tag
+        tag: attack.execution
+"""
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    sigma_converter._conversion_cache.clear()
+    sigma_converter._parsed_rule_cache.clear()
+    sigma_converter._pipeline_rule_keys.clear()
+    yield
+    sigma_converter._conversion_cache.clear()
+    sigma_converter._parsed_rule_cache.clear()
+    sigma_converter._pipeline_rule_keys.clear()
+
+@pytest.fixture
+def conversions(monkeypatch):
+    calls = []
+    convert_collection = sigma_converter.convert_collection
+
+    def counting_convert_collection(*args, **kwargs):
+        calls.append(args)
+        return convert_collection(*args, **kwargs)
+
+    monkeypatch.setattr(sigma_converter, "convert_collection", counting_convert_collection)
+    return calls
+
+def test_descriptive_edits_are_served_from_the_cache(conversions):
+    first = sigma_converter.convert_rule(RULE.format(title="one", tag="attack.t1059"), "splunk")
+    second = sigma_converter.convert_rule(RULE.format(title="two", tag="attack.t1003"), "splunk")
+    assert first == second == 'Image="x.exe"'
+    assert len(conversions) == 1
+
+    # Formats that embed rule metadata depend on the title
+    first = sigma_converter.convert_rule(RULE.format(title="one", tag="attack.t1059"), "splunk", format="savedsearches")
+    second = sigma_converter.convert_rule(RULE.format(title="two", tag="attack.t1059"), "splunk", format="savedsearches")
+    assert len(conversions) == 3
+    assert "[one]" in first and "[two]" in second
+
+def test_tag_conditions_keep_tags_in_the_fingerprint(conversions):
+    def convert(tag):
+        return sigma_converter.convert_rule(RULE.format(title="t", tag=tag), "splunk", pipeline_ymls=[TAG_PIPELINE])
+
+    assert convert("attack.execution") == 'tagged="x.exe"'
+    assert convert("attack.t1059") == 'Image="x.exe"'
+    assert len(conversions) == 2
+    # Titles are still not read by the pipeline
+    assert sigma_converter.convert_rule(RULE.format(title="u", tag="attack.t1059"), "splunk", pipeline_ymls=[TAG_PIPELINE]) == 'Image="x.exe"'
+    assert len(conversions) == 2
+
+def test_cache_miss_parses_and_builds_once(monkeypatch):
+    parses = []
+    builds = []
+    load_all = yaml.load_all
+    safe_load_all = yaml.safe_load_all
+    build = sigma_converter._build_processing_pipeline
+    monkeypatch.setattr(yaml, "load_all", lambda *args, **kwargs: parses.append(args) or load_all(*args, **kwargs))
+    monkeypatch.setattr(yaml, "safe_load_all", lambda *args, **kwargs: parses.append(args) or safe_load_all(*args, **kwargs))
+    monkeypatch.setattr(sigma_converter, "_build_processing_pipeline", lambda *args: builds.append(args) or build(*args))
+
+    result = sigma_converter.convert_rule(RULE.format(title="t", tag="attack.t1059"), "splunk", pipeline_ymls=[TAG_PIPELINE])
+    assert result == 'Image="x.exe"'
+    assert len(parses) == 1
+    assert len(builds) == 1
+
+def test_pipeline_rule_keys_are_bounded():
+    for i in range(sigma_converter.PIPELINE_RULE_KEYS_CACHE_SIZE + 5):
+        pipeline = TAG_PIPELINE.replace("name: tagged", f"name: tagged{i}")
+        sigma_converter.rule_fingerprint(RULE.format(title="t", tag="attack.t1059"), "splunk", pipeline_ymls=[pipeline])
+    assert len(sigma_converter._pipeline_rule_keys) == sigma_converter.PIPELINE_RULE_KEYS_CACHE_SIZE
+    assert not any("tagged0\\n" in key for key in sigma_converter._pipeline_rule_keys)
+
+def detection_fields(rule_collection):
+    return [item.field for item in rule_collection.rules[0].detection.detections["sel"].detection_items]
+
+def test_parsed_rules_are_isolated_clones():
+    rule_yaml = RULE.format(title="t", tag="attack.execution")
+    first = sigma_converter.load_rule_collection(rule_yaml)
+    pipeline = sigma_converter.build_processing_pipeline(pipeline_ymls=[TAG_PIPELINE])
+    backend = sigma_converter.create_backend("splunk", pipeline)
+    assert sigma_converter.convert_collection(backend, first) == 'tagged="x.exe"'
+    # The pipeline changed the first clone only
+    assert detection_fields(first) == ["tagged"]
+    second = sigma_converter.load_rule_collection(rule_yaml)
+    assert second is not first and second.rules[0] is not first.rules[0]
+    assert detection_fields(second) == ["Image"]
+    second.rules[0].title = "changed"
+    assert sigma_converter.load_rule_collection(rule_yaml).rules[0].title == "t"
+    assert sigma_converter.convert_rule(rule_yaml, "splunk") == 'Image="x.exe"'
+
+def test_parsed_rule_cache_evicts_least_recently_used():
+    size = sigma_converter.PARSED_RULE_CACHE_SIZE
+    rules = [RULE.format(title=f"t{i}", tag="attack.execution") for i in range(size + 1)]
+    for rule_yaml in rules[:size]:
+        sigma_converter.load_rule_collection(rule_yaml)
+    # Touch the oldest entry, the second oldest is evicted instead
+    sigma_converter.load_rule_collection(rules[0])
+    sigma_converter.load_rule_collection(rules[size])
+    assert len(sigma_converter._parsed_rule_cache) == size
+    assert (rules[0], None) in sigma_converter._parsed_rule_cache
+    assert (rules[1], None) not in sigma_converter._parsed_rule_cache
+    assert sigma_converter.load_rule_collection(rules[1]).rules[0].title == "t1"
+
+def test_mixed_key_types_are_converted_without_caching(conversions):
+    rule_yaml = RULE.format(title="t", tag="attack.t1059") + "custom:\n  1: a\n  b: c\n"
+    assert sigma_converter.rule_fingerprint(rule_yaml, "splunk") is None
+    assert sigma_converter.convert_rule(rule_yaml, "splunk") == 'Image="x.exe"'
+    assert sigma_converter.convert_rule(rule_yaml, "splunk") == 'Image="x.exe"'
+    assert len(conversions) == 2
@@ -0,0 +1,202 @@
+import json
+import re
+
+import pytest
+import yaml
+from sigma.collection import SigmaCollection
+
+import sigma_evaluation
+from sigma_evaluation import EventBatch, compile_rule, compile_rules, evaluate_rules, read_events
+
+RULE = """
+title: Evaluation test
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection_img:
+    Image|endswith:
+      - '\\cmd.exe'
+      - '\\powershell.exe'
+  selection_cli:
+    CommandLine|contains|all:
+      - ' /c '
+      - 'who*mi'
+  selection_user:
+    User|re|i: '^admin'
+  filter_parent:
+    ParentImage|startswith: 'C:\\Windows\\explorer'
+  filter_null:
+    Hostname: null
+  condition: selection_img and (selection_cli or selection_user) and not 1 of filter_*
+"""
+
+EVENTS = [
+    {"Image": "C:\\Windows\\System32\\cmd.exe", "CommandLine": "cmd /c whoami", "Hostname": "a"},
+    {"Image": "C:\\Windows\\System32\\CMD.EXE", "CommandLine": "cmd /C WHOAMI /all", "Hostname": "a"},
+    {"Image": "C:\\Windows\\System32\\cmd.exe", "CommandLine": "cmd /c whoami"},
+    {"Image": "C:\\Windows\\System32\\cmd.exe", "CommandLine": "cmd /c whoami", "Hostname": "a",
+     "ParentImage": "C:\\Windows\\Explorer.exe"},
+    {"Image": "C:\\Windows\\powershell.exe", "User": "Administrator", "Hostname": "a"},
+    {"Image": "C:\\Windows\\powershell.exe", "User": "user", "Hostname": "a"},
+    {"Image": "C:\\Windows\\notepad.exe", "CommandLine": "cmd /c whoami", "Hostname": "a"},
+    {"Image": ["C:\\x.exe", "C:\\Windows\\cmd.exe"], "CommandLine": "x /c whoiamnotmi", "Hostname": "a"},
+]
+
+def plan(rule_yaml=RULE):
+    return compile_rule(SigmaCollection.from_yaml(rule_yaml).rules[0])
+
+def rows_by_row(node, events):
+    # Reference result testing every row on its own
+    padded = EventBatch(events + [{}] * 100)
+    return [row for row in range(len(events)) if node.evaluate(padded, {row})]
+
+def nodes(node):
+    yield node
+    for child in getattr(node, "children", []):
+        yield from nodes(child)
+    if hasattr(node, "child"):
+        yield from nodes(node.child)
+
+def test_rule_semantics():
+    assert plan().evaluate(EventBatch(EVENTS)) == [0, 1, 4, 7]
+
+@pytest.mark.parametrize("repeat", [1, 50])
+def test_scans_match_row_tests(repeat):
+    events = EVENTS * repeat
+    compiled = plan()
+    # Evaluate twice so the second run uses the observed selectivities
+    assert compiled.evaluate(EventBatch(events)) == compiled.evaluate(EventBatch(events))
+    assert compiled.evaluate(EventBatch(events)) == rows_by_row(plan().root, events)
+
+def test_distinct_value_columns():
+    events = [{"Image": f"C:\\bin\\{i % 3}.exe", "CommandLine": f"tool {i}"} for i in range(90)]
+    batch = EventBatch(events)
+    assert batch.column("Image").groups() is not None
+    assert batch.column("CommandLine").groups() is None
+    rule = """
+title: Distinct values
+logsource:
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\1.exe'
+    CommandLine|endswith: '0'
+  condition: selection
+"""
+    assert plan(rule).evaluate(batch) == [i for i in range(90) if i % 3 == 1 and i % 10 == 0]
+
+def test_keywords_and_modifiers():
+    rule = """
+title: Keywords
+logsource:
+  product: linux
+detection:
+  keywords:
+    - 'evil'
+  selection:
+    Port|gte: 1024
+    Source|cidr: 10.0.0.0/8
+    Tag|exists: false
+  same:
+    User|fieldref: Owner
+  condition: keywords or selection or same
+"""
+    events = [
+        {"Message": "nothing to see"},
+        {"Message": {"Nested": ["very EVIL"]}},
+        {"Port": "8080", "Source": "10.1.2.3"},
+        {"Port": 8080, "Source": "10.1.2.3", "Tag": None},
+        {"Port": 80, "Source": "10.1.2.3"},
+        {"User": "root", "Owner": "root"},
+        {"User": "root", "Owner": "bin"},
+    ]
+    assert plan(rule).evaluate(EventBatch(events)) == [1, 2, 5]
+
+def test_compile_rules_reports_errors():
+    correlation = """
+title: Correlation
+correlation:
+  type: event_count
+  rules:
+    - evaluation-test
+  group-by:
+    - User
+  timespan: 5m
+  condition:
+    gte: 10
+"""
+    rule = RULE.replace("title: Evaluation test", "title: Evaluation test\nname: evaluation-test")
+    plans, errors = compile_rules([rule, rule + "---\n" + correlation, "title: [broken"])
+    assert len(plans) == 2
+    assert len(errors) == 2
+
+def test_evaluate_rules_and_read_events(tmp_path):
+    path = tmp_path / "events.ndjson"
+    path.write_text("\n".join(json.dumps(event) for event in EVENTS), encoding="utf-8")
+    assert list(read_events(str(path))) == EVENTS
+    array = tmp_path / "events.json"
+    array.write_text(json.dumps(EVENTS), encoding="utf-8")
+    assert list(read_events(str(array))) == EVENTS
+
+    report = evaluate_rules([plan()], read_events(str(path)), batch_size=3, samples=2)
+    assert report["events"] == len(EVENTS)
+    result = report["rules"][0]
+    assert result["matches"] == 4
+    assert result["samples"] == [EVENTS[0], EVENTS[1]]
+
+def test_placeholders_are_not_supported():
+    rule = """
+title: Placeholder
+logsource:
+  product: windows
+detection:
+  selection:
+    User|expand: '%admins%'
+  condition: selection
+"""
+    with pytest.raises(sigma_evaluation.SigmaFeatureNotSupportedByBackendError):
+        plan(rule)
+
+def test_trie_pattern():
+    needles = ["\0abc\0", "abd", "ab", "xyz\0", "\0q", "a.c"]
+    regex = re.compile(sigma_evaluation._trie_pattern(needles))
+    for text in ["\0abc\0", "--ab--", "\0xyz\0", "\0qq\0", "a.c", "\0abd\0"]:
+        assert bool(regex.search(text)) == any(needle in text for needle in needles), text
+    assert not regex.search("\0xyzz\0a c\0")
+
+def test_long_literal_lists_match_like_single_literals():
+    literals = [f"tool{i}.exe" for i in range(sigma_evaluation.TRIE_MIN_LITERALS)]
+    detection = {
+        "selection": {"Image|endswith": literals, "CommandLine|contains": ["/c", "-x"]},
+        "exact": {"Image": literals[:3]},
+        "condition": "selection or exact",
+    }
+    rule = yaml.safe_dump({"title": "Lists", "logsource": {"category": "process_creation"}, "detection": detection})
+    compiled = plan(rule)
+    assert [type(node) for node in nodes(compiled.root)].count(sigma_evaluation.MultiLiteralLeaf) == 1
+    events = [
+        {"Image": f"C:\\bin\\{name}", "CommandLine": f"run {arg}"}
+        for name in ["tool1.exe", "TOOL12.EXE", "tool1.exe.bak", "xtool3.exe", "other.exe", "tool2.exe"]
+        for arg in ["/c", "-y"]
+    ] + [{"Image": "tool1.exe"}, {"Image": ["a.exe", "tool5.exe"], "CommandLine": "-x"}]
+    for repeat in [1, 100]:
+        batch_events = events * repeat
+        expected = rows_by_row(plan(rule).root, batch_events)
+        assert compiled.evaluate(EventBatch(batch_events)) == expected
+    assert expected[:8] == [0, 2, 6, 10, 12, 13, 14, 16]
+
+def test_atoms_are_shared_between_rules():
+    second = RULE.replace("title: Evaluation test", "title: Second").replace("'who*mi'", "'hostname'")
+    atom_index = sigma_evaluation.AtomIndex()
+    plans, errors = compile_rules([RULE, second], atom_index=atom_index)
+    assert errors == []
+    assert atom_index.leaves == 14
+    assert len(atom_index.atoms) == 8
+    shared = [atom for atom in atom_index.atoms.values() if atom.shared]
+    assert len(shared) == 6
+
+    events = EVENTS * 30
+    unshared = [plan(RULE), plan(second)]
+    for batch in [EventBatch(events), EventBatch(events[::-1])]:
+        assert [p.evaluate(batch) for p in plans] == [p.evaluate(batch) for p in unshared]
@@ -0,0 +1,79 @@
+import pytest
+
+import sigma_converter
+
+RULES = """
+title: PowerShell
+id: 0b3f1b4c-5d0a-4e7a-9f0e-5a2c1a3e6f0a
+status: test
+level: high
+tags:
+  - attack.execution
+  - attack.t1059.001
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\\\powershell.exe'
+    CommandLine|contains:
+      - '-enc'
+      - '-nop'
+  condition: selection
+---
+title: Whoami
+id: 5a2c1a3e-6f0a-4c39-9a39-3f1d0a1e2b11
+name: whoami
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\\\whoami.exe'
+  condition: selection
+"""
+
+CORRELATION = """
+title: Many whoami
+correlation:
+  type: event_count
+  rules:
+    - whoami
+  group-by:
+    - User
+  timespan: 5m
+  condition:
+    gte: 10
+"""
+
+def single_format_results(rule_yaml, target, formats, **options):
+    results = {}
+    for output_format in formats:
+        try:
+            results[output_format] = sigma_converter.convert_rule(rule_yaml, target, format=output_format, **options)
+        except Exception:
+            continue
+    return results
+
+@pytest.mark.parametrize("target", ["splunk", "lucene", "esql"])
+@pytest.mark.parametrize("rule_yaml", [RULES, RULES + "---\n" + CORRELATION], ids=["rules", "correlation"])
+def test_formats_match_single_format_conversions(target, rule_yaml):
+    backend_class = sigma_converter.get_plugins().backends.get(target)
+    if backend_class is None:
+        pytest.skip(f"backend {target} is not installed")
+    expected = single_format_results(rule_yaml, target, list(backend_class.formats))
+    if len(expected) < 2:
+        pytest.skip(f"backend {target} converts this rule to fewer than two formats")
+    assert sigma_converter.convert_rule_formats(rule_yaml, target, list(expected)) == expected
+    # The order of the requested formats is kept and duplicates are dropped
+    formats = list(reversed(expected)) + list(expected)
+    assert list(sigma_converter.convert_rule_formats(rule_yaml, target, formats)) == list(reversed(expected))
+
+def test_collection_formats_match_single_format_conversions():
+    backend_class = sigma_converter.get_plugins().backends.get("lucene")
+    if backend_class is None:
+        pytest.skip("backend lucene is not installed")
+    formats = ["siem_rule", "siem_rule_ndjson"]
+    backend = sigma_converter.create_backend("lucene", None, format=formats)
+    result = sigma_converter.convert_collection_formats(backend, sigma_converter.load_rule_collection(RULES), formats)
+    assert result == single_format_results(RULES, "lucene", formats)
@@ -0,0 +1,116 @@
+import os
+import time
+
+import pytest
+
+import sigma_converter
+from sigma_converter import PersistentCache
+
+RULE = """
+title: Whoami
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\\\whoami.exe'
+  condition: selection
+"""
+
+PIPELINE = """
+name: mapping
+priority: 10
+transformations:
+  - type: field_name_mapping
+    mapping:
+      Image: process.executable
+"""
+
+@pytest.fixture
+def persistent_cache(tmp_path):
+    sigma_converter.set_persistent_cache(str(tmp_path / "cache"))
+    sigma_converter._conversion_cache.clear()
+    yield sigma_converter._persistent_cache
+    sigma_converter.set_persistent_cache(None)
+    sigma_converter._conversion_cache.clear()
+    sigma_converter._optimized_pipeline_cache.clear()
+
+def entries(cache):
+    return sorted(name for name in os.listdir(cache.directory))
+
+def test_get_and_put(tmp_path):
+    cache = PersistentCache(str(tmp_path))
+    assert cache.get("conversion", "a") is sigma_converter._MISSING
+    cache.put("conversion", "a", ["query"])
+    cache.put("conversion", "b", lambda: None)
+    assert cache.get("conversion", "a") == ["query"]
+    assert cache.get("pipeline", "a") is sigma_converter._MISSING
+    # Only the picklable value was written, nothing is left behind
+    assert len(entries(cache)) == 1
+    assert all(name.endswith(".pickle") for name in entries(cache))
+
+    # Entries from another cache instance (a restarted worker)
+    assert PersistentCache(str(tmp_path)).get("conversion", "a") == ["query"]
+
+    # Corrupted entries are dropped
+    path = os.path.join(tmp_path, entries(cache)[0])
+    with open(path, "wb") as f:
+        f.write(b"\x80\x05trunc")
+    assert cache.get("conversion", "a") is sigma_converter._MISSING
+    assert entries(cache) == []
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PersistentCache(str(tmp_path), max_bytes=4000)
+    for i in range(3):
+        cache.put("conversion", str(i), "x" * 1000)
+        os.utime(cache._path("conversion", str(i)), (time.time() - 100 + i, time.time() - 100 + i))
+    # Reading an entry makes it the most recently used
+    assert cache.get("conversion", "0") == "x" * 1000
+    cache.put("conversion", "3", "x" * 1000)
+    cache.put("conversion", "4", "x" * 1000)
+    remaining = [str(i) for i in range(5) if cache.get("conversion", str(i)) is not sigma_converter._MISSING]
+    assert "1" not in remaining and "2" not in remaining
+    assert "0" in remaining and "4" in remaining
+    assert sum(os.path.getsize(os.path.join(tmp_path, name)) for name in entries(cache)) <= 4000
+
+def test_overwritten_entries_are_counted_once(tmp_path):
+    cache = PersistentCache(str(tmp_path), max_bytes=4000)
+    cache.put("conversion", "a", "x" * 1000)
+    cache.put("conversion", "b", "x" * 1000)
+    for size in (1000, 500, 1500, 1000):
+        cache.put("conversion", "a", "x" * size)
+        assert cache._size == sum(os.path.getsize(os.path.join(tmp_path, name)) for name in entries(cache))
+    # Rewriting an entry does not evict the other one
+    for _ in range(10):
+        cache.put("conversion", "a", "x" * 1000)
+    assert cache.get("conversion", "b") == "x" * 1000
+
+def test_conversions_survive_a_restart(persistent_cache, monkeypatch):
+    if "splunk" not in sigma_converter.get_plugins().backends:
+        pytest.skip("backend splunk is not installed")
+    result = sigma_converter.convert_rule(RULE, "splunk", pipeline_ymls=[PIPELINE], optimize_pipeline=True)
+    assert "process.executable" in result
+
+    # A new worker: empty memory caches, nothing may be converted or built again
+    sigma_converter._conversion_cache.clear()
+    sigma_converter._optimized_pipeline_cache.clear()
+    sigma_converter._pipeline_rule_keys.clear()
+    def fail(*args, **kwargs):
+        raise AssertionError("recomputed")
+    monkeypatch.setattr(sigma_converter, "convert_collection", fail)
+    monkeypatch.setattr(sigma_converter, "_build_processing_pipeline", fail)
+    assert sigma_converter.convert_rule(RULE, "splunk", pipeline_ymls=[PIPELINE], optimize_pipeline=True) == result
+
+    # Entries of other package versions are not used
+    monkeypatch.setattr(sigma_converter, "PERSISTENT_CACHE_VERSION", -1)
+    sigma_converter._cache_versions.clear()
+    sigma_converter._conversion_cache.clear()
+    with pytest.raises(AssertionError, match="recomputed"):
+        sigma_converter.convert_rule(RULE, "splunk", pipeline_ymls=[PIPELINE])
+
+def test_pipelines_are_persisted(persistent_cache):
+    pipeline = sigma_converter.build_processing_pipeline(pipeline_ymls=[PIPELINE])
+    assert len(entries(persistent_cache)) == 1
+    restored = sigma_converter.build_processing_pipeline(pipeline_ymls=[PIPELINE])
+    assert restored is not pipeline
+    assert restored == pipeline
@@ -0,0 +1,239 @@
+import pytest
+from sigma.collection import SigmaCollection
+from sigma.processing.pipeline import ProcessingPipeline
+from sigma.rule import SigmaDetection
+
+import sigma_converter
+from sigma_converter import (
+    FusedFieldMappingTransformation,
+    LogsourceMemoProcessingItem,
+    optimize_processing_pipeline,
+)
+
+MAPPING_YMLS = [
+    """
+name: first
+priority: 10
+transformations:
+  - type: field_name_mapping
+    mapping:
+      Image: process.executable
+      CommandLine: process.command_line
+      User: [user.name, user.id]
+  - type: field_name_prefix_mapping
+    mapping:
+      process.: proc.
+""",
+    """
+name: second
+priority: 20
+transformations:
+  - type: field_name_mapping
+    mapping:
+      proc.executable: proc.exe
+      user.id: [user.uid, user.sid]
+  - type: field_name_mapping
+    mapping:
+      ParentImage: proc.parent.exe
+""",
+]
+
+RULE = """
+title: Mapping test
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\cmd.exe'
+    CommandLine|contains: whoami
+  user:
+    User: admin
+  parent:
+    ParentImage: explorer.exe
+  other:
+    OriginalFileName: cmd.exe
+  condition: selection and (user or parent) and not other
+fields:
+  - Image
+  - User
+"""
+
+def build(ymls):
+    pipeline = None
+    for yml in ymls:
+        custom = ProcessingPipeline.from_yaml(yml)
+        pipeline = custom if pipeline is None else pipeline + custom
+    return pipeline
+
+def apply(pipeline, rule_yaml=RULE):
+    rule = SigmaCollection.from_yaml(rule_yaml).rules[0]
+    pipeline.apply(rule)
+    return rule
+
+def detection_fields(rule):
+    def fields(detection):
+        return [
+            fields(item) if isinstance(item, SigmaDetection) else (item.field, sorted(item.applied_processing_items))
+            for item in detection.detection_items
+        ]
+
+    return {name: fields(detection) for name, detection in rule.detection.detections.items()}
+
+def test_consecutive_mappings_are_fused():
+    pipeline = build(MAPPING_YMLS)
+    optimized = optimize_processing_pipeline(pipeline)
+    assert len(pipeline.items) == 4
+    assert len(optimized.items) == 1
+    assert isinstance(optimized.items[0].transformation, FusedFieldMappingTransformation)
+    assert len(pipeline.items) == 4
+
+def test_fused_mapping_matches_sequential_application():
+    plain = apply(build(MAPPING_YMLS))
+    fused = apply(optimize_processing_pipeline(build(MAPPING_YMLS)))
+    assert fused.fields == plain.fields
+    if "splunk" not in sigma_converter.backends:
+        pytest.skip("backend splunk is not installed")
+    backend_class = sigma_converter.backends["splunk"]
+    assert backend_class().convert_rule(fused) == backend_class().convert_rule(plain)
+
+def test_fused_table_lookup():
+    optimized = optimize_processing_pipeline(build(MAPPING_YMLS))
+    transformation = optimized.items[0].transformation
+    assert transformation.apply_field_name("Image") == "proc.exe"
+    assert transformation.apply_field_name("User") == ["user.name", "user.uid", "user.sid"]
+    assert transformation.apply_field_name("process.pid") == "proc.pid"
+    assert transformation.apply_field_name("Unmapped") is None
+    assert "process.pid" in transformation.table
+
+def test_unfused_items_are_kept():
+    if "sysmon" not in sigma_converter.plugins.pipelines or "splunk" not in sigma_converter.backends:
+        pytest.skip("sysmon pipeline or splunk backend is not installed")
+    pipeline = sigma_converter.build_processing_pipeline(["sysmon"], MAPPING_YMLS)
+    optimized = optimize_processing_pipeline(pipeline)
+    assert len(optimized.items) == len(pipeline.items) - 3
+    assert sigma_converter.convert_rule(RULE, "splunk", ["sysmon"], MAPPING_YMLS, optimize_pipeline=True) == \
+        sigma_converter.convert_rule(RULE, "splunk", ["sysmon"], MAPPING_YMLS)
+
+def test_conditional_items_are_kept():
+    yml = """
+name: conditional
+priority: 10
+transformations:
+  - id: first_mapping
+    type: field_name_mapping
+    mapping:
+      Image: process.executable
+  - type: field_name_mapping
+    mapping:
+      CommandLine: process.command_line
+  - type: field_name_mapping
+    mapping:
+      User: user.name
+    rule_conditions:
+      - type: logsource
+        product: linux
+  - type: field_name_mapping
+    mapping:
+      process.executable: proc.exe
+  - type: field_name_suffix
+    suffix: .keyword
+    field_name_conditions:
+      - type: processing_item_applied
+        processing_item_id: first_mapping
+"""
+    pipeline = ProcessingPipeline.from_yaml(yml)
+    optimized = optimize_processing_pipeline(pipeline)
+    assert [type(item.transformation) for item in optimized.items] == \
+        [FusedFieldMappingTransformation] + [type(item.transformation) for item in pipeline.items[2:]]
+    plain = apply(ProcessingPipeline.from_yaml(yml))
+    fused = apply(optimized)
+    assert plain.fields == fused.fields == ["proc.exe.keyword", "User"]
+    assert detection_fields(fused) == detection_fields(plain)
+
+def test_fused_items_are_tracked_as_applied():
+    yml = """
+name: identified
+priority: 10
+transformations:
+  - id: image_mapping
+    type: field_name_mapping
+    mapping:
+      Image: process.executable
+  - id: user_mapping
+    type: field_name_mapping
+    mapping:
+      User: [user.name, user.id]
+  - type: field_name_prefix_mapping
+    mapping:
+      user.: account.
+"""
+    # A later pipeline, e.g. of the backend or output format, checks the identifiers
+    backend_yml = """
+name: backend
+priority: 100
+transformations:
+  - type: field_name_suffix
+    suffix: .keyword
+    field_name_conditions:
+      - type: processing_item_applied
+        processing_item_id: user_mapping
+  - type: field_name_mapping
+    mapping:
+      ParentImage: parent.executable
+    rule_conditions:
+      - type: processing_item_applied
+        processing_item_id: image_mapping
+  - type: field_name_mapping
+    mapping:
+      process.executable: process.name
+    detection_item_conditions:
+      - type: processing_item_applied
+        processing_item_id: image_mapping
+"""
+    pipeline = ProcessingPipeline.from_yaml(yml)
+    optimized = optimize_processing_pipeline(pipeline)
+    assert len(optimized.items) == 1
+    plain_pipeline = build([yml, backend_yml])
+    plain = apply(plain_pipeline)
+    fused_pipeline = optimized + ProcessingPipeline.from_yaml(backend_yml)
+    fused = apply(fused_pipeline)
+    assert fused.fields == plain.fields == ["process.name", "account.name.keyword", "account.id.keyword"]
+    assert detection_fields(fused) == detection_fields(plain)
+    assert fused.detection.detections["parent"].detection_items[0].field == "parent.executable"
+    assert fused.applied_processing_items == plain.applied_processing_items
+    assert fused.was_processed_by("image_mapping") and fused.was_processed_by("user_mapping")
+    assert {"image_mapping", "user_mapping"} <= fused_pipeline.applied_ids
+    items = fused.detection.detections["selection"].detection_items
+    assert items[0].was_processed_by("image_mapping") and not items[1].was_processed_by("image_mapping")
+
+def test_optimized_pipelines_are_cached():
+    first = sigma_converter.build_processing_pipeline(None, MAPPING_YMLS, optimize=True)
+    second = sigma_converter.build_processing_pipeline(None, MAPPING_YMLS, optimize=True)
+    assert first is second
+    assert sigma_converter.build_processing_pipeline(None, MAPPING_YMLS) is not first
+
+@pytest.mark.parametrize("target", ["splunk", "lucene", "esql", "sqlite"])
+def test_conversion_with_optimized_pipeline(target):
+    if target not in sigma_converter.backends:
+        pytest.skip(f"backend {target} is not installed")
+    options = dict(pipeline_ymls=MAPPING_YMLS)
+    assert sigma_converter.convert_rule(RULE, target, optimize_pipeline=True, **options) == \
+        sigma_converter.convert_rule(RULE, target, **options)
+
+def test_logsource_conditions_are_memoized():
+    if "sysmon" not in sigma_converter.plugins.pipelines or "splunk" not in sigma_converter.backends:
+        pytest.skip("sysmon pipeline or splunk backend is not installed")
+    pipeline = sigma_converter.build_processing_pipeline(["sysmon"])
+    optimized = optimize_processing_pipeline(pipeline)
+    memoized = [item for item in optimized.items if isinstance(item, LogsourceMemoProcessingItem)]
+    assert len(memoized) == len(pipeline.items)
+
+    before = sigma_converter.applicability_stats()
+    for _ in range(3):
+        sigma_converter._conversion_cache.clear()
+        assert sigma_converter.convert_rule(RULE, "splunk", ["sysmon"], optimize_pipeline=True) == \
+            sigma_converter.convert_rule(RULE, "splunk", ["sysmon"])
+    after = sigma_converter.applicability_stats()
+    assert after["evaluations"] - before["evaluations"] == 3 * len(memoized)
+    assert after["saved"] - before["saved"] >= 2 * len(memoized)
@@ -0,0 +1,112 @@
+import gzip
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import sigma_converter
+
+def test_import_does_not_discover_plugins():
+    script = "import sys, sigma_converter; print(sorted(m for m in ('sigma.plugins', 'sigma.conversion.base', 'sigma.data.mitre_attack') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=pathlib.Path(sigma_converter.__file__).parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+def test_plugins_are_discovered_once_until_refreshed():
+    plugins = sigma_converter.get_plugins()
+    assert sigma_converter.get_plugins() is plugins
+    assert sigma_converter.plugins is plugins
+    assert sigma_converter.backends is plugins.backends
+    assert plugins.validators == {}
+    import sigma.data.mitre_attack
+    assert sigma.data.mitre_attack._load_mitre_attack_data is sigma_converter._load_mitre_attack_snapshot
+
+    sigma_converter.refresh_plugins()
+    assert sigma_converter.get_plugins() is not plugins
+    assert sigma_converter.get_plugins().backends.keys() == plugins.backends.keys()
+
+ATTACK_SNAPSHOT = {
+    "format": sigma_converter.MITRE_ATTACK_SNAPSHOT_FORMAT,
+    "mitre_attack_version": "17.1",
+    "mitre_attack_tactics": {"TA0002": "execution"},
+    "mitre_attack_techniques": {"T1059": "Command and Scripting Interpreter", "T1059.001": "PowerShell"},
+    "mitre_attack_techniques_tactics_mapping": {"T1059": ["execution"], "T1059.001": ["execution"]},
+    "mitre_attack_intrusion_sets": {"G0007": "APT28"},
+}
+
+ATTACK_RULE = """
+title: PowerShell
+tags:
+  - attack.execution
+  - attack.t1059.001
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\\\powershell.exe'
+  condition: selection
+"""
+
+@pytest.fixture
+def attack_snapshot(tmp_path):
+    path = tmp_path / "mitre-attack.json.gz"
+    path.write_bytes(gzip.compress(json.dumps(ATTACK_SNAPSHOT).encode()))
+    sigma_converter.get_plugins()
+    yield path
+    sigma_converter.set_mitre_attack_snapshot(None)
+
+def test_mitre_attack_snapshot_is_loaded_on_first_use(attack_snapshot, tmp_path):
+    from sigma.data import mitre_attack
+
+    sigma_converter.set_mitre_attack_snapshot(str(attack_snapshot))
+    assert sigma_converter._mitre_attack_data is None
+    assert mitre_attack.mitre_attack_techniques["T1059.001"] == "PowerShell"
+    data = sigma_converter._mitre_attack_data
+    assert mitre_attack.mitre_attack_tactics is data["mitre_attack_tactics"]
+    assert mitre_attack.mitre_attack_groups == {"G0007": "APT28"}
+    assert mitre_attack.mitre_attack_mitigations == {}
+
+    # Served without compression
+    plain = tmp_path / "plain.json.gz"
+    plain.write_text(json.dumps(ATTACK_SNAPSHOT), encoding="utf-8")
+    sigma_converter.set_mitre_attack_snapshot(str(plain))
+    assert mitre_attack.mitre_attack_version == "17.1"
+
+    sigma_converter.set_mitre_attack_snapshot(None)
+    assert mitre_attack.mitre_attack_techniques == {}
+
+@pytest.mark.parametrize("content", [
+    b"<!doctype html><html><body>Not found</body></html>",
+    gzip.compress(b"<html></html>"),
+    gzip.compress(json.dumps(ATTACK_SNAPSHOT).encode())[:-10],
+    json.dumps(["not", "a", "snapshot"]).encode(),
+    json.dumps({**ATTACK_SNAPSHOT, "format": 0}).encode(),
+], ids=["html", "gzip-html", "truncated", "list", "format"])
+def test_unreadable_mitre_attack_snapshot_is_ignored(attack_snapshot, content):
+    from sigma.data import mitre_attack
+
+    attack_snapshot.write_bytes(content)
+    sigma_converter.set_mitre_attack_snapshot(str(attack_snapshot))
+    with pytest.warns(UserWarning, match="MITRE ATT&CK snapshot"):
+        assert mitre_attack.mitre_attack_techniques == {}
+    assert mitre_attack.mitre_attack_version == "unknown"
+    if "esql" in sigma_converter.get_plugins().backends:
+        result = sigma_converter.convert_rule(ATTACK_RULE, "esql", format="siem_rule_ndjson")
+        assert result[0]["query"]
+
+def test_mitre_attack_snapshot_enriches_rules(attack_snapshot):
+    if "esql" not in sigma_converter.get_plugins().backends:
+        pytest.skip("backend esql is not installed")
+    sigma_converter.set_mitre_attack_snapshot(str(attack_snapshot))
+    threat = sigma_converter.convert_rule(ATTACK_RULE, "esql", format="siem_rule_ndjson")[0]["threat"][0]
+    assert threat["tactic"]["id"] == "TA0002"
+    assert threat["technique"][0]["name"] == "Command and Scripting Interpreter"
+    assert threat["technique"][0]["subtechnique"][0]["name"] == "PowerShell"
@@ -0,0 +1,102 @@
+import json
+import zipfile
+
+import pytest
+
+import sigma_converter
+import sigma_provisioning
+from sigma_provisioning import ProvisioningError, build_lock, install, install_plan, workspace_packages, write_lock
+
+def make_wheel(directory, name, version, requires=(), module=None):
+    module = module or name.replace("-", "_")
+    dist_info = f"{module}-{version}.dist-info"
+    metadata = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    metadata += [f"Requires-Dist: {requirement}" for requirement in requires]
+    path = directory / f"{module}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(path, "w") as wheel:
+        wheel.writestr(f"{module}/__init__.py", f"VERSION = {version!r}\n")
+        wheel.writestr(f"{module}-{version}.data/purelib/{module}_extra.py", "")
+        wheel.writestr(f"{module}-{version}.data/scripts/{module}", "#!python\n")
+        wheel.writestr(f"{dist_info}/METADATA", "\n".join(metadata) + "\n")
+        wheel.writestr(f"{dist_info}/RECORD", "")
+    return path
+
+@pytest.fixture
+def wheelhouse(tmp_path):
+    directory = tmp_path / "wheels"
+    directory.mkdir()
+    make_wheel(directory, "pySigma", "1.3.2", ["pyparsing>=3", "Jinja2", "colorama; sys_platform == 'win32'"])
+    make_wheel(directory, "pyparsing", "3.2.0")
+    make_wheel(directory, "pySigma_backend_splunk", "2.0.0", ["pysigma>=1.0", "requests[socks]; extra == 'http'"])
+    make_wheel(directory, "pysigma-pipeline-windows", "2.0.0", ["pysigma"])
+    make_wheel(directory, "pysigma-pipeline-sysmon", "2.0.0", ["pysigma", "pysigma-pipeline-windows"])
+    write_lock(str(directory), build_lock(str(directory)))
+    return directory
+
+def test_build_lock(wheelhouse):
+    lock = json.loads((wheelhouse / sigma_provisioning.LOCK_NAME).read_text(encoding="utf-8"))
+    assert sorted(lock["packages"]) == [
+        "pyparsing", "pysigma", "pysigma-backend-splunk", "pysigma-pipeline-sysmon", "pysigma-pipeline-windows",
+    ]
+    # Markers are evaluated for Pyodide and extras are not followed
+    assert lock["packages"]["pysigma"]["requires"] == ["jinja2", "pyparsing"]
+    assert lock["packages"]["pysigma-backend-splunk"]["requires"] == ["pysigma"]
+    assert lock["external"] == ["jinja2"]
+
+    make_wheel(wheelhouse, "pysigma-backend-old", "0.1.0", ["pysigma<1.0"])
+    with pytest.raises(ProvisioningError, match="requires pysigma<1.0"):
+        build_lock(str(wheelhouse))
+
+def test_install_plan(wheelhouse):
+    plan = install_plan(str(wheelhouse), sigma_provisioning.BASE_PACKAGES + ["pysigma-backend-splunk"], {})
+    files = [entry["file"] for entry in plan["wheels"]]
+    assert len(files) == 5
+    # Dependencies come first
+    assert files.index("pyparsing-3.2.0-py3-none-any.whl") < files.index("pySigma-1.3.2-py3-none-any.whl")
+    assert plan["external"] == ["jinja2"]
+
+    plan = install_plan(str(wheelhouse), ["pySigma.Backend_Splunk"], {"pysigma": "1.3.2", "pyparsing": "3.1.0", "jinja2": "3.1.6"})
+    assert [entry["name"] for entry in plan["wheels"]] == ["pyparsing", "pySigma_backend_splunk"]
+    assert plan["external"] == []
+
+    with pytest.raises(ProvisioningError, match="pysigma-backend-nope"):
+        install_plan(str(wheelhouse), ["pysigma-backend-nope"], {})
+
+def test_install(wheelhouse, tmp_path):
+    site_packages = tmp_path / "site-packages"
+    plan = install(str(wheelhouse), ["pysigma-pipeline-sysmon"], str(site_packages), max_workers=4)
+    assert len(plan["wheels"]) == 4
+    assert (site_packages / "pySigma" / "__init__.py").read_text(encoding="utf-8") == "VERSION = '1.3.2'\n"
+    assert (site_packages / "pySigma_extra.py").is_file()
+    assert not (site_packages / "pySigma-1.3.2.data").exists()
+    assert sigma_provisioning.installed_versions([str(site_packages)])["pysigma-pipeline-sysmon"] == "2.0.0"
+
+    # Installed packages are skipped
+    plan = install(str(wheelhouse), ["pysigma-backend-splunk"], str(site_packages))
+    assert [entry["name"] for entry in plan["wheels"]] == ["pySigma_backend_splunk"]
+
+    (wheelhouse / "pyparsing-3.2.0-py3-none-any.whl").write_bytes(b"changed")
+    with pytest.raises(ProvisioningError, match="Hash mismatch"):
+        install(str(wheelhouse), ["pyparsing"], str(tmp_path / "other"))
+
+def test_workspace_packages(tmp_path):
+    for name, manifest in [("a", {"backend": "pySigma-backend-splunk"}), ("b/c", {"backend": "pysigma-backend-elasticsearch"})]:
+        directory = tmp_path / name
+        directory.mkdir(parents=True)
+        (directory / sigma_provisioning.WORKSPACE_MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    (tmp_path / "d").mkdir()
+    (tmp_path / "d" / sigma_provisioning.WORKSPACE_MANIFEST_NAME).write_text("{", encoding="utf-8")
+    assert workspace_packages([str(tmp_path)]) == ["pysigma-backend-elasticsearch", "pysigma-backend-splunk"]
+
+def test_bulk_manifest_records_the_backend(tmp_path):
+    import sigma_bulk
+
+    if "splunk" not in sigma_converter.get_plugins().backends:
+        pytest.skip("backend splunk is not installed")
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "rule.yml").write_text(
+        "title: t\nlogsource:\n  product: windows\ndetection:\n  sel:\n    Image: x\n  condition: sel\n", encoding="utf-8"
+    )
+    sigma_bulk.convert_tree(str(rules), str(tmp_path / "out"), "splunk", max_workers=1)
+    assert workspace_packages([str(tmp_path / "out")]) == ["pysigma-backend-splunk"]
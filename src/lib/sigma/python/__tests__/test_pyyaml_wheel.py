@@ -0,0 +1,14 @@
+import importlib.util
+import pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[5]
+SCRIPT = ROOT / "scripts" / "build-pyyaml-wheel.py"
+
+spec = importlib.util.spec_from_file_location("build_pyyaml_wheel", SCRIPT)
+build_pyyaml_wheel = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_pyyaml_wheel)
+
+def test_wheel_is_built_from_the_vendored_sources():
+    # Changes to pyodide-packages/pyyaml-6.0.3/lib/yaml only reach the worker through the wheel
+    wheel = (ROOT / build_pyyaml_wheel.WHEEL_PATH).read_bytes()
+    assert build_pyyaml_wheel.build_wheel(wheel, str(ROOT / build_pyyaml_wheel.SOURCE_PATH)) == wheel
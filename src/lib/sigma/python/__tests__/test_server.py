@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sigma_converter
+import sigma_server
+from sigma_server import ConversionServer
+
+RULE = "title: t\nlogsource:\n  product: windows\ndetection:\n  sel:\n    Image: x.exe\n  condition: sel\n"
+
+@pytest.fixture
+def server():
+    server = ConversionServer(executor=ThreadPoolExecutor(max_workers=4), max_pending=2, max_connection_requests=4)
+    yield server
+    server.close()
+
+def request(method, params, request_id=1):
+    message = {"jsonrpc": "2.0", "method": method, "params": params}
+    if request_id is not None:
+        message["id"] = request_id
+    return message
+
+def error_code(response):
+    return response["error"]["code"]
+
+@pytest.fixture
+def blocking_pipelines(monkeypatch):
+    """Make get_available_pipelines() wait until the returned event is set."""
+    release = threading.Event()
+    calls = []
+
+    def get_available_pipelines(backend=""):
+        calls.append(backend)
+        release.wait(5)
+        return [backend]
+
+    monkeypatch.setattr(sigma_converter, "get_available_pipelines", get_available_pipelines)
+    return release, calls
+
+def test_dispatch(server, monkeypatch):
+    async def run():
+        if "splunk" in sigma_converter.get_plugins().backends:
+            response = await server.handle_message(request("convert_rule", {"rule_yaml": RULE, "target": "splunk"}))
+            assert response == {"jsonrpc": "2.0", "id": 1, "result": 'Image="x.exe"'}
+            response = await server.handle_message(request("convert_rule", [RULE, "nope"], "a"))
+            assert response["id"] == "a" and error_code(response) == sigma_server.CONVERSION_ERROR
+
+        assert error_code(await server.handle_message(request("nope", {}))) == sigma_server.METHOD_NOT_FOUND
+        assert error_code(await server.handle_message({"method": "convert_rule"})) == sigma_server.INVALID_REQUEST
+        assert error_code(await server.handle_line(b"{")) == sigma_server.PARSE_ERROR
+        for params in ["x", {"rule": RULE}, [RULE, "splunk", None, None, None, "default", None, None, False, None, False, False, 1]]:
+            response = await server.handle_message(request("convert_rule", params))
+            assert error_code(response) == sigma_server.INVALID_PARAMS, params
+
+        # A TypeError raised during the conversion is not a parameter error
+        def get_available_pipelines(backend=""):
+            raise TypeError("broken pipeline")
+        monkeypatch.setattr(sigma_converter, "get_available_pipelines", get_available_pipelines)
+        response = await server.handle_message(request("get_available_pipelines", {"backend": "splunk"}))
+        assert error_code(response) == sigma_server.CONVERSION_ERROR
+        assert response["error"]["message"] == "broken pipeline"
+
+    asyncio.run(run())
+
+def test_call_reports_budget_and_bytes(monkeypatch):
+    def get_available_pipelines(backend=""):
+        if backend == "slow":
+            raise sigma_converter.ConversionBudgetExceeded("Conversion exceeded its time budget.")
+        return backend.encode()
+    monkeypatch.setattr(sigma_converter, "get_available_pipelines", get_available_pipelines)
+    assert sigma_server._call("get_available_pipelines", ["slow"]) == (
+        False, (sigma_server.CONVERSION_ERROR, "Conversion exceeded its time budget.", {"status": "budget_exceeded"})
+    )
+    assert sigma_server._call("get_available_pipelines", {"backend": "ab"}) == (True, {"encoding": "base64", "data": "YWI="})
+
+def test_pipeline_errors_stay_off_stdout(monkeypatch, capsys):
+    # stdout carries the responses of serve_stdio()
+    def get_plugins():
+        raise RuntimeError("broken plugins")
+    monkeypatch.setattr(sigma_converter, "get_plugins", get_plugins)
+    assert sigma_server._call("get_available_pipelines", {"backend": "splunk"}) == (True, [])
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "broken plugins" in captured.err
+
+def test_notifications_get_no_response(server, blocking_pipelines):
+    release, calls = blocking_pipelines
+    release.set()
+
+    async def run():
+        assert await server.handle_message(request("get_available_pipelines", {"backend": "x"}, None)) is None
+        assert await server.handle_message(request("nope", {}, None)) is None
+
+    asyncio.run(run())
+    assert calls == ["x"]
+
+def test_identical_requests_are_coalesced(server, blocking_pipelines):
+    release, calls = blocking_pipelines
+
+    async def run():
+        first = asyncio.ensure_future(server.handle_message(request("get_available_pipelines", {"backend": "x"}, 1)))
+        second = asyncio.ensure_future(server.handle_message(request("get_available_pipelines", {"backend": "x"}, 2)))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(run())
+    assert (first["id"], first["result"]) == (1, ["x"])
+    assert (second["id"], second["result"]) == (2, ["x"])
+    assert calls == ["x"]
+    assert server.coalesced == 1
+    assert server.in_flight == {}
+
+def test_pending_conversions_are_bounded(server, blocking_pipelines):
+    release, calls = blocking_pipelines
+
+    async def run():
+        pending = [
+            asyncio.ensure_future(server.handle_message(request("get_available_pipelines", {"backend": backend}, backend)))
+            for backend in ["a", "b"]
+        ]
+        await asyncio.sleep(0.05)
+        busy = await server.handle_message(request("get_available_pipelines", {"backend": "c"}, "c"))
+        # Coalesced requests do not count against the limit
+        shared = asyncio.ensure_future(server.handle_message(request("get_available_pipelines", {"backend": "a"}, "a2")))
+        release.set()
+        return busy, await asyncio.gather(*pending, shared)
+
+    busy, responses = asyncio.run(run())
+    assert error_code(busy) == sigma_server.SERVER_BUSY
+    assert [response["result"] for response in responses] == [["a"], ["b"], ["a"]]
+    assert sorted(calls) == ["a", "b"]
+
+def test_connection(server, monkeypatch):
+    monkeypatch.setattr(sigma_converter, "get_available_pipelines", lambda backend="": {"backend": backend} if backend != "set" else {1, 2})
+    server.max_pending = 64
+
+    async def run():
+        tcp_server = await asyncio.start_server(server.serve_connection, "127.0.0.1", 0, limit=1024)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for message in [
+                request("get_available_pipelines", {"backend": "x"}, 1),
+                request("get_available_pipelines", {"backend": "y"}, None),
+                request("get_available_pipelines", {"backend": "set"}, 2),
+            ]:
+                writer.write(json.dumps(message).encode() + b"\n\n")
+            writer.write(b"x" * 2048 + b"\n")
+            await writer.drain()
+            responses = [json.loads(line) async for line in reader]
+            writer.close()
+        return responses
+
+    responses = asyncio.run(run())
+    by_id = {response["id"]: response for response in responses}
+    assert len(responses) == 3
+    assert by_id[1]["result"] == {"backend": "x"}
+    # A result that cannot be encoded is still answered
+    assert error_code(by_id[2]) == sigma_server.INTERNAL_ERROR
+    assert by_id[None]["error"] == {"code": sigma_server.INVALID_REQUEST, "message": "Request too large"}
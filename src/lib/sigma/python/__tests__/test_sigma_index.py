@@ -0,0 +1,163 @@
+import importlib.util
+import json
+import os
+import pathlib
+import struct
+import sys
+
+SCRIPT = pathlib.Path(__file__).resolve().parents[5] / "scripts" / "generate-sigma-index.py"
+
+def load_script():
+    # The script imports the vendored PyYAML, other tests may have imported the installed one
+    saved = {name: module for name, module in sys.modules.items() if name == "yaml" or name.startswith("yaml.")}
+    for name in saved:
+        del sys.modules[name]
+    saved_path = list(sys.path)
+    try:
+        spec = importlib.util.spec_from_file_location("generate_sigma_index", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path[:] = saved_path
+        for name in [name for name in sys.modules if name == "yaml" or name.startswith("yaml.")]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+    return module
+
+generate_sigma_index = load_script()
+
+RULE = """
+title: {title}
+id: {title}-id
+status: test
+author: Someone
+tags:
+  - attack.execution
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  sel:
+    Image: x.exe
+  condition: sel
+"""
+
+def decode_columnar(data):
+    """Decode the columnar index back into the JSON index entries."""
+    assert data[:4] == generate_sigma_index.COLUMNAR_MAGIC
+    version, n, string_count, tag_count, pair_count = struct.unpack_from("<5I", data, 4)
+    assert version == generate_sigma_index.COLUMNAR_VERSION
+    offset = 24
+
+    def table(count):
+        nonlocal offset
+        values = struct.unpack_from(f"<{count}I", data, offset)
+        offset += 4 * count
+        return values
+
+    string_offsets = table(string_count + 1)
+    columns = [table(n) for _ in generate_sigma_index.COLUMNAR_FIELDS]
+    flags = table(n)
+    tag_offsets = table(n + 1)
+    tags = table(tag_count)
+    logsource_offsets = table(n + 1)
+    pairs = table(2 * pair_count)
+    strings = [
+        data[offset + start:offset + end].decode("utf-8")
+        for start, end in zip(string_offsets, string_offsets[1:])
+    ]
+    assert offset + string_offsets[-1] == len(data)
+
+    def value(ref):
+        if ref & generate_sigma_index.COLUMNAR_JSON_VALUE:
+            return json.loads(strings[ref & ~generate_sigma_index.COLUMNAR_JSON_VALUE])
+        return strings[ref]
+
+    rules = []
+    for i in range(n):
+        rule = {field: value(column[i]) for field, column in zip(generate_sigma_index.COLUMNAR_FIELDS, columns)}
+        rule_tags = [value(ref) for ref in tags[tag_offsets[i]:tag_offsets[i + 1]]]
+        rule_pairs = pairs[2 * logsource_offsets[i]:2 * logsource_offsets[i + 1]]
+        if flags[i] & generate_sigma_index.COLUMNAR_TAGS_VALUE:
+            rule["tags"], = rule_tags
+        else:
+            rule["tags"] = rule_tags
+        if flags[i] & generate_sigma_index.COLUMNAR_LOGSOURCE_VALUE:
+            assert len(rule_pairs) == 2 and rule_pairs[0] == 0
+            rule["logsource"] = value(rule_pairs[1])
+        else:
+            rule["logsource"] = {strings[key]: value(ref) for key, ref in zip(rule_pairs[::2], rule_pairs[1::2])}
+        rules.append(rule)
+    return rules
+
+def json_entries(rules):
+    return json.loads(json.dumps(rules, ensure_ascii=False, default=generate_sigma_index._json_default))
+
+def test_columnar_round_trip():
+    rules = [
+        generate_sigma_index.index_rule(RULE.format(title="plain"), "rules/plain.yml"),
+        generate_sigma_index.index_rule(
+            "title: 2021-03-04\ndescription: 2021-03-04 05:06:07+02:00\nstatus: 12\n"
+            "tags: attack.t1059\nlogsource: windows\n",
+            "rules/scalars.yml",
+        ),
+        generate_sigma_index.index_rule(
+            "title: Ünïcode ✓\nauthor: [a, b]\ntags: [attack.t1003, 2020-01-02, 7, null]\n"
+            "logsource:\n  product: 2022-05-06\n  1: one\n  true: yes\n  service: [a, b]\n",
+            "rules/nested/mixed.yaml",
+        ),
+        generate_sigma_index.index_rule("title: Empty\ntags: []\nlogsource: {}\n", "rules/empty.yml"),
+        generate_sigma_index.index_rule("title: No tags\ntags: {a: b}\nlogsource: [x, y]\n", "rules/odd.yml"),
+    ]
+    expected = json_entries(rules)
+    assert expected[1]["title"] == "2021-03-04T00:00:00.000Z"
+    assert expected[1]["description"] == "2021-03-04T03:06:07.000Z"
+    assert expected[2]["logsource"]["product"] == "2022-05-06T00:00:00.000Z"
+    assert decode_columnar(generate_sigma_index.encode_columnar(rules)) == expected
+    assert decode_columnar(generate_sigma_index.encode_columnar([])) == []
+
+def write_rules(repo, count):
+    rules_dir = repo / "rules" / "windows"
+    rules_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (rules_dir / f"rule_{i}.yml").write_text(RULE.format(title=f"rule{i}"), encoding="utf-8")
+    (repo / "rules" / "README.md").write_text("not a rule", encoding="utf-8")
+
+def test_unchanged_tree_is_served_from_the_cache(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    write_rules(repo, 3)
+    cache_path = str(tmp_path / "cache" / "index.json")
+    cache = generate_sigma_index.load_cache(cache_path)
+    rules, parsed = generate_sigma_index.index_rules(str(repo), max_workers=1, cache=cache)
+    assert parsed == 3
+    assert [rule["title"] for rule in rules] == ["rule0", "rule1", "rule2"]
+    generate_sigma_index.save_cache(cache, cache_path)
+
+    def fail(*args):
+        raise AssertionError("unchanged rule file was parsed again")
+
+    index_file = generate_sigma_index._index_file
+    monkeypatch.setattr(generate_sigma_index, "_index_file", fail)
+    cache = generate_sigma_index.load_cache(cache_path)
+    assert generate_sigma_index.index_rules(str(repo), max_workers=1, cache=cache) == (rules, 0)
+
+    # Only changed and new files are parsed, deleted files leave the cache
+    monkeypatch.setattr(generate_sigma_index, "_index_file", index_file)
+    changed = repo / "rules" / "windows" / "rule_1.yml"
+    changed.write_text(RULE.format(title="changed"), encoding="utf-8")
+    os.utime(changed, ns=(1, 1))
+    (repo / "rules" / "windows" / "rule_2.yml").unlink()
+    (repo / "rules" / "windows" / "rule_3.yml").write_text(RULE.format(title="new"), encoding="utf-8")
+    rules, parsed = generate_sigma_index.index_rules(str(repo), max_workers=1, cache=cache)
+    assert parsed == 2
+    assert [rule["title"] for rule in rules] == ["rule0", "changed", "new"]
+    assert sorted(cache["files"]) == [
+        os.path.join("rules", "windows", f"rule_{i}.yml") for i in (0, 1, 3)
+    ]
+
+def test_outdated_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text(json.dumps({"version": generate_sigma_index.CACHE_VERSION - 1, "files": {"a": 1}}))
+    assert generate_sigma_index.load_cache(str(cache_path)) == {"version": generate_sigma_index.CACHE_VERSION, "files": {}}
+    cache_path.write_text("{")
+    assert generate_sigma_index.load_cache(str(cache_path))["files"] == {}
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import sigma_converter
+import sigma_sqlite
+from sigma_sqlite import EventDatabase, convert_rules, evaluate_queries, flatten_event, referenced_fields
+
+pytestmark = pytest.mark.skipif("sqlite" not in sigma_converter.backends, reason="backend sqlite is not installed")
+
+RULE = """
+title: Whoami
+id: 5a2c1a3e-6f0a-4c39-9a39-3f1d0a1e2b11
+logsource:
+  product: windows
+  category: process_creation
+detection:
+  selection:
+    Image|endswith: '\\whoami.exe'
+    User|re: '^CORP'
+  filter:
+    Port|lt: 1024
+  condition: selection and not filter
+"""
+
+EQUALS_RULE = """
+title: Event 4688
+logsource:
+  product: windows
+detection:
+  selection:
+    EventID: 4688
+    Missing: null
+  condition: selection
+"""
+
+EVENTS = [
+    {"Image": "C:\\Windows\\System32\\WHOAMI.EXE", "User": "CORP\\alice", "Port": "8080", "EventID": 4688},
+    {"Image": "C:\\Windows\\System32\\whoami.exe", "User": "corp\\bob", "Port": 8080, "EventID": "4688"},
+    {"image": "C:\\Windows\\System32\\whoami.exe", "User": "CORP\\carol", "Port": 443},
+    {"Image": "C:\\Windows\\System32\\whoami.exe", "User": "CORP\\dave", "Port": "99999"},
+]
+
+def test_flatten_event():
+    assert flatten_event({"process": {"name": "cmd", "args": ["/c", 1]}, "ok": True}) == {
+        "process.name": "cmd",
+        "process.args": '["/c", 1]',
+        "ok": 1,
+    }
+
+def test_referenced_fields():
+    query = "SELECT * FROM logs WHERE Image LIKE '%\\ a OR b%' ESCAPE '\\' AND `process.name`='x'"
+    assert {"image", "process.name"} <= referenced_fields(query)
+    assert "b" not in referenced_fields(query)
+
+def test_evaluate_queries():
+    queries, errors = convert_rules([RULE, EQUALS_RULE])
+    assert errors == []
+    assert [query["title"] for query in queries] == ["Whoami", "Event 4688"]
+    other = [{"EventID": i} for i in range(1000)]
+    report = evaluate_queries(queries, EVENTS + other, samples=1)
+    assert report["events"] == len(EVENTS) + len(other)
+    whoami, equals = report["rules"]
+    # Case-insensitive column names and numeric comparison of numeric strings
+    assert whoami["matches"] == 2
+    assert whoami["samples"][0]["User"] == "CORP\\alice"
+    assert whoami["full_scan"]
+    assert whoami["id"] == "5a2c1a3e-6f0a-4c39-9a39-3f1d0a1e2b11"
+    # Columns of fields missing from all events are added as null
+    assert equals["matches"] == 2
+    # Equality on an indexed field doesn't scan the table
+    assert not equals["full_scan"]
+
+def test_indexes_and_loading_in_batches():
+    database = EventDatabase()
+    try:
+        assert database.load(EVENTS * 10, batch_size=3) == 40
+        assert database.load([{"Other": {"Nested": "x"}}]) == 1
+        assert database.create_indexes(["image", "nothing", "Other.Nested"]) == ["Image", "Other.Nested"]
+        assert database.create_indexes(["Image"]) == []
+        count, hits = database.run('SELECT * FROM logs WHERE "other.nested" = \'X\'')
+        assert count == 1
+        assert hits == [{"Other.Nested": "x"}]
+    finally:
+        database.close()
+
+def test_main(tmp_path, capsys):
+    rule = tmp_path / "rules" / "whoami.yml"
+    rule.parent.mkdir()
+    rule.write_text(RULE, encoding="utf-8")
+    events = tmp_path / "events.ndjson"
+    events.write_text("\n".join(json.dumps(event) for event in EVENTS), encoding="utf-8")
+    assert sigma_sqlite.main(["-r", str(rule.parent), "--json", str(events)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["rules"][0]["matches"] == 2
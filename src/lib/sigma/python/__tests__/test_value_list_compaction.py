@@ -0,0 +1,88 @@
+import random
+import re
+
+import pytest
+import yaml
+
+import sigma_converter
+from sigma_converter import _covered_values, _regex_trie
+
+ALPHABET = "ab.-\\"
+
+def random_literal(rng, max_length=5):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, max_length)))
+
+def matches(shape, literal, s):
+    if shape == "exact":
+        return s == literal
+    if shape == "startswith":
+        return s.startswith(literal)
+    if shape == "endswith":
+        return s.endswith(literal)
+    return literal in s
+
+@pytest.mark.parametrize("seed", range(100))
+def test_regex_trie_matches_exactly_the_literals(seed):
+    rng = random.Random(seed)
+    literals = list(set(random_literal(rng) for _ in range(rng.randint(1, 30))))
+    pattern = re.compile(_regex_trie(literals))
+    for literal in literals:
+        assert pattern.fullmatch(literal)
+    for _ in range(200):
+        s = random_literal(rng, 6)
+        assert bool(pattern.fullmatch(s)) == (s in literals)
+
+@pytest.mark.parametrize("seed", range(100))
+def test_covered_values_keep_list_semantics(seed):
+    rng = random.Random(seed)
+    shapes = [
+        (rng.choice(("exact", "startswith", "endswith", "contains")), random_literal(rng, 3))
+        for _ in range(rng.randint(1, 30))
+    ]
+    covered = _covered_values(shapes)
+    kept = [shape for shape, drop in zip(shapes, covered) if not drop]
+    for _ in range(300):
+        s = random_literal(rng, 6)
+        assert any(matches(*shape, s) for shape in shapes) == any(matches(*shape, s) for shape in kept)
+
+def test_covered_values():
+    shapes = [
+        ("contains", "evil"),
+        ("endswith", "\\evil.exe"),
+        ("startswith", "c:\\tools\\"),
+        ("exact", "c:\\tools\\x.exe"),
+        ("contains", "evil"),
+        None,
+        ("exact", "other"),
+    ]
+    assert _covered_values(shapes) == [False, True, False, True, True, False, False]
+
+def value_list_rule(modifier, values):
+    return yaml.safe_dump({
+        "title": "Value list",
+        "logsource": {"product": "windows", "category": "process_creation"},
+        "detection": {"sel": {f"CommandLine|{modifier}": values}, "condition": "sel"},
+    })
+
+def test_contains_list_becomes_regex():
+    pytest.importorskip("sigma.backends.sqlite")
+    rule = value_list_rule("contains", [f"-enc pay{i:03}" for i in range(100)])
+    plain = sigma_converter.convert_rule(rule, "sqlite")
+    compacted = sigma_converter.convert_rule(rule, "sqlite", backend_options={"compact_value_lists": True})
+    assert "REGEXP" in compacted
+    assert len(compacted) < len(plain) / 2
+
+def test_in_list_backend_keeps_values():
+    pytest.importorskip("sigma.backends.splunk")
+    rule = value_list_rule("contains", [f"-enc pay{i:03}" for i in range(100)] + ["-enc pay001 x"])
+    plain = sigma_converter.convert_rule(rule, "splunk")
+    compacted = sigma_converter.convert_rule(rule, "splunk", backend_options={"compact_value_lists": 50})
+    assert "pay001 x" in plain
+    assert "pay001 x" not in compacted
+    assert "regex" not in compacted
+
+def test_short_lists_are_unchanged():
+    pytest.importorskip("sigma.backends.sqlite")
+    rule = value_list_rule("contains", ["a", "ab", "b"])
+    assert sigma_converter.convert_rule(rule, "sqlite", backend_options={"compact_value_lists": True}) == \
+        sigma_converter.convert_rule(rule, "sqlite")
@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import pathlib
+
+import pytest
+
+import sigma_provisioning
+from sigma_provisioning import ProvisioningError
+from test_provisioning import make_wheel
+
+SCRIPT = pathlib.Path(__file__).resolve().parents[5] / "scripts" / "build-wheelhouse.py"
+
+spec = importlib.util.spec_from_file_location("build_wheelhouse", SCRIPT)
+build_wheelhouse = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_wheelhouse)
+
+def make_compiled_wheel(directory, name, version):
+    path = make_wheel(directory, name, version)
+    return path.rename(path.with_name(path.name.replace("py3-none-any", "cp313-cp313-manylinux_2_17_x86_64")))
+
+# Wheels pip resolves for the base requirements, and for each backend on top of them
+BASE = [("pySigma", "1.3.2", ["pyparsing>=3", "PyYAML", "markupsafe"]), ("pyparsing", "3.2.0", [])]
+BACKENDS = {
+    "pysigma-backend-splunk": [("pysigma-backend-splunk", "2.0.0", ["pysigma>=1.0"])],
+    "pysigma-backend-old": [("pysigma-backend-old", "0.1.0", ["pyparsing<3"]), ("pyparsing", "2.4.7", [])],
+    "pysigma-backend-new": None,
+}
+
+def fake_download(requested):
+    def download(requirements, directory):
+        requested.append(list(requirements))
+        wheels = {wheel[0].lower(): wheel for wheel in BASE}
+        for requirement in requirements[1:]:
+            if BACKENDS[requirement] is None:
+                raise ProvisioningError("ERROR: ResolutionImpossible")
+            wheels.update((wheel[0].lower(), wheel) for wheel in BACKENDS[requirement])
+        directory = pathlib.Path(directory)
+        for name, version, requires in wheels.values():
+            make_wheel(directory, name, version, requires)
+        make_compiled_wheel(directory, "PyYAML", "6.0.3")
+        make_compiled_wheel(directory, "markupsafe", "3.0.2")
+
+    return download
+
+def test_backends_are_resolved_with_the_base_packages(tmp_path, capsys):
+    wheelhouse = tmp_path / "wheels"
+    wheelhouse.mkdir()
+    pyodide_wheel = make_wheel(wheelhouse, "PyYAML", "6.0.3", module="yaml")
+    pyodide_wheel = pyodide_wheel.rename(wheelhouse / "pyyaml-6.0.3-cp313-cp313-pyodide_2025_0_wasm32.whl")
+    stale_wheel = make_wheel(wheelhouse, "pySigma", "1.0.0")
+
+    requested = []
+    lock, skipped = build_wheelhouse.build_wheelhouse(
+        ["pysigma==1.3.2"],
+        ["pysigma-backend-splunk", "pysigma-backend-new", "pysigma-backend-old"],
+        str(wheelhouse),
+        fake_download(requested),
+    )
+
+    assert requested == [
+        ["pysigma==1.3.2"],
+        ["pysigma==1.3.2", "pysigma-backend-splunk"],
+        ["pysigma==1.3.2", "pysigma-backend-new"],
+        ["pysigma==1.3.2", "pysigma-backend-old"],
+    ]
+    # Backends that can't be installed with the base packages are left to the package index
+    assert skipped == ["pysigma-backend-new", "pysigma-backend-old"]
+    err = capsys.readouterr().err
+    assert "Leaving out pysigma-backend-new: ERROR: ResolutionImpossible" in err
+    assert "Leaving out pysigma-backend-old: needs other versions of pyparsing" in err
+
+    # Compiled wheels are external unless the wheelhouse has a Pyodide build, pure wheels are replaced
+    assert sorted(lock["packages"]) == ["pyparsing", "pysigma", "pysigma-backend-splunk", "pyyaml"]
+    assert lock["packages"]["pysigma"]["version"] == "1.3.2"
+    assert lock["packages"]["pyyaml"]["file"] == pyodide_wheel.name
+    assert lock["external"] == ["markupsafe"]
+    assert not stale_wheel.exists()
+    assert json.loads((wheelhouse / sigma_provisioning.LOCK_NAME).read_text(encoding="utf-8")) == lock
+
+def test_unresolvable_base_packages_are_an_error(tmp_path):
+    def download(requirements, directory):
+        raise ProvisioningError("ERROR: No matching distribution found for pysigma==0.0.1")
+
+    with pytest.raises(ProvisioningError, match="No matching distribution"):
+        build_wheelhouse.build_wheelhouse(["pysigma==0.0.1"], ["pysigma-backend-splunk"], str(tmp_path), download)
+
+def test_siem_backends(tmp_path):
+    siems = tmp_path / "SIEMs.ts"
+    siems.write_text(
+        '{ id: "a", backend: "pysigma-backend-a" },\n'
+        '    // { id: "b", backend: "pysigma-backend-b" },\n'
+        '{\n    backend: "pysigma-backend-c",\n},\n'
+        '{ id: "d", backend: "pysigma-backend-a" },\n',
+        encoding="utf-8",
+    )
+    assert build_wheelhouse.siem_backends(str(siems)) == ["pysigma-backend-a", "pysigma-backend-c"]
+    assert "pysigma-backend-splunk" in build_wheelhouse.siem_backends(str(SCRIPT.parents[1] / build_wheelhouse.SIEMS_PATH))
@@ -0,0 +1,312 @@
+"""
+Conversion benchmarks for native CPython deployments.
+
+value_list_report() converts synthetic rules with large value lists (hashes,
+domains, command-line fragments) with and without value-list compaction and
+reports conversion time and output size per target:
+
+    python sigma_benchmark.py -n 1000 esql splunk
+
+evaluation_report() evaluates a synthetic rule pack against synthetic process
+creation events locally (see sigma_evaluation.py):
+
+    python sigma_benchmark.py --evaluate 1000000 --rules 100
+
+bulk_report() converts a synthetic rule pack with sigma_bulk.convert_rules()
+for several worker counts and reports the throughput and the speedup over a
+single worker:
+
+    python sigma_benchmark.py --bulk 2000 -j 1 -j 2 -j 4 splunk
+
+import_time_report() imports sigma_converter in a fresh interpreter and reports
+the time to the first conversion and the modules that took longest to import
+until then:
+
+    python sigma_benchmark.py --import-time splunk
+
+This module is not loaded by the web worker.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import yaml
+
+import sigma_bulk
+import sigma_converter
+import sigma_evaluation
+
+def value_list_rules(size: int) -> Dict[str, str]:
+    """
+    Synthetic rules with one value list of the given size each.
+
+    Returns:
+        Rule YAML by list kind
+    """
+    lists = {
+        "hashes": ("Hashes|contains", [f"SHA256={hashlib.sha256(str(i).encode()).hexdigest()}" for i in range(size)]),
+        "domains": ("QueryName|endswith", [f".host{i}.example{i % 7}.com" for i in range(size)]),
+        "command lines": ("CommandLine|contains", [f" -enc {i:06d}" for i in range(size)]),
+    }
+    return {
+        kind: yaml.safe_dump({
+            "title": f"Large value list ({kind})",
+            "logsource": {"product": "windows", "category": "process_creation"},
+            "detection": {"selection": {field: values}, "condition": "selection"},
+        })
+        for kind, (field, values) in lists.items()
+    }
+
+def _measure(rule_yaml: str, target: str, backend_options: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    best = None
+    for _ in range(repeat):
+        # Bypass the conversion caches, every run converts from scratch
+        sigma_converter._conversion_cache.clear()
+        sigma_converter._parsed_rule_cache.clear()
+        start = time.perf_counter()
+        try:
+            result = sigma_converter.convert_rule(rule_yaml, target, backend_options=backend_options)
+        except Exception as e:
+            return {"error": str(e)}
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    output = result if isinstance(result, (str, bytes)) else str(result)
+    return {"seconds": best, "size": len(output)}
+
+def value_list_report(targets: Optional[List[str]] = None, size: int = 1000, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Measure conversion time and output size with and without value-list compaction.
+
+    Args:
+        targets: Backend identifiers (defaults to all installed backends)
+        size: Number of values per list
+        repeat: Number of conversions per measurement, the fastest is reported
+
+    Returns:
+        One entry per target and list kind with "plain" and "compacted" measurements
+    """
+    report = []
+    for target in targets or sorted(sigma_converter.get_plugins().backends):
+        for kind, rule_yaml in value_list_rules(size).items():
+            report.append({
+                "target": target,
+                "kind": kind,
+                "plain": _measure(rule_yaml, target, {}, repeat),
+                "compacted": _measure(rule_yaml, target, {"compact_value_lists": True}, repeat),
+            })
+    return report
+
+_IMAGES = [
+    "C:\\Windows\\System32\\cmd.exe",
+    "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+    "C:\\Windows\\System32\\rundll32.exe",
+    "C:\\Windows\\System32\\svchost.exe",
+    "C:\\Windows\\explorer.exe",
+    "C:\\Program Files\\Mozilla Firefox\\firefox.exe",
+    "C:\\Users\\Public\\tool.exe",
+] + [f"C:\\Program Files\\Vendor{i}\\app{i}.exe" for i in range(200)]
+
+_ARGUMENTS = ["/c whoami", "-enc SQBFAFgA", "-nop -w hidden", "/s /q", "--type=renderer", "shell32.dll,Control_RunDLL", ""]
+
+_SUSPICIOUS = [f"-{name}{i}" for name in ("enc", "nop", "exec", "download", "hidden") for i in range(12)]
+
+def evaluation_events(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Synthetic process creation events.
+    """
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        image = rng.choice(_IMAGES)
+        events.append({
+            "EventID": 1,
+            "Image": image,
+            "ParentImage": rng.choice(_IMAGES),
+            "CommandLine": f'"{image}" {rng.choice(_ARGUMENTS)} {rng.randrange(10000)}',
+            "User": rng.choice(["NT AUTHORITY\\SYSTEM", "CORP\\alice", "CORP\\bob"]),
+            "IntegrityLevel": rng.choice(["High", "Medium", "System"]),
+        })
+    return events
+
+def evaluation_rules(count: int, seed: int = 0) -> List[str]:
+    """
+    Synthetic process creation rules in the style of the SigmaHQ rule set.
+    """
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        image = rng.choice(_IMAGES).rsplit("\\", 1)[1]
+        detection = {
+            "selection_img": {"Image|endswith": ["\\" + image, f"\\{image[:-4]}{i}.exe"]},
+            "selection_cli": {"CommandLine|contains": rng.sample(_ARGUMENTS[:-1], 2) + [f"-arg{i}"]},
+            "filter": {"ParentImage|startswith": "C:\\Program Files\\", "User|contains": rng.choice(["alice", "bob"])},
+            "condition": "all of selection_* and not filter",
+        }
+        if i % 4 == 0:
+            detection["selection_cli"]["CommandLine|re"] = f"[0-9]{{{1 + i % 4}}}$"
+        if i % 5 == 0:
+            detection["selection_cli"]["CommandLine|contains"] += rng.sample(_SUSPICIOUS, 20)
+        rules.append(yaml.safe_dump({
+            "title": f"Synthetic rule {i}",
+            "logsource": {"product": "windows", "category": "process_creation"},
+            "detection": detection,
+        }))
+    return rules
+
+def evaluation_report(events: int = 1_000_000, rules: int = 100, batch_size: int = sigma_evaluation.DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Evaluate a synthetic rule pack against synthetic events.
+
+    Returns:
+        Report of sigma_evaluation.evaluate_rules() with the compile time and the
+        number of leaves and distinct atoms of the rule pack added
+    """
+    start = time.perf_counter()
+    atom_index = sigma_evaluation.AtomIndex()
+    plans, errors = sigma_evaluation.compile_rules(evaluation_rules(rules), atom_index=atom_index)
+    compile_seconds = time.perf_counter() - start
+    if errors:
+        raise ValueError(errors)
+    report = sigma_evaluation.evaluate_rules(plans, evaluation_events(events), batch_size, samples=0)
+    report["compile_seconds"] = compile_seconds
+    report["leaves"] = atom_index.leaves
+    report["atoms"] = len(atom_index.atoms)
+    return report
+
+def bulk_report(target: str = "splunk", rules: int = 2000, workers: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Convert a synthetic rule pack in bulk with different numbers of worker processes.
+
+    Args:
+        target: Target backend identifier
+        rules: Number of rules
+        workers: Worker counts to measure (default: 1, 2, 4, ... up to the CPU count)
+
+    Returns:
+        One entry per worker count with the seconds, rules per second and the
+        speedup over the first measured worker count
+    """
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = [1]
+        while workers[-1] * 2 <= cpus:
+            workers.append(workers[-1] * 2)
+    rule_yamls = evaluation_rules(rules)
+    report = []
+    for max_workers in workers:
+        start = time.perf_counter()
+        results = sigma_bulk.convert_rules(rule_yamls, target, max_workers=max_workers)
+        seconds = time.perf_counter() - start
+        errors = [result["error"] for result in results if "error" in result]
+        if errors:
+            raise ValueError(errors[:5])
+        report.append({
+            "workers": max_workers,
+            "seconds": seconds,
+            "rules_per_second": rules / seconds,
+            "speedup": report[0]["seconds"] / seconds if report else 1.0,
+        })
+    return report
+
+_IMPORT_TIME_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import sigma_converter
+imported = time.perf_counter()
+rule = "title: t\\nlogsource:\\n  product: windows\\ndetection:\\n  sel:\\n    Image: x\\n  condition: sel\\n"
+sigma_converter.convert_rule(rule, {target!r})
+converted = time.perf_counter()
+print(json.dumps({{"import_seconds": imported - start, "first_conversion_seconds": converted - imported}}))
+"""
+
+def import_time_report(target: str = "splunk", top: int = 20) -> Dict[str, Any]:
+    """
+    Import sigma_converter in a fresh interpreter with -X importtime.
+
+    Args:
+        target: Backend identifier of the first conversion
+        top: Number of modules to report
+
+    Returns:
+        Import and first conversion seconds and the modules with the longest
+        cumulative import time until the first conversion finished as
+        (module, seconds) pairs
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_TIME_SCRIPT.format(target=target)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|", 2)
+        if cumulative.strip().isdigit():
+            modules.append((module.strip(), int(cumulative) / 1_000_000))
+    report = json.loads(result.stdout.splitlines()[-1])
+    report["modules"] = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+    return report
+
+def _format_measurement(measurement: Dict[str, Any]) -> str:
+    if "error" in measurement:
+        return "error"
+    return f"{measurement['seconds'] * 1000:8.1f} ms {measurement['size']:>10,} B"
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark conversion of rules with large value lists.")
+    parser.add_argument("targets", nargs="*", help="Target backend identifiers (default: all)")
+    parser.add_argument("-n", "--size", type=int, default=1000, help="Number of values per list")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Conversions per measurement")
+    parser.add_argument("--evaluate", type=int, metavar="EVENTS", help="Benchmark local evaluation over this many events")
+    parser.add_argument("--rules", type=int, default=100, help="Number of rules for --evaluate")
+    parser.add_argument("--import-time", action="store_true", help="Report the import time of sigma_converter")
+    parser.add_argument("--bulk", type=int, metavar="RULES", help="Benchmark bulk conversion of this many rules")
+    parser.add_argument("-j", "--workers", type=int, action="append", help="Worker count for --bulk, repeatable")
+    args = parser.parse_args(argv)
+
+    if args.bulk:
+        print(f"{'workers':>8}{'seconds':>10}{'rules/s':>10}{'speedup':>9}")
+        for entry in bulk_report(*args.targets[:1], rules=args.bulk, workers=args.workers):
+            print(f"{entry['workers']:>8}{entry['seconds']:>10.2f}{entry['rules_per_second']:>10.0f}{entry['speedup']:>8.2f}x")
+        return 0
+
+    if args.import_time:
+        report = import_time_report(*args.targets[:1])
+        print(
+            f"import {report['import_seconds'] * 1000:.1f} ms, "
+            f"first conversion {report['first_conversion_seconds'] * 1000:.1f} ms"
+        )
+        for module, seconds in report["modules"]:
+            print(f"{seconds * 1000:10.1f} ms  {module}")
+        return 0
+
+    if args.evaluate:
+        report = evaluation_report(args.evaluate, args.rules)
+        matches = sum(result["matches"] for result in report["rules"])
+        print(
+            f"{args.rules} rules ({report['leaves']} leaves, {report['atoms']} distinct) compiled in "
+            f"{report['compile_seconds']:.2f}s, "
+            f"{report['events']:,} events evaluated in {report['seconds']:.2f}s, {matches:,} matches"
+        )
+        return 0
+
+    print(f"{'target':<14}{'list':<15}{'plain':>26}{'compacted':>26}")
+    for entry in value_list_report(args.targets, args.size, args.repeat):
+        print(
+            f"{entry['target']:<14}{entry['kind']:<15}"
+            f"{_format_measurement(entry['plain']):>26}{_format_measurement(entry['compacted']):>26}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
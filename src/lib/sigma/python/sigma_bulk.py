@@ -0,0 +1,549 @@
+"""
+Bulk conversion of many Sigma rules for native CPython deployments.
+
+The browser build runs sigma_converter.py inside a single Pyodide worker and
+converts one rule per request. When the converter is used from a regular
+Python installation, e.g. to convert a whole rule repository in CI, the
+per-rule setup (plugin discovery, pipeline resolution, backend construction)
+dominates. This module resolves pipelines and builds the backend once per
+worker process and spreads the rules over a process pool.
+
+convert_tree() additionally keeps a manifest next to the outputs so that
+only rules whose inputs changed are converted again.
+
+This module is not loaded by the web worker.
+"""
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import sigma_converter
+from sigma.exceptions import SigmaError
+
+# Per-process conversion state, populated by _init_worker()
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(
+    target: str,
+    pipeline_names: Optional[List[str]],
+    pipeline_ymls: Optional[List[str]],
+    filter_yml: Optional[str],
+    format: str,
+    correlation_method: Optional[str],
+    backend_options: Optional[Dict[str, Any]],
+    skip_unsupported: bool,
+    time_budget: Optional[float] = None,
+    cancel_flag=None,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False,
+) -> None:
+    """
+    Build the processing pipeline and backend once for the current process.
+    """
+    sigma_converter.set_cancel_flag(cancel_flag)
+    processing_pipeline = sigma_converter.build_processing_pipeline(pipeline_names, pipeline_ymls, optimize_pipeline)
+    backend = sigma_converter.create_backend(
+        target,
+        processing_pipeline,
+        format=format,
+        correlation_method=correlation_method,
+        backend_options=backend_options,
+        skip_unsupported=skip_unsupported,
+    )
+    _worker_state.update(
+        backend=backend,
+        filter_yml=filter_yml,
+        format=format,
+        correlation_method=correlation_method,
+        skip_unsupported=skip_unsupported,
+        time_budget=time_budget,
+        simplify_conditions=simplify_conditions,
+    )
+
+def _convert_one(rule_yaml: str) -> Dict[str, Any]:
+    """
+    Convert a single rule with the backend of the current process.
+
+    Returns:
+        {"result": ...} on success or {"error": "..."} on failure; cancelled
+        conversions and conversions exceeding the time budget additionally
+        carry "status" ("cancelled" or "budget_exceeded"). Successful conversions
+        with an optimized pipeline report the rule condition evaluations answered
+        from the log source memo in "evaluations_saved".
+    """
+    time_budget = _worker_state["time_budget"]
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    saved = sigma_converter.applicability_stats()["saved"]
+    try:
+        sigma_converter.check_cancelled(deadline)
+        rule_collection = sigma_converter.load_rule_collection(rule_yaml, _worker_state["filter_yml"])
+        if _worker_state["simplify_conditions"]:
+            sigma_converter.simplify_rule_conditions(rule_collection)
+        result = sigma_converter.convert_collection(
+            _worker_state["backend"],
+            rule_collection,
+            _worker_state["format"],
+            _worker_state["correlation_method"],
+            _worker_state["skip_unsupported"],
+            deadline,
+        )
+        entry = {"result": result}
+        saved = sigma_converter.applicability_stats()["saved"] - saved
+        if saved:
+            entry["evaluations_saved"] = saved
+        return entry
+    except (sigma_converter.ConversionCancelled, sigma_converter.ConversionBudgetExceeded) as e:
+        return {"error": str(e), "status": e.status}
+    except Exception as e:
+        return {"error": str(e)}
+
+def _convert_chunk(rule_yamls: Sequence[str]) -> List[Dict[str, Any]]:
+    return [_convert_one(rule_yaml) for rule_yaml in rule_yamls]
+
+def _chunks(items: Sequence[str], chunk_size: int) -> Iterable[Sequence[str]]:
+    for i in range(0, len(items), chunk_size):
+        yield items[i:i + chunk_size]
+
+def convert_rules(
+    rule_yamls: Sequence[str],
+    target: str,
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    filter_yml: str = None,
+    format: str = "default",
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False,
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    cancel_flag=None,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Convert many Sigma rules with the same target and pipelines.
+
+    Configuration errors (unknown backend, pipeline or format) are raised
+    before any worker is started. Errors of individual rules are reported in
+    the result list and do not abort the run.
+
+    Args:
+        rule_yamls: YAML strings, one per rule file
+        target: Target backend identifier
+        pipeline_names: Optional list of built-in pipeline names
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        filter_yml: Optional YAML containing filter definitions
+        format: Output format for the backend
+        correlation_method: Optional correlation method
+        backend_options: Optional backend-specific options
+        skip_unsupported: Skip rules that can't be handled by the backend
+        max_workers: Number of worker processes (defaults to the CPU count);
+            1 converts in the calling process
+        chunk_size: Number of rules sent to a worker at once
+        time_budget: Optional wall-clock time in seconds allowed per rule
+        cancel_flag: Optional shared integer, e.g. multiprocessing.Array("i", 1);
+            once its first element is set, the remaining rules are reported as cancelled
+        simplify_conditions: Simplify condition trees before conversion
+        optimize_pipeline: Optimize the pipeline (see sigma_converter.optimize_processing_pipeline())
+
+    Returns:
+        One {"result": ...} or {"error": "..."} dict per input rule, in input order
+    """
+    rule_yamls = list(rule_yamls)
+    init_args = (
+        target,
+        pipeline_names,
+        pipeline_ymls,
+        filter_yml,
+        format,
+        correlation_method,
+        backend_options,
+        skip_unsupported,
+        time_budget,
+        cancel_flag,
+        simplify_conditions,
+        optimize_pipeline,
+    )
+
+    # Validate the configuration in this process so that errors surface once
+    _init_worker(*init_args)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(rule_yamls)))
+    if max_workers == 1:
+        return _convert_chunk(rule_yamls)
+
+    if chunk_size is None:
+        # A few chunks per worker keeps the load balanced without paying IPC per rule
+        chunk_size = max(1, len(rule_yamls) // (max_workers * 4))
+
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=init_args,
+    ) as executor:
+        for chunk_results in executor.map(_convert_chunk, _chunks(rule_yamls, chunk_size)):
+            results.extend(chunk_results)
+    return results
+
+MANIFEST_NAME = ".sigma-manifest.json"
+MANIFEST_VERSION = 1
+
+def _pipeline_version(name: str) -> str:
+    pipeline = sigma_converter.get_plugins().pipelines.get(name)
+    if pipeline is None:
+        # Not a plugin pipeline, e.g. a pipeline file path resolved by pySigma; its content is the version
+        try:
+            return _hash_text(pathlib.Path(name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return name
+    func = getattr(pipeline, "func", pipeline)
+    return sigma_converter.module_distribution(func.__module__)
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def conversion_fingerprint(
+    target: str,
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    filter_yml: str = None,
+    format: str = "default",
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False,
+) -> str:
+    """
+    Hash everything besides the rule itself that influences a conversion result.
+
+    This covers the pySigma, backend and pipeline package versions, the custom
+    pipeline and filter contents and all conversion options.
+
+    Returns:
+        Hex digest identifying the conversion configuration
+    """
+    try:
+        backend_class = sigma_converter.get_plugins().backends[target]
+    except KeyError:
+        raise SigmaError(f"Backend '{target}' is not installed or does not exist.")
+    config = {
+        "pysigma": importlib.metadata.version("pysigma"),
+        "target": target,
+        "backend": sigma_converter.module_distribution(backend_class.__module__),
+        "pipelines": [[name, _pipeline_version(name)] for name in pipeline_names or ()],
+        "pipeline_ymls": [_hash_text(pipeline_yml) for pipeline_yml in pipeline_ymls or () if pipeline_yml],
+        "filter": _hash_text(filter_yml) if filter_yml else None,
+        "format": format,
+        "correlation_method": correlation_method,
+        "backend_options": backend_options or {},
+        "skip_unsupported": skip_unsupported,
+        "simplify_conditions": simplify_conditions,
+        "optimize_pipeline": optimize_pipeline,
+    }
+    return _hash_text(json.dumps(config, sort_keys=True, default=str))
+
+def _load_manifest(path: pathlib.Path) -> Dict[str, Any]:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def _write_manifest(path: pathlib.Path, manifest: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def _write_result(output_dir: pathlib.Path, rule_path: str, result: Any) -> str:
+    """
+    Write a conversion result below output_dir, mirroring the rule's relative path.
+
+    Returns:
+        The output path relative to output_dir
+    """
+    if isinstance(result, bytes):
+        suffix = ".bin"
+    elif isinstance(result, str):
+        suffix = ".txt"
+    else:
+        suffix = ".json"
+    output_path = pathlib.PurePosixPath(rule_path).with_suffix(suffix).as_posix()
+    file = output_dir / output_path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(result, bytes):
+        file.write_bytes(result)
+    elif isinstance(result, str):
+        file.write_text(result, encoding="utf-8")
+    else:
+        file.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+    return output_path
+
+def _remove_output(output_dir: pathlib.Path, output_path: str) -> None:
+    file = output_dir / output_path
+    try:
+        file.unlink()
+    except FileNotFoundError:
+        return
+    # Drop directories that became empty, but never output_dir itself
+    parent = file.parent
+    while parent != output_dir and output_dir in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+
+def convert_tree(
+    rule_dir: str,
+    output_dir: str,
+    target: str,
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    filter_yml: str = None,
+    format: str = "default",
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False,
+    max_workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False,
+) -> Dict[str, Any]:
+    """
+    Incrementally convert all rules below rule_dir into output_dir.
+
+    A manifest in output_dir records, per rule file, a hash of the rule
+    content and the conversion fingerprint together with the produced output,
+    as well as the target and its backend distribution.
+    Rules whose hash is unchanged (and whose output still exists) are not
+    converted again, outputs of deleted rules are removed.
+
+    Args:
+        rule_dir: Directory containing .yml/.yaml rule files
+        output_dir: Directory receiving the outputs and the manifest
+        target: Target backend identifier
+        pipeline_names: Optional list of built-in pipeline names
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        filter_yml: Optional YAML containing filter definitions
+        format: Output format for the backend
+        correlation_method: Optional correlation method
+        backend_options: Optional backend-specific options
+        skip_unsupported: Skip rules that can't be handled by the backend
+        max_workers: Number of worker processes used for changed rules
+        time_budget: Optional wall-clock time in seconds allowed per rule
+        simplify_conditions: Simplify condition trees before conversion
+        optimize_pipeline: Optimize the pipeline (see sigma_converter.optimize_processing_pipeline())
+
+    Returns:
+        Summary with the lists "converted", "unchanged" and "removed" (rule
+        paths relative to rule_dir), "errors" mapping rule paths to messages and
+        "evaluations_saved" (see _convert_one())
+    """
+    rule_root = pathlib.Path(rule_dir)
+    output_root = pathlib.Path(output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_root / MANIFEST_NAME
+
+    fingerprint = conversion_fingerprint(
+        target,
+        pipeline_names,
+        pipeline_ymls,
+        filter_yml,
+        format,
+        correlation_method,
+        backend_options,
+        skip_unsupported,
+        simplify_conditions,
+        optimize_pipeline,
+    )
+    old_entries: Dict[str, Dict[str, Any]] = _load_manifest(manifest_path).get("rules", {})
+    new_entries: Dict[str, Dict[str, Any]] = {}
+    pending: List[Tuple[str, str, str]] = []
+    summary: Dict[str, Any] = {"converted": [], "unchanged": [], "removed": [], "errors": {}, "evaluations_saved": 0}
+
+    for file in _collect_rule_files([str(rule_root)]):
+        rule_path = file.relative_to(rule_root).as_posix()
+        rule_yaml = file.read_text(encoding="utf-8")
+        rule_hash = _hash_text(fingerprint + "\0" + rule_yaml)
+        entry = old_entries.get(rule_path)
+        if (
+            entry is not None
+            and entry.get("hash") == rule_hash
+            and (entry.get("output") is None or (output_root / entry["output"]).is_file())
+        ):
+            new_entries[rule_path] = entry
+            summary["unchanged"].append(rule_path)
+            if "error" in entry:
+                summary["errors"][rule_path] = entry["error"]
+        else:
+            pending.append((rule_path, rule_hash, rule_yaml))
+
+    if pending:
+        results = convert_rules(
+            [rule_yaml for _, _, rule_yaml in pending],
+            target,
+            pipeline_names=pipeline_names,
+            pipeline_ymls=pipeline_ymls,
+            filter_yml=filter_yml,
+            format=format,
+            correlation_method=correlation_method,
+            backend_options=backend_options,
+            skip_unsupported=skip_unsupported,
+            max_workers=max_workers,
+            time_budget=time_budget,
+            simplify_conditions=simplify_conditions,
+            optimize_pipeline=optimize_pipeline,
+        )
+        for (rule_path, rule_hash, _), result in zip(pending, results):
+            if "status" in result:
+                # Cancelled or out of time: not a property of the rule, retry on the next run
+                summary["errors"][rule_path] = result["error"]
+                if rule_path in old_entries:
+                    new_entries[rule_path] = old_entries[rule_path]
+                continue
+            entry = {"hash": rule_hash, "output": None}
+            if "error" in result:
+                entry["error"] = result["error"]
+                summary["errors"][rule_path] = result["error"]
+            else:
+                entry["output"] = _write_result(output_root, rule_path, result["result"])
+            old_output = old_entries.get(rule_path, {}).get("output")
+            if old_output and old_output != entry["output"]:
+                _remove_output(output_root, old_output)
+            new_entries[rule_path] = entry
+            summary["converted"].append(rule_path)
+            summary["evaluations_saved"] += result.get("evaluations_saved", 0)
+
+    # Prune outputs of rules that no longer exist
+    for rule_path, entry in old_entries.items():
+        if rule_path not in new_entries:
+            if entry.get("output"):
+                _remove_output(output_root, entry["output"])
+            summary["removed"].append(rule_path)
+
+    # The target and backend distribution tell sigma_provisioning.py what this output needs
+    backend_class = sigma_converter.get_plugins().backends[target]
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "target": target,
+        "backend": sigma_converter.module_distribution(backend_class.__module__).split("==")[0],
+        "rules": new_entries,
+    }
+    _write_manifest(manifest_path, manifest)
+    return summary
+
+def _collect_rule_files(paths: Sequence[str]) -> List[pathlib.Path]:
+    files: List[pathlib.Path] = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in (".yml", ".yaml")))
+        else:
+            files.append(path)
+    return files
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert Sigma rules in bulk using a process pool.")
+    parser.add_argument("target", help="Target backend identifier")
+    parser.add_argument("paths", nargs="+", help="Rule files or directories")
+    parser.add_argument("-p", "--pipeline", action="append", default=[], help="Built-in pipeline name")
+    parser.add_argument("--pipeline-file", action="append", default=[], help="Custom pipeline YAML file")
+    parser.add_argument("--filter-file", help="Filter YAML file")
+    parser.add_argument("-f", "--format", default="default", help="Output format")
+    parser.add_argument("-c", "--correlation-method", help="Correlation method")
+    parser.add_argument("-s", "--skip-unsupported", action="store_true", help="Skip unsupported rules")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes")
+    parser.add_argument("-t", "--time-budget", type=float, help="Maximum conversion time per rule in seconds")
+    parser.add_argument("--simplify", action="store_true", help="Simplify rule conditions before conversion")
+    parser.add_argument(
+        "--optimize-pipeline", action="store_true",
+        help="Fuse field mapping items and memoize log source conditions of the pipeline",
+    )
+    parser.add_argument("-o", "--output", help="Directory for converted rules (default: stdout)")
+    parser.add_argument(
+        "-i", "--incremental", action="store_true",
+        help="Only reconvert changed rules, tracked by a manifest in the output directory",
+    )
+    args = parser.parse_args(argv)
+
+    if args.incremental and (not args.output or len(args.paths) != 1 or not pathlib.Path(args.paths[0]).is_dir()):
+        parser.error("--incremental requires --output and a single rule directory")
+
+    options = dict(
+        pipeline_names=args.pipeline,
+        pipeline_ymls=[pathlib.Path(p).read_text(encoding="utf-8") for p in args.pipeline_file],
+        filter_yml=pathlib.Path(args.filter_file).read_text(encoding="utf-8") if args.filter_file else None,
+        format=args.format,
+        correlation_method=args.correlation_method,
+        skip_unsupported=args.skip_unsupported,
+        max_workers=args.workers,
+        time_budget=args.time_budget,
+        simplify_conditions=args.simplify,
+        optimize_pipeline=args.optimize_pipeline,
+    )
+
+    if args.incremental:
+        try:
+            summary = convert_tree(args.paths[0], args.output, args.target, **options)
+        except SigmaError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        for rule_path, error in summary["errors"].items():
+            print(f"{rule_path}: {error}", file=sys.stderr)
+        print(
+            f"{len(summary['converted'])} converted, {len(summary['unchanged'])} unchanged, "
+            f"{len(summary['removed'])} removed, {len(summary['errors'])} failed",
+            file=sys.stderr,
+        )
+        if args.optimize_pipeline:
+            print(f"{summary['evaluations_saved']} rule condition evaluations saved", file=sys.stderr)
+        return 1 if summary["errors"] else 0
+
+    files = _collect_rule_files(args.paths)
+    # Mirror the paths below the common root of the inputs, as convert_tree() does for its rule_dir,
+    # so that rules with the same file name in different directories do not overwrite each other
+    roots = [path if path.is_dir() else path.parent for path in map(pathlib.Path, args.paths)]
+    output_root = os.path.commonpath([os.path.abspath(root) for root in roots])
+    try:
+        results = convert_rules([f.read_text(encoding="utf-8") for f in files], args.target, **options)
+    except SigmaError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    output_dir = pathlib.Path(args.output) if args.output else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    for file, entry in zip(files, results):
+        if "error" in entry:
+            failed += 1
+            print(f"{file}: {entry['error']}", file=sys.stderr)
+            continue
+        result = entry["result"]
+        if output_dir is None:
+            print(result if isinstance(result, str) else json.dumps(result, default=str))
+        else:
+            rule_path = pathlib.Path(os.path.relpath(os.path.abspath(file), output_root)).as_posix()
+            _write_result(output_dir, rule_path, result)
+
+    if args.optimize_pipeline:
+        saved = sum(entry.get("evaluations_saved", 0) for entry in results)
+        print(f"{saved} rule condition evaluations saved", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
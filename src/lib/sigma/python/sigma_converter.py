@@ -1,7 +1,21 @@
+import contextlib
+import copy
+import dataclasses
+import gzip
+import hashlib
+import importlib.metadata
+import itertools
 import json
+import os
 import pathlib
+import pickle
+import re
 import textwrap
-from typing import Sequence, List, Dict, Any, Union, Optional
+import time
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Sequence, List, Dict, Any, Union, Optional, Tuple
 import sys
 import yaml
 
@@ -12,42 +26,166 @@ if not hasattr(yaml, 'CSafeLoader'):
 if not hasattr(yaml, 'CDumper'):
     yaml.CDumper = yaml.Dumper
 
-from sigma.collection import SigmaCollection
-from sigma.conversion.base import Backend
+from sigma.conditions import (
+    ConditionAND,
+    ConditionFieldEqualsValueExpression,
+    ConditionItem,
+    ConditionNOT,
+    ConditionOR,
+    ConditionValueExpression,
+    SigmaCondition,
+)
 from sigma.exceptions import (
     SigmaError,
     SigmaPipelineNotAllowedForBackendError,
     SigmaPipelineNotFoundError,
 )
-from sigma.processing.pipeline import ProcessingPipeline
-from sigma.rule import SigmaRule
-
-# Pyodide compatibility: Mock MITRE ATT&CK data loading BEFORE importing plugins
-# The elasticsearch backend tries to load MITRE ATT&CK data using urllib which doesn't work in Pyodide
-import sigma.data.mitre_attack
-# Monkey-patch the _load_mitre_attack_data function to return mock data
-def _mock_load_mitre_attack_data():
-    return {
-        'techniques': {},
-        'tactics': {},
-        'groups': {},
-        'software': {}
-    }
-sigma.data.mitre_attack._load_mitre_attack_data = _mock_load_mitre_attack_data
-sigma.data.mitre_attack._cached_data = None  # Reset cache so it uses our mock function
+from sigma.processing.conditions import (
+    LogsourceCondition,
+    RuleAttributeCondition,
+    RuleTagCondition,
+)
+from sigma.processing.pipeline import ProcessingItem, ProcessingPipeline
+from sigma.processing.transformations import FieldMappingTransformation, FieldPrefixMappingTransformation
+from sigma.processing.transformations.base import DetectionItemTransformation, FieldMappingTransformationBase
+from sigma.correlations import SigmaCorrelationRule
+from sigma.rule import SigmaDetection, SigmaRule
+from sigma.types import (
+    SigmaFieldReference,
+    SigmaNull,
+    SigmaNumber,
+    SigmaRegularExpression,
+    SigmaRegularExpressionFlag,
+    SigmaString,
+    SpecialChars,
+)
+
+# The rule collection, backend base class, plugin discovery and ATT&CK data
+# modules are imported on first use: loading this module has to stay cheap as
+# the web worker reports ready only after it ran.
+if TYPE_CHECKING:
+    from sigma.collection import SigmaCollection
+    from sigma.conversion.base import Backend
+    from sigma.plugins import InstalledSigmaPlugins
+
+# MITRE ATT&CK data
+#
+# pySigma downloads the ATT&CK STIX bundle with urllib, which doesn't work in
+# Pyodide. Instead, the data is read from a snapshot built by
+# scripts/generate-attack-data.py: a gzip-compressed JSON object with the keys
+# of sigma.data.mitre_attack._load_mitre_attack_data() plus a format version.
+# The web worker writes it to the Pyodide file system and passes its path to
+# set_mitre_attack_snapshot(). It is only read on the first access to the data,
+# e.g. when the Elasticsearch backends add threat information to SIEM rules.
+
+MITRE_ATTACK_SNAPSHOT_FORMAT = 1
+
+_MITRE_ATTACK_KEYS = (
+    "mitre_attack_tactics",
+    "mitre_attack_techniques",
+    "mitre_attack_techniques_tactics_mapping",
+    "mitre_attack_intrusion_sets",
+    "mitre_attack_software",
+    "mitre_attack_datasources",
+    "mitre_attack_mitigations",
+)
+
+# Path of the snapshot, None without one
+_mitre_attack_snapshot: Optional[str] = None
+# Data loaded from the snapshot
+_mitre_attack_data: Optional[Dict[str, Any]] = None
+
+def set_mitre_attack_snapshot(path: Optional[str]) -> None:
+    """
+    Use the ATT&CK snapshot at the given path, it is read on first use.
+
+    Args:
+        path: Snapshot file, None for empty ATT&CK data
+    """
+    global _mitre_attack_snapshot, _mitre_attack_data
+    if path == _mitre_attack_snapshot:
+        return
+    _mitre_attack_snapshot = path
+    _mitre_attack_data = None
+    # Cached conversions may have been enriched with other data
+    _conversion_cache.clear()
+    _cache_versions.clear()
 
-# Also create the module-level attributes that backends try to import
-sigma.data.mitre_attack.mitre_attack_tactics = {}
-sigma.data.mitre_attack.mitre_attack_techniques = {}
-sigma.data.mitre_attack.mitre_attack_groups = {}
-sigma.data.mitre_attack.mitre_attack_software = {}
+def _load_mitre_attack_snapshot() -> Dict[str, Any]:
+    """
+    Replacement of sigma.data.mitre_attack._load_mitre_attack_data() reading the snapshot.
 
-from sigma.plugins import InstalledSigmaPlugins
-from sigma.processing.resolver import ProcessingPipelineResolver
+    pySigma calls it on each access to one of the mitre_attack_* module
+    attributes, the snapshot is only read the first time.
 
-# Discover plugins at module level (like sigma-cli does)
-plugins = InstalledSigmaPlugins.autodiscover()
-backends = plugins.backends
+    Returns:
+        Dictionaries with ATT&CK names by ID, empty without a snapshot or
+        if the snapshot can not be decoded
+    """
+    global _mitre_attack_data
+    if _mitre_attack_data is None:
+        data: Dict[str, Any] = {"mitre_attack_version": "unknown"}
+        data.update((key, {}) for key in _MITRE_ATTACK_KEYS)
+        if _mitre_attack_snapshot is not None:
+            try:
+                with open(_mitre_attack_snapshot, "rb") as f:
+                    content = f.read()
+                # Web servers may have removed the compression already (Content-Encoding: gzip)
+                if content[:2] == b"\x1f\x8b":
+                    content = gzip.decompress(content)
+                snapshot = json.loads(content)
+                if not isinstance(snapshot, dict) or snapshot.get("format") != MITRE_ATTACK_SNAPSHOT_FORMAT:
+                    raise ValueError("unsupported snapshot format")
+            except (OSError, EOFError, ValueError) as e:
+                # E.g. an HTML error page served in place of the snapshot, conversions
+                # then go on without ATT&CK names like without a snapshot
+                warnings.warn(f"Ignoring unreadable MITRE ATT&CK snapshot {_mitre_attack_snapshot}: {e}")
+            else:
+                data.update((key, snapshot[key]) for key in list(data) if key in snapshot)
+        # Name of the intrusion sets in pySigma before 1.0, still imported by some backends
+        data["mitre_attack_groups"] = data["mitre_attack_intrusion_sets"]
+        _mitre_attack_data = data
+    return _mitre_attack_data
+
+def _patch_mitre_attack() -> None:
+    """
+    Pyodide compatibility: Replace MITRE ATT&CK data loading BEFORE importing plugins.
+    """
+    import sigma.data.mitre_attack
+    sigma.data.mitre_attack._load_mitre_attack_data = _load_mitre_attack_snapshot
+
+# Installed plugins, discovered by get_plugins()
+_plugins: Optional["InstalledSigmaPlugins"] = None
+
+def get_plugins() -> "InstalledSigmaPlugins":
+    """
+    Installed backends and pipelines, discovered on first use (like sigma-cli does at startup).
+
+    Validators are not discovered, the converter doesn't use them.
+    """
+    global _plugins
+    if _plugins is None:
+        _patch_mitre_attack()
+        from sigma.plugins import InstalledSigmaPlugins
+        _plugins = InstalledSigmaPlugins.autodiscover(include_validators=False)
+    return _plugins
+
+def refresh_plugins() -> None:
+    """
+    Discover plugins again on next use, e.g. after a backend package was installed.
+    """
+    global _plugins
+    _plugins = None
+    _distribution_versions.clear()
+    _cache_versions.clear()
+
+def __getattr__(name: str) -> Any:
+    # sigma_converter.plugins and sigma_converter.backends trigger the discovery
+    if name == "plugins":
+        return get_plugins()
+    if name == "backends":
+        return get_plugins().backends
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_available_pipelines(backend: str = ""):
     """
@@ -55,7 +193,8 @@ def get_available_pipelines(backend: str = ""):
     If backend is specified, only return pipelines that are compatible with that backend.
     """
     try:
-        available_pipelines = ProcessingPipelineResolver(InstalledSigmaPlugins.autodiscover().pipelines).list_pipelines()
+        from sigma.processing.resolver import ProcessingPipelineResolver
+        available_pipelines = ProcessingPipelineResolver(get_plugins().pipelines).list_pipelines()
 
         if backend:
             # Filter pipelines by backend compatibility
@@ -72,39 +211,881 @@ def get_available_pipelines(backend: str = ""):
     except Exception as e:
         import sys
         import traceback
-        print(f"Error getting pipelines: {e}")
+        print(f"Error getting pipelines: {e}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
         return []
 
-def convert_rule(
-    rule_yaml: str, 
-    target: str, 
+class ConversionCancelled(SigmaError):
+    """The conversion was cancelled through the cancellation flag."""
+    status = "cancelled"
+
+class ConversionBudgetExceeded(SigmaError):
+    """The conversion took longer than its time budget."""
+    status = "budget_exceeded"
+
+# Shared integer cancelling running conversions while its first element is non-zero
+_cancel_flag = None
+
+def set_cancel_flag(flag) -> None:
+    """
+    Register a shared integer that cancels running conversions when set to a non-zero value.
+
+    Conversions check the flag between their phases and between rules. In
+    Pyodide the flag is usually the Int32Array also passed to
+    pyodide.setInterruptBuffer(), which additionally interrupts long-running
+    Python code; the resulting KeyboardInterrupt is reported as
+    ConversionCancelled. The flag is not reset by the converter.
+
+    Args:
+        flag: Object supporting flag[0], e.g. an Int32Array or multiprocessing.Array("i", 1); None to unregister
+    """
+    global _cancel_flag
+    _cancel_flag = flag
+
+def _deadline(time_budget: Optional[float]) -> Optional[float]:
+    return None if time_budget is None else time.monotonic() + time_budget
+
+def check_cancelled(deadline: Optional[float] = None) -> None:
+    """
+    Raise ConversionCancelled if the cancellation flag is set, ConversionBudgetExceeded if deadline has passed.
+    """
+    if _cancel_flag is not None and _cancel_flag[0]:
+        raise ConversionCancelled("Conversion cancelled.")
+    if deadline is not None and time.monotonic() > deadline:
+        raise ConversionBudgetExceeded("Conversion exceeded its time budget.")
+
+def _checkpoint_callback(deadline: Optional[float]):
+    """
+    Backend.convert() callback checking for cancellation after each converted rule condition.
+    """
+    def checkpoint(rule, output_format, index, cond, result):
+        check_cancelled(deadline)
+        return result
+    return checkpoint
+
+# Top-level rule keys that are not read by query generation. They only influence
+# the result if the output format embeds rule metadata or a pipeline matches on them.
+DESCRIPTIVE_RULE_KEYS = frozenset((
+    "title",
+    "description",
+    "references",
+    "falsepositives",
+    "author",
+    "date",
+    "modified",
+    "license",
+    "related",
+    "tags",
+))
+CONVERSION_CACHE_SIZE = 64
+PARSED_RULE_CACHE_SIZE = 32
+OPTIMIZED_PIPELINE_CACHE_SIZE = 16
+PIPELINE_RULE_KEYS_CACHE_SIZE = 16
+
+# Results of recent conversions, keyed by rule_fingerprint()
+_conversion_cache: "OrderedDict[str, Any]" = OrderedDict()
+# Pickled pristine rule collections, keyed by (rule_yaml, filter_yml)
+_parsed_rule_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+# Optimized processing pipelines, keyed by the JSON of (pipeline_names, pipeline_ymls)
+_optimized_pipeline_cache: "OrderedDict[str, Optional[ProcessingPipeline]]" = OrderedDict()
+# Rule keys read by the pipelines of a conversion configuration (None: any key)
+_pipeline_rule_keys: "OrderedDict[str, Optional[frozenset]]" = OrderedDict()
+
+# Persistent cache
+#
+# The in-memory caches above start empty with every worker. When a directory
+# is configured with set_persistent_cache(), conversion results and processing
+# pipelines are also kept there (an IndexedDB-backed IDBFS mount in the web
+# worker), so a restarted worker shows previous results without converting.
+# Keys include the versions of pySigma, the backend and the pipeline packages,
+# entries of other versions are never read and age out of the cache.
+
+PERSISTENT_CACHE_SIZE = 64 * 1024 * 1024
+# Bump when a change of this module changes conversion results
+PERSISTENT_CACHE_VERSION = 1
+
+_MISSING = object()
+
+class PersistentCache:
+    """
+    Directory of pickled entries with a size limit and least recently used eviction.
+
+    Each entry is a file named after a hash of its key that holds the pickled
+    key and value. Files are written to a temporary name and renamed into
+    place, so concurrent readers never see partial entries. Reads update the
+    modification time, which orders the entries for eviction.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = PERSISTENT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Total size of the entries, computed on the first write
+        self._size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, f"{kind}-{hashlib.sha256(key.encode('utf-8')).hexdigest()}.pickle")
+
+    def get(self, kind: str, key: str) -> Any:
+        """
+        Returns:
+            The cached value, or _MISSING
+        """
+        path = self._path(kind, key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # Truncated or written by an incompatible version
+            self._remove(path)
+            return _MISSING
+        if stored_key != key:
+            return _MISSING
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        try:
+            content = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Values with unpicklable parts are only cached in memory
+            return
+        if len(content) > self.max_bytes:
+            return
+        path = self._path(kind, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Size of the entry that is replaced
+        replaced_size = 0
+        if self._size is not None:
+            try:
+                replaced_size = os.path.getsize(path)
+            except OSError:
+                pass
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        else:
+            self._size += len(content) - replaced_size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        # Evict down to 3/4 of the limit, so that not every write scans the directory
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, _, entry_size in entries)
+        for _, path, entry_size in entries:
+            if size <= self.max_bytes * 3 // 4:
+                break
+            self._remove(path)
+            size -= entry_size
+        self._size = size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for _, path, _ in self._entries():
+            self._remove(path)
+        self._size = 0
+
+_persistent_cache: Optional[PersistentCache] = None
+
+def set_persistent_cache(directory: Optional[str], max_bytes: int = PERSISTENT_CACHE_SIZE) -> None:
+    """
+    Keep conversion results and processing pipelines in a directory across restarts.
+
+    Args:
+        directory: Cache directory, None to only cache in memory
+        max_bytes: Size limit of the cache directory
+    """
+    global _persistent_cache
+    _persistent_cache = PersistentCache(directory, max_bytes) if directory is not None else None
+
+# "name==version" of installed pySigma distributions by normalized name, and of
+# the plugin distributions also by module path, e.g. "sigma/backends/splunk/splunk"
+_distribution_versions: Dict[str, str] = {}
+# Results of _package_versions() by target
+_cache_versions: Dict[Optional[str], str] = {}
+
+def _sigma_distribution_versions() -> Dict[str, str]:
+    if not _distribution_versions:
+        for dist in importlib.metadata.distributions():
+            name = dist.metadata["Name"] or ""
+            normalized_name = re.sub(r"[-_.]+", "-", name).lower()
+            if not normalized_name.startswith("pysigma"):
+                continue
+            version = f"{name}=={dist.version}"
+            _distribution_versions[normalized_name] = version
+            if normalized_name == "pysigma":
+                # Only plugins are looked up by module, skip the long file list of pySigma
+                continue
+            for file in dist.files or ():
+                if file.suffix == ".py":
+                    module_path = file.parent if file.name == "__init__.py" else file.with_suffix("")
+                    _distribution_versions[module_path.as_posix()] = version
+        # Not empty even without distribution metadata, to scan once
+        _distribution_versions.setdefault("", "")
+    return _distribution_versions
+
+def module_distribution(module_name: str) -> str:
+    """
+    "name==version" of the pySigma plugin distribution that provides a module.
+
+    Returns:
+        The distribution, or the module name if it is not part of one
+    """
+    versions = _sigma_distribution_versions()
+    module_path = module_name.replace(".", "/")
+    while module_path and module_path not in versions:
+        module_path = module_path.rpartition("/")[0]
+    return versions.get(module_path) or module_name
+
+def _package_versions(target: Optional[str] = None) -> str:
+    """
+    Versions that cached entries depend on: pySigma, the pipeline packages and,
+    for conversions, the backend of the target and the ATT&CK data.
+    """
+    if target not in _cache_versions:
+        versions = _sigma_distribution_versions()
+        packages = {version for version in versions.values() if version.lower().startswith(("pysigma==", "pysigma-pipeline"))}
+        attack_data = None
+        if target is not None:
+            backend_class = get_plugins().backends.get(target)
+            if backend_class is not None:
+                packages.add(module_distribution(backend_class.__module__))
+            if _mitre_attack_snapshot is not None:
+                try:
+                    with open(_mitre_attack_snapshot, "rb") as f:
+                        attack_data = hashlib.sha256(f.read()).hexdigest()
+                except OSError:
+                    attack_data = _mitre_attack_snapshot
+        _cache_versions[target] = json.dumps([PERSISTENT_CACHE_VERSION, target, sorted(packages), attack_data])
+    return _cache_versions[target]
+
+def _persistent_get(kind: str, key: str, target: Optional[str] = None) -> Any:
+    if _persistent_cache is None:
+        return _MISSING
+    return _persistent_cache.get(kind, _package_versions(target) + "\0" + key)
+
+def _persistent_put(kind: str, key: str, value: Any, target: Optional[str] = None) -> None:
+    if _persistent_cache is not None:
+        _persistent_cache.put(kind, _package_versions(target) + "\0" + key, value)
+
+def _embeds_rule_metadata(backend_class, format: str) -> bool:
+    """
+    Whether an output format may copy rule metadata (title, description, tags...) into the result.
+    Only the default format of backends that don't customize its output is known not to.
+    """
+    from sigma.conversion.base import Backend
+    return format != "default" or backend_class.finalize_output_default is not Backend.finalize_output_default
+
+def _pipelines_rule_keys(pipelines: Sequence[Optional[ProcessingPipeline]]) -> Optional[frozenset]:
+    """
+    Collect the rule keys that rule conditions of the given pipelines match on.
+
+    Returns:
+        The set of keys, or None if a pipeline may read arbitrary rule metadata
+        (postprocessing templates and finalizers)
+    """
+    keys = set()
+    for pipeline in pipelines:
+        if pipeline is None:
+            continue
+        if pipeline.postprocessing_items or pipeline.finalizers:
+            return None
+        for item in pipeline.items:
+            conditions = item.rule_conditions
+            if isinstance(conditions, dict):
+                conditions = conditions.values()
+            for condition in conditions:
+                if isinstance(condition, RuleTagCondition):
+                    keys.add("tags")
+                elif isinstance(condition, RuleAttributeCondition):
+                    keys.add(condition.attribute)
+    return frozenset(keys)
+
+def rule_fingerprint(
+    rule_yaml: str,
+    target: str,
     pipeline_names: List[str] = None,
     pipeline_ymls: List[str] = None,
     filter_yml: str = None,
     format: str = "default",
     correlation_method: Optional[str] = None,
     backend_options: Dict[str, Any] = None,
-    skip_unsupported: bool = False
-) -> Union[str, List[str], List[Dict], Dict, bytes]:
+    skip_unsupported: bool = False,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False
+) -> Optional[str]:
     """
-    Convert a Sigma rule to the target format with optional pipeline processing.
-    
+    Compute a fingerprint of everything that can influence the conversion of a rule.
+
+    Descriptive rule fields (see DESCRIPTIVE_RULE_KEYS) are left out unless the
+    output format embeds rule metadata or a pipeline matches on them, so edits
+    that only touch them yield the same fingerprint.
+
+    Returns:
+        The fingerprint, or None if the rule can't be fingerprinted (e.g. invalid YAML)
+    """
+    return _rule_fingerprint(
+        rule_yaml,
+        target,
+        pipeline_names,
+        pipeline_ymls,
+        filter_yml,
+        format,
+        correlation_method,
+        backend_options,
+        skip_unsupported,
+        simplify_conditions,
+        optimize_pipeline,
+    )[0]
+
+def _rule_fingerprint(
+    rule_yaml: str,
+    target: str,
+    pipeline_names: Optional[List[str]],
+    pipeline_ymls: Optional[List[str]],
+    filter_yml: Optional[str],
+    format: str,
+    correlation_method: Optional[str],
+    backend_options: Optional[Dict[str, Any]],
+    skip_unsupported: bool,
+    simplify_conditions: bool,
+    optimize_pipeline: bool
+) -> Tuple[Optional[str], Optional[list], Any]:
+    """
+    rule_fingerprint() that also hands out what it computed on the way, so a
+    conversion after a cache miss does not parse the rule or build the pipeline again.
+
+    Returns:
+        (fingerprint, parsed YAML documents or None, processing pipeline or _MISSING if it wasn't built)
+    """
+    processing_pipeline = _MISSING
+    backend_class = get_plugins().backends.get(target)
+    if backend_class is None:
+        return None, None, processing_pipeline
+    if isinstance(pipeline_names, str):
+        pipeline_names = [pipeline_names]
+    config = json.dumps(
+        [
+            target,
+            pipeline_names or [],
+            pipeline_ymls or [],
+            filter_yml,
+            format,
+            correlation_method,
+            backend_options or {},
+            skip_unsupported,
+            simplify_conditions,
+            optimize_pipeline,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+    if _embeds_rule_metadata(backend_class, format):
+        kept_keys = None
+    else:
+        pipeline_config = json.dumps([target, format, pipeline_names or [], pipeline_ymls or []])
+        if pipeline_config in _pipeline_rule_keys:
+            _pipeline_rule_keys.move_to_end(pipeline_config)
+        else:
+            try:
+                # Built as the conversion needs it, optimized pipelines keep the conditions of their items
+                processing_pipeline = build_processing_pipeline(pipeline_names, pipeline_ymls, optimize_pipeline)
+            except SigmaError:
+                return None, None, _MISSING
+            _pipeline_rule_keys[pipeline_config] = _pipelines_rule_keys((
+                processing_pipeline,
+                backend_class.backend_processing_pipeline,
+                backend_class.output_format_processing_pipeline.get(format),
+            ))
+            if len(_pipeline_rule_keys) > PIPELINE_RULE_KEYS_CACHE_SIZE:
+                _pipeline_rule_keys.popitem(last=False)
+        kept_keys = _pipeline_rule_keys[pipeline_config]
+
+    try:
+        documents = list(yaml.load_all(rule_yaml, Loader=yaml.CSafeLoader))
+    except yaml.YAMLError:
+        return None, None, processing_pipeline
+    fingerprinted = documents
+    if kept_keys is not None:
+        fingerprinted = [
+            {key: value for key, value in document.items() if key not in DESCRIPTIVE_RULE_KEYS or key in kept_keys}
+            if isinstance(document, dict) else document
+            for document in documents
+        ]
+    try:
+        fingerprint = json.dumps(fingerprinted, sort_keys=True, default=str)
+    except TypeError:
+        # Mappings with keys of mixed types can't be sorted; such rules are converted but not cached
+        return None, documents, processing_pipeline
+    return config + "\0" + fingerprint, documents, processing_pipeline
+
+# Condition simplification
+#
+# The condition tree of a rule is rebuilt from its detections every time it is
+# accessed (SigmaCondition.parsed), after the processing pipeline changed the
+# detections. SimplifiedSigmaCondition simplifies that tree on access, so
+# backends convert the simplified tree. All rewrites are boolean identities on
+# the leaf expressions (field/value and keyword matches), which are treated as
+# opaque atoms.
+
+def _value_key(value) -> Any:
+    if isinstance(value, SigmaNull):
+        return (SigmaNull,)
+    key = repr(value)
+    if " object at 0x" in key:
+        # No meaningful repr, never consider such values equal
+        return (type(value), id(value))
+    return (type(value), key)
+
+def _condition_key(cond, keys: Dict[int, Tuple[Any, Any]]) -> Any:
+    """
+    Structural key of a condition (sub)tree; AND and OR are commutative.
+
+    Keys are memoized in keys by object id together with the object itself. The
+    reference keeps the id from being reused by a node created (and freed) later
+    during the simplification, which would otherwise find a stale key.
+    """
+    entry = keys.get(id(cond))
+    if entry is not None:
+        return entry[1]
+    if isinstance(cond, ConditionFieldEqualsValueExpression):
+        key = ("field", cond.field, _value_key(cond.value))
+    elif isinstance(cond, ConditionValueExpression):
+        key = ("value", _value_key(cond.value))
+    elif isinstance(cond, ConditionNOT):
+        key = ("not", _condition_key(cond.args[0], keys))
+    elif isinstance(cond, (ConditionAND, ConditionOR)):
+        key = (type(cond).__name__, frozenset(_condition_key(arg, keys) for arg in cond.args))
+    else:
+        key = (type(cond), id(cond))
+    keys[id(cond)] = (cond, key)
+    return key
+
+def _term_keys(cond, operator, keys: Dict[int, Tuple[Any, Any]]) -> frozenset:
+    """
+    Keys of the terms of cond if it is an operator node, else of cond itself.
+    """
+    if isinstance(cond, operator):
+        return frozenset(_condition_key(arg, keys) for arg in cond.args)
+    return frozenset((_condition_key(cond, keys),))
+
+def _simplify(cond, keys: Dict[int, Tuple[Any, Any]]):
+    if isinstance(cond, ConditionNOT):
+        arg = _simplify(cond.args[0], keys)
+        if isinstance(arg, ConditionNOT):
+            # not not x = x
+            return arg.args[0]
+        return ConditionNOT([arg], cond.source)
+    if not isinstance(cond, (ConditionAND, ConditionOR)):
+        return cond
+    return _simplify_junction(type(cond), [_simplify(arg, keys) for arg in cond.args], cond.source, keys)
+
+def _simplify_junction(operator, args: List[Any], source, keys: Dict[int, Tuple[Any, Any]]):
+    dual = ConditionOR if operator is ConditionAND else ConditionAND
+
+    # Flatten nested junctions of the same kind and drop duplicate terms
+    terms = []
+    seen = set()
+    for arg in args:
+        for term in arg.args if isinstance(arg, operator) else (arg,):
+            key = _condition_key(term, keys)
+            if key not in seen:
+                seen.add(key)
+                terms.append(term)
+
+    # Absorption: a and (a or b) = a, a or (a and b) = a. A dual term is
+    # dropped if the terms of another term are a subset of its own terms.
+    term_sets = [_term_keys(term, dual, keys) for term in terms]
+    terms = [
+        term
+        for i, term in enumerate(terms)
+        if not (
+            isinstance(term, dual)
+            and any(j != i and term_sets[j] <= term_sets[i] for j in range(len(terms)))
+        )
+    ]
+
+    # Hoist factors common to all terms: (a and b) or (a and c) = a and (b or c)
+    if len(terms) > 1:
+        term_sets = [_term_keys(term, dual, keys) for term in terms]
+        common = frozenset.intersection(*term_sets)
+        if common:
+            first = terms[0]
+            common_terms = [
+                arg for arg in (first.args if isinstance(first, dual) else (first,))
+                if _condition_key(arg, keys) in common
+            ]
+            rests = []
+            for term in terms:
+                rest = [
+                    arg for arg in (term.args if isinstance(term, dual) else (term,))
+                    if _condition_key(arg, keys) not in common
+                ]
+                if not rest:
+                    # One term consists of the common factors only and absorbs the others
+                    rests = None
+                    break
+                rests.append(rest[0] if len(rest) == 1 else _simplify_junction(dual, rest, source, keys))
+            if rests is None:
+                return common_terms[0] if len(common_terms) == 1 else _simplify_junction(dual, common_terms, source, keys)
+            return _simplify_junction(dual, common_terms + [_simplify_junction(operator, rests, source, keys)], source, keys)
+
+    if len(terms) == 1:
+        return terms[0]
+    return operator(terms, source)
+
+def _group_in_lists(cond):
+    """
+    Group same-field value matches inside an OR so that backends can emit them as one IN-list:
+    a=1 or b=2 or a=3 becomes (a=1 or a=3) or b=2.
+    """
+    if not isinstance(cond, (ConditionAND, ConditionOR, ConditionNOT)):
+        return cond
+    args = [_group_in_lists(arg) for arg in cond.args]
+    if isinstance(cond, ConditionOR):
+        by_field: Dict[str, List[Any]] = {}
+        for arg in args:
+            if isinstance(arg, ConditionFieldEqualsValueExpression) and isinstance(arg.value, (SigmaString, SigmaNumber)):
+                by_field.setdefault(arg.field, []).append(arg)
+        if any(len(group) > 1 for group in by_field.values()) and len(by_field) + sum(
+            1 for arg in args if not isinstance(arg, ConditionFieldEqualsValueExpression) or arg.field not in by_field
+        ) > 1:
+            grouped = []
+            emitted = set()
+            for arg in args:
+                field = arg.field if isinstance(arg, ConditionFieldEqualsValueExpression) and arg.field in by_field else None
+                if field is None:
+                    grouped.append(arg)
+                elif field not in emitted:
+                    emitted.add(field)
+                    group = by_field[field]
+                    grouped.append(group[0] if len(group) == 1 else ConditionOR(group, cond.source))
+            args = grouped
+    return type(cond)(args, cond.source)
+
+def _relink(cond, parent):
+    """
+    Set parent links along the simplified tree. Backends inspect the parent chain of
+    leaves (e.g. for enclosing NOT or OR), so leaves are copied and attached to their new parent.
+    """
+    if isinstance(cond, ConditionItem):
+        cond.parent = parent
+        cond.args = [_relink(arg, cond) for arg in cond.args]
+        return cond
+    cond = copy.copy(cond)
+    cond.parent = parent
+    return cond
+
+def simplify_condition(cond):
+    """
+    Simplify a postprocessed condition tree.
+
+    Nested AND/OR are flattened, duplicate and absorbed terms removed, double
+    negations eliminated, factors common to all terms of a junction hoisted
+    and same-field value matches inside an OR grouped so that backends can
+    convert them into an IN-list.
+
+    Args:
+        cond: Condition tree as returned by SigmaCondition.parsed
+
+    Returns:
+        An equivalent, simplified condition tree
+    """
+    if cond is None:
+        return None
+    return _relink(_group_in_lists(_simplify(cond, {})), None)
+
+class SimplifiedSigmaCondition(SigmaCondition):
+    """
+    Sigma condition whose postprocessed condition tree is simplified with simplify_condition().
+    """
+
+    def parse(self, postprocess: bool = True):
+        parsed = super().parse(postprocess)
+        return simplify_condition(parsed) if postprocess else parsed
+
+def simplify_rule_conditions(rule_collection: "SigmaCollection") -> None:
+    """
+    Make the rules of a collection simplify their condition trees before conversion.
+    """
+    for rule in rule_collection.rules:
+        if isinstance(rule, SigmaRule):
+            conditions = []
+            for condition in rule.detection.parsed_condition:
+                simplified = copy.copy(condition)
+                simplified.__class__ = SimplifiedSigmaCondition
+                conditions.append(simplified)
+            rule.detection.parsed_condition = conditions
+
+# Value-list compaction
+#
+# Enabled with the backend option "compact_value_lists" (True or the minimum
+# number of values of a detection item). Values of a large OR-linked value list
+# that are covered by other values of the list are dropped, e.g. *evil.exe is
+# redundant next to *evil*. Backends already emit plain lists as IN-lists
+# where they can; contains-lists that a backend can't put into an IN-list are
+# rewritten into a single case-insensitive regular expression whose
+# alternatives share common prefixes (a prefix trie).
+
+VALUE_LIST_COMPACTION_THRESHOLD = 20
+
+# Characters escaped in generated regular expressions. Delimiters of the target
+# query language are escaped by the backend.
+_REGEX_SPECIAL_CHARS = frozenset("\\.^$|?*+()[]{}#@&<>~")
+
+def _value_shape(value) -> Optional[tuple]:
+    """
+    Classify a case-insensitive string value as exact, startswith, endswith or contains match.
+
+    Returns:
+        (shape, lowercase literal) or None if the value has another form
+    """
+    if type(value) is not SigmaString:
+        return None
+    parts = value.s
+    literal_parts = [part for part in parts if part is not SpecialChars.WILDCARD_MULTI]
+    if len(literal_parts) > 1 or not all(isinstance(part, str) for part in literal_parts):
+        return None
+    literal = literal_parts[0].lower() if literal_parts else ""
+    if not literal:
+        return None
+    leading = parts[0] is SpecialChars.WILDCARD_MULTI
+    trailing = parts[-1] is SpecialChars.WILDCARD_MULTI
+    if len(parts) != 1 + leading + trailing:
+        return None
+    shape = ("exact", "startswith", "endswith", "contains")[leading * 2 + trailing]
+    return shape, literal
+
+def _covered_values(shapes: List[Optional[tuple]]) -> List[bool]:
+    """
+    Determine which values match only strings that other values of the list match too.
+
+    Args:
+        shapes: Results of _value_shape() for the values of a list
+
+    Returns:
+        A flag for each value, True if the value can be dropped
+    """
+    contains = set(literal for shape, literal in filter(None, shapes) if shape == "contains")
+    # Minimal contains literals: those without another contains literal inside
+    minimal_contains = []
+    pattern = None
+    for length in sorted(set(map(len, contains))):
+        bucket = [literal for literal in contains if len(literal) == length]
+        minimal_contains.extend(literal for literal in bucket if pattern is None or not pattern.search(literal))
+        pattern = re.compile("|".join(map(re.escape, minimal_contains)))
+
+    def minimal_affixes(shape: str) -> set:
+        # Sorted order puts all literals starting with a kept prefix right after it
+        reverse = shape == "endswith"
+        literals = sorted(
+            literal[::-1] if reverse else literal
+            for literal in set(literal for s, literal in filter(None, shapes) if s == shape)
+            if pattern is None or not pattern.search(literal)
+        )
+        kept = []
+        for literal in literals:
+            if not kept or not literal.startswith(kept[-1]):
+                kept.append(literal)
+        return set(literal[::-1] if reverse else literal for literal in kept)
+
+    minimal = {
+        "contains": set(minimal_contains),
+        "startswith": minimal_affixes("startswith"),
+        "endswith": minimal_affixes("endswith"),
+    }
+    covered = []
+    seen = set()
+    for value_shape in shapes:
+        if value_shape is None:
+            covered.append(False)
+            continue
+        shape, literal = value_shape
+        if value_shape in seen:
+            drop = True
+        elif shape == "exact":
+            drop = (
+                (pattern is not None and pattern.search(literal) is not None)
+                or any(literal[:i] in minimal["startswith"] for i in range(1, len(literal) + 1))
+                or any(literal[i:] in minimal["endswith"] for i in range(len(literal)))
+            )
+        else:
+            drop = literal not in minimal[shape]
+        seen.add(value_shape)
+        covered.append(drop)
+    return covered
+
+def _escape_regex(literal: str) -> str:
+    return "".join("\\" + c if c in _REGEX_SPECIAL_CHARS else c for c in literal)
+
+def _regex_trie(literals: List[str]) -> str:
+    """
+    Build a regular expression alternation matching exactly the given literals,
+    with common prefixes factored out: abc, abd and bc become (ab[cd]|bc).
+    Only plain groups are used, as not all regular expression dialects support (?:...).
+    """
+    def render(suffixes: List[str]) -> str:
+        # suffixes is sorted, so literals with the same first character are adjacent
+        optional = suffixes[0] == ""
+        if optional:
+            suffixes = suffixes[1:]
+        if not suffixes:
+            return ""
+        groups = [list(group) for _, group in itertools.groupby(suffixes, key=lambda suffix: suffix[0])]
+        if len(groups) > 1 and all(len(group) == 1 and len(group[0]) == 1 for group in groups):
+            # Alternatives of single characters become a character class
+            alternatives = ["[" + "".join("\\" + group[0] if group[0] in "\\]^-" else group[0] for group in groups) + "]"]
+        else:
+            alternatives = []
+            for group in groups:
+                first, last = group[0], group[-1]
+                length = 1
+                while length < len(first) and length < len(last) and first[length] == last[length]:
+                    length += 1
+                prefix = first[:length]
+                alternatives.append(_escape_regex(prefix) + render([suffix[length:] for suffix in group]))
+        if optional:
+            return "(" + "|".join(alternatives) + ")?"
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(" + "|".join(alternatives) + ")"
+
+    body = render(sorted(set(literals)))
+    return body if body.startswith("(") else "(" + body + ")"
+
+@dataclass
+class ValueListCompactionTransformation(DetectionItemTransformation):
+    """
+    Compact large OR-linked value lists of field detection items.
+
+    Args:
+        min_values: Minimum number of values of a detection item to be compacted
+        regex: Rewrite contains-lists into a regular expression trie
+    """
+
+    min_values: int = VALUE_LIST_COMPACTION_THRESHOLD
+    regex: bool = False
+
+    def apply_detection_item(self, detection_item):
+        values = detection_item.value
+        if (
+            detection_item.field is None
+            or detection_item.value_linking is not ConditionOR
+            or len(values) < max(self.min_values, 2)
+        ):
+            return None
+        shapes = [_value_shape(value) for value in values]
+        covered = _covered_values(shapes)
+        kept = [(value, shape) for value, shape, drop in zip(values, shapes, covered) if not drop]
+        contains = [shape[1] for value, shape in kept if shape is not None and shape[0] == "contains"]
+        if self.regex and len(contains) > 1:
+            regex = SigmaRegularExpression(
+                ".*" + _regex_trie(contains) + ".*",
+                {SigmaRegularExpressionFlag.IGNORECASE},
+            )
+            new_values = [value for value, shape in kept if shape is None or shape[0] != "contains"]
+            new_values.append(regex)
+        elif len(kept) < len(values):
+            new_values = [value for value, shape in kept]
+        else:
+            return None
+        detection_item.value = new_values
+        return detection_item
+
+def _value_list_compaction_pipeline(backend_class, option: Union[bool, int]) -> Optional[ProcessingPipeline]:
+    """
+    Processing pipeline with the value-list compaction stage for a backend, or None if disabled.
+    """
+    if option is False or option is None:
+        return None
+    min_values = VALUE_LIST_COMPACTION_THRESHOLD if option is True else int(option)
+    # Regular expressions pay off where contains-values can't go into an IN-list
+    in_lists_with_wildcards = getattr(backend_class, "convert_or_as_in", False) and getattr(
+        backend_class, "in_expressions_allow_wildcards", False
+    )
+    regex = (
+        not in_lists_with_wildcards
+        and getattr(backend_class, "re_expression", None) is not None
+        and SigmaRegularExpressionFlag.IGNORECASE in (getattr(backend_class, "re_flags", None) or {})
+    )
+    return ProcessingPipeline(
+        name="Value-list compaction",
+        items=[
+            ProcessingItem(
+                identifier="value_list_compaction",
+                transformation=ValueListCompactionTransformation(min_values=min_values, regex=regex),
+            )
+        ],
+    )
+
+def load_rule_collection(rule_yaml: str, filter_yml: str = None, documents: Optional[list] = None) -> "SigmaCollection":
+    """
+    Get a rule collection for a Sigma rule (and optional filter).
+
+    Processing pipelines modify the rules they are applied to, so every
+    conversion needs its own collection. The YAML is parsed once per rule text;
+    the pristine collection is kept pickled and further requests for the same
+    text (e.g. converting it for several targets) get an unpickled clone.
+
     Args:
         rule_yaml: YAML string containing the Sigma rule
-        target: Target backend identifier
-        pipeline_names: Optional list of pipeline names to use (these must be provided as YAML)
-        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
         filter_yml: Optional YAML containing filter definitions
-        format: Output format for the backend
-        correlation_method: Optional correlation method
-        backend_options: Optional backend-specific options
-        skip_unsupported: Skip rules that can't be handled by the backend
+        documents: Optional YAML documents of rule_yaml if the caller already parsed
+            it; they are consumed by the collection
 
     Returns:
-        The converted rule in the format specified by the backend
+        The parsed rule collection
     """
+    key = (rule_yaml, filter_yml)
+    snapshot = _parsed_rule_cache.get(key)
+    if snapshot is not None:
+        _parsed_rule_cache.move_to_end(key)
+        return pickle.loads(snapshot)
 
+    rule_collection = _parse_rule_collection(rule_yaml, filter_yml, documents)
+    try:
+        snapshot = pickle.dumps(rule_collection, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Not all custom rule attributes can be pickled, such rules are just not cached
+        return rule_collection
+    _parsed_rule_cache[key] = snapshot
+    if len(_parsed_rule_cache) > PARSED_RULE_CACHE_SIZE:
+        _parsed_rule_cache.popitem(last=False)
+    return rule_collection
+
+def _parse_rule_collection(rule_yaml: str, filter_yml: str = None, documents: Optional[list] = None) -> "SigmaCollection":
+    from sigma.collection import SigmaCollection
     # Apply filter if provided
     if filter_yml:
         try:
@@ -113,25 +1094,314 @@ def convert_rule(
             # For now, we just append the rules - in a real implementation,
             # you would apply proper filtering logic
             rule_yaml = filter_yml + "\n---\n" + rule_yaml
-            rule_collection = SigmaCollection.from_yaml(rule_yaml)
+            return SigmaCollection.from_yaml(rule_yaml)
         except Exception as e:
             raise SigmaError(f"Filter processing error: {str(e)}")
+    elif documents is not None:
+        # Already parsed by the caller, this is what from_yaml() does after parsing
+        return SigmaCollection.from_dicts(documents)
     else:
         # Parse the rule
-        rule_collection = SigmaCollection.from_yaml(rule_yaml)
-    
-    # Initialize processing pipeline if specified
+        return SigmaCollection.from_yaml(rule_yaml)
+
+# Pipeline optimization
+#
+# Chained pipelines often consist of several field_name_mapping and
+# field_name_prefix_mapping items in a row, each walking all detection items
+# of a rule. optimize_processing_pipeline() fuses runs of such items without
+# conditions into one item that maps each field name through the whole run
+# once and remembers the result.
+#
+# Most other items of large pipelines only apply to some log sources. Whether
+# the rule conditions of an item that checks nothing but the log source match
+# only depends on the (category, product, service) triple of the rule at that
+# point of the pipeline, so the result is remembered per triple and item.
+
+# Rule condition evaluations of memoizing processing items since the module was loaded
+_applicability_stats = {"evaluations": 0, "saved": 0}
+
+def applicability_stats() -> Dict[str, int]:
+    """
+    Count the rule condition evaluations of items of optimized pipelines.
+
+    Returns:
+        {"evaluations": ..., "saved": ...}, where saved counts the evaluations
+        answered from the per-log source memo
+    """
+    return dict(_applicability_stats)
+
+def _is_fusable_mapping(item) -> bool:
+    return (
+        type(item.transformation) in (FieldMappingTransformation, FieldPrefixMappingTransformation)
+        and not item.rule_conditions
+        and item.rule_condition_expression is None
+        and not item.rule_condition_negation
+        and not item.detection_item_conditions
+        and item.detection_item_condition_expression is None
+        and not item.detection_item_condition_negation
+        and not item.field_name_conditions
+        and item.field_name_condition_expression is None
+        and not item.field_name_condition_negation
+    )
+
+def _is_logsource_only(item) -> bool:
+    conditions = item.rule_conditions
+    if isinstance(conditions, dict):
+        conditions = list(conditions.values())
+    return bool(conditions) and all(type(condition) is LogsourceCondition for condition in conditions)
+
+class LogsourceMemoProcessingItem(ProcessingItem):
+    """
+    Processing item whose rule conditions only check the log source. The
+    result of the rule conditions is remembered per log source triple.
+    """
+
+    applicability: Dict[tuple, bool]
+
+    def match_rule_conditions(self, rule) -> bool:
+        if not isinstance(rule, SigmaRule):
+            return super().match_rule_conditions(rule)
+        logsource = rule.logsource
+        key = (logsource.category, logsource.product, logsource.service)
+        _applicability_stats["evaluations"] += 1
+        try:
+            result = self.applicability[key]
+        except KeyError:
+            result = self.applicability[key] = super().match_rule_conditions(rule)
+        else:
+            _applicability_stats["saved"] += 1
+        return result
+
+@dataclass
+class FusedFieldMappingTransformation(FieldMappingTransformationBase):
+    """
+    Field name mapping equivalent to applying several field mapping transformations in sequence.
+    The identifiers of the fused processing items are recorded as applied like by the single
+    items, so that processing_item_applied conditions of later pipelines still match.
+
+    Args:
+        steps: Field mapping transformations in the order they were applied
+        identifiers: Identifiers of the processing items of the steps
+    """
+
+    steps: List[FieldMappingTransformationBase]
+    identifiers: List[Optional[str]] = dataclasses.field(default_factory=list)
+    # Field name -> (mapping tree, flat mapping, tracked mappings, identifiers); see _compose()
+    table: Dict[Optional[str], tuple] = dataclasses.field(
+        init=False, compare=False, repr=False, default_factory=dict
+    )
+
+    def __post_init__(self):
+        self.identifiers = list(self.identifiers) + [None] * (len(self.steps) - len(self.identifiers))
+        # Precompute the fields named in the mappings, other fields are added on first use
+        for step in self.steps:
+            if type(step) is FieldMappingTransformation:
+                for field_name in step.mapping:
+                    if field_name not in self.table:
+                        self.table[field_name] = self._compose(field_name)
+
+    def _compose(self, field_name: Optional[str]) -> tuple:
+        """
+        Map a field name through all steps.
+
+        Returns:
+            (tree, flat, tracked, identifiers): tree is None if no step mapped the field, else a
+            field name or a list of trees, one list for every step that mapped a field to a list.
+            A detection item is replaced by nested detections of the same shape, as by the single
+            steps. flat is the mapping result as returned by apply_field_name(). tracked lists
+            the (field, mapped fields, identifier) of every single mapping in the order the steps
+            made them, identifiers are those of the steps that mapped the field.
+        """
+        tracked = []
+
+        def apply(tree, step, identifier):
+            if isinstance(tree, list):
+                return [apply(subtree, step, identifier) for subtree in tree]
+            result = step.apply_field_name(tree)
+            if result is None:
+                return tree
+            tracked.append((tree, [result] if isinstance(result, str) else list(result), identifier))
+            return result
+
+        def leaves(tree):
+            if isinstance(tree, list):
+                for subtree in tree:
+                    yield from leaves(subtree)
+            else:
+                yield tree
+
+        tree = field_name
+        for step, identifier in zip(self.steps, self.identifiers):
+            tree = apply(tree, step, identifier)
+        if not tracked:
+            return None, None, (), ()
+        identifiers = tuple(dict.fromkeys(
+            identifier for _, _, identifier in tracked if identifier is not None
+        ))
+        return tree, tree if isinstance(tree, str) else list(leaves(tree)), tuple(tracked), identifiers
+
+    def _lookup(self, field: Optional[str]) -> tuple:
+        try:
+            return self.table[field]
+        except KeyError:
+            entry = self.table[field] = self._compose(field)
+            return entry
+
+    def apply_field_name(self, field: Optional[str]) -> Union[None, str, List[str]]:
+        flat = self._lookup(field)[1]
+        # Callers must not modify the remembered list
+        return list(flat) if isinstance(flat, list) else flat
+
+    def _apply_field_name(self, field: str) -> List[str]:
+        result = super()._apply_field_name(field)
+        if self._pipeline is not None:
+            for source, mapped, identifier in self._lookup(field)[2]:
+                self._pipeline.track_field_processing_items(source, mapped, identifier)
+        return result
+
+    def processing_item_applied(self, d) -> None:
+        # The identifiers of the steps are recorded instead of the one of the fused item
+        pass
+
+    def apply(self, rule) -> None:
+        super().apply(rule)
+        # The single items are unconditional and would all have been applied to the rule
+        identifiers = [identifier for identifier in self.identifiers if identifier is not None]
+        rule.applied_processing_items.update(identifiers)
+        if self._pipeline is not None:
+            self._pipeline.applied_ids.update(identifiers)
+
+    def apply_detection_item(self, detection_item):
+        identifiers = set(self._lookup(detection_item.field)[3])
+        for value in detection_item.value:
+            if isinstance(value, SigmaFieldReference):
+                identifiers.update(self._lookup(value.field)[3])
+        tree = self._lookup(detection_item.field)[0]
+        result = super().apply_detection_item(detection_item)
+        if isinstance(tree, list) and isinstance(result, SigmaDetection):
+            items = iter(result.detection_items)
+
+            def nest(tree):
+                return SigmaDetection(
+                    [next(items) if isinstance(subtree, str) else nest(subtree) for subtree in tree],
+                    item_linking=ConditionOR,
+                )
+
+            result = nest(tree)
+
+        def mark(detection):
+            if isinstance(detection, SigmaDetection):
+                for item in detection.detection_items:
+                    mark(item)
+            else:
+                detection.applied_processing_items.update(identifiers)
+
+        if result is not None:
+            mark(result)
+        return result
+
+def optimize_processing_pipeline(pipeline: Optional[ProcessingPipeline]) -> Optional[ProcessingPipeline]:
+    """
+    Optimize a processing pipeline for repeated use:
+
+    * consecutive unconditional field_name_mapping and field_name_prefix_mapping
+      items are fused into a single FusedFieldMappingTransformation item
+    * items whose rule conditions only check the log source remember their
+      result per log source (see applicability_stats())
+
+    Args:
+        pipeline: Processing pipeline, it is not modified
+
+    Returns:
+        The optimized pipeline, or the given pipeline if nothing could be optimized
+    """
+    if pipeline is None:
+        return None
+    fusable = [_is_fusable_mapping(item) for item in pipeline.items]
+    memoizable = [_is_logsource_only(item) for item in pipeline.items]
+    if not any(a and b for a, b in zip(fusable, fusable[1:])) and not any(memoizable):
+        return pipeline
+
+    # Items can only belong to one pipeline, the optimized pipeline gets copies
+    pipeline = copy.deepcopy(pipeline)
+    pipeline._clear_pipeline()
+    items = []
+    run = []
+
+    def flush():
+        if len(run) > 1:
+            items.append(ProcessingItem(
+                transformation=FusedFieldMappingTransformation(
+                    [item.transformation for item in run],
+                    [item.identifier for item in run],
+                ),
+            ))
+        else:
+            items.extend(run)
+        run.clear()
+
+    for item, item_fusable, item_memoizable in zip(pipeline.items, fusable, memoizable):
+        if item_fusable:
+            run.append(item)
+            continue
+        flush()
+        if item_memoizable:
+            item.__class__ = LogsourceMemoProcessingItem
+            item.applicability = {}
+        items.append(item)
+    flush()
+    return dataclasses.replace(pipeline, items=items)
+
+def build_processing_pipeline(
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    optimize: bool = False,
+) -> Optional[ProcessingPipeline]:
+    """
+    Resolve built-in pipelines by name and chain custom pipeline YAMLs after them.
+
+    Args:
+        pipeline_names: Optional list of built-in pipeline names
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        optimize: Return the pipeline optimized by optimize_processing_pipeline(). Optimized
+            pipelines are cached and the same pipeline object is returned for the same arguments.
+
+    Returns:
+        The combined processing pipeline, or None if no pipeline was given
+    """
+    if isinstance(pipeline_names, str):
+        pipeline_names = [pipeline_names]
+    key = json.dumps([pipeline_names or [], pipeline_ymls or [], optimize])
+    if optimize and key in _optimized_pipeline_cache:
+        _optimized_pipeline_cache.move_to_end(key)
+        return _optimized_pipeline_cache[key]
+
+    # Persisted pipelines are unpickled, i.e. a new object for every call
+    processing_pipeline = _persistent_get("pipeline", key)
+    if processing_pipeline is _MISSING:
+        processing_pipeline = _build_processing_pipeline(pipeline_names, pipeline_ymls)
+        if optimize:
+            processing_pipeline = optimize_processing_pipeline(processing_pipeline)
+        _persistent_put("pipeline", key, processing_pipeline)
+
+    if optimize:
+        _optimized_pipeline_cache[key] = processing_pipeline
+        if len(_optimized_pipeline_cache) > OPTIMIZED_PIPELINE_CACHE_SIZE:
+            _optimized_pipeline_cache.popitem(last=False)
+    return processing_pipeline
+
+def _build_processing_pipeline(
+    pipeline_names: Optional[List[str]],
+    pipeline_ymls: Optional[List[str]],
+) -> Optional[ProcessingPipeline]:
     processing_pipeline = None
 
     # First, load built-in pipelines by name if provided
     if pipeline_names and len(pipeline_names) > 0:
         try:
-            # Ensure pipeline_names is a list
-            if isinstance(pipeline_names, str):
-                pipeline_names = [pipeline_names]
-
             # Create the resolver inside the function to avoid serialization issues
-            pipeline_resolver = ProcessingPipelineResolver(plugins.pipelines)
+            from sigma.processing.resolver import ProcessingPipelineResolver
+            pipeline_resolver = ProcessingPipelineResolver(get_plugins().pipelines)
 
             # The resolve() method expects a list of pipeline specs and returns a resolved pipeline
             # Pass the entire list at once instead of iterating
@@ -155,16 +1425,48 @@ def convert_rule(
                         processing_pipeline = processing_pipeline + custom_pipeline
         except Exception as e:
             raise SigmaError(f"Error processing custom pipeline: {str(e)}")
-    
+
+    return processing_pipeline
+
+def create_backend(
+    target: str,
+    processing_pipeline: Optional[ProcessingPipeline] = None,
+    format: Union[str, List[str]] = "default",
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False
+) -> "Backend":
+    """
+    Instantiate the backend for a target and validate the output format and correlation method.
+
+    Args:
+        target: Target backend identifier
+        processing_pipeline: Optional processing pipeline for the backend
+        format: Output format for the backend, or a list of output formats
+        correlation_method: Optional correlation method
+        backend_options: Optional backend-specific options. "compact_value_lists"
+            (True or a minimum list length) enables value-list compaction.
+        skip_unsupported: Skip rules that can't be handled by the backend
+
+    Returns:
+        The backend instance
+    """
     # Initialize backend
     try:
-        backend_class = backends[target]
+        backend_class = get_plugins().backends[target]
     except KeyError:
         raise SigmaError(f"Backend '{target}' is not installed or does not exist.")
-    backend_options = backend_options or {}
-    
+    backend_options = dict(backend_options or {})
+    compaction_pipeline = _value_list_compaction_pipeline(
+        backend_class, backend_options.pop("compact_value_lists", None)
+    )
+    if compaction_pipeline is not None:
+        processing_pipeline = (
+            compaction_pipeline if processing_pipeline is None else processing_pipeline + compaction_pipeline
+        )
+
     try:
-        backend: Backend = backend_class(
+        backend: "Backend" = backend_class(
             processing_pipeline=processing_pipeline,
             collect_errors=skip_unsupported,
             **backend_options,
@@ -174,8 +1476,9 @@ def convert_rule(
         raise SigmaError(f"Parameter '{param}' is not supported by backend '{target}'.")
     
     # Check if format is valid
-    if format not in backend_class.formats.keys():
-        raise SigmaError(f"Output format '{format}' is not supported by backend '{target}'.")
+    for output_format in [format] if isinstance(format, str) else format:
+        if output_format not in backend_class.formats.keys():
+            raise SigmaError(f"Output format '{output_format}' is not supported by backend '{target}'.")
     
     # Check if correlation method is valid
     if correlation_method is not None:
@@ -184,10 +1487,48 @@ def convert_rule(
             raise SigmaError(f"Backend '{target}' does not support correlations.")
         elif correlation_method not in correlation_methods.keys():
             raise SigmaError(f"Correlation method '{correlation_method}' is not supported by backend '{target}'.")
-    
+
+    return backend
+
+def convert_collection(
+    backend: "Backend",
+    rule_collection: "SigmaCollection",
+    format: str = "default",
+    correlation_method: Optional[str] = None,
+    skip_unsupported: bool = False,
+    deadline: Optional[float] = None
+) -> Union[str, List[str], List[Dict], Dict, bytes]:
+    """
+    Convert a parsed rule collection with an existing backend.
+
+    The backend may be reused for further collections; errors collected by a
+    previous conversion are discarded first.
+
+    Args:
+        backend: Backend created by create_backend()
+        rule_collection: Parsed rule collection
+        format: Output format for the backend
+        correlation_method: Optional correlation method
+        skip_unsupported: Skip rules that can't be handled by the backend
+        deadline: Optional time.monotonic() value after which the conversion is aborted
+
+    Returns:
+        The converted rule in the format specified by the backend
+    """
+    backend.errors = []
+
     # Convert rule
-    result = backend.convert(rule_collection, format, correlation_method)
-    
+    result = backend.convert(rule_collection, format, correlation_method, callback=_checkpoint_callback(deadline))
+    return _collect_result(backend, result, skip_unsupported)
+
+def _collect_result(
+    backend: "Backend",
+    result: Any,
+    skip_unsupported: bool = False
+) -> Union[str, List[str], List[Dict], Dict, bytes]:
+    """
+    Raise the errors collected by the backend and bring the conversion result into its returned form.
+    """
     # Process errors
     if backend.errors and not skip_unsupported:
         error_list = []
@@ -204,4 +1545,316 @@ def convert_rule(
     elif isinstance(result, (list, dict, bytes)):
         return result
     else:
-        return str(result)
\ No newline at end of file
+        return str(result)
+
+@contextlib.contextmanager
+def _interrupt_as_cancellation():
+    """
+    Report a KeyboardInterrupt raised through Pyodide's interrupt buffer as ConversionCancelled.
+    Without a registered cancellation flag, KeyboardInterrupt propagates unchanged.
+    """
+    try:
+        yield
+    except KeyboardInterrupt:
+        if _cancel_flag is None:
+            raise
+        raise ConversionCancelled("Conversion cancelled.") from None
+
+def _group_formats(backend_class, formats: List[str]) -> List[List[str]]:
+    """
+    Group output formats that share the same output format processing pipeline,
+    i.e. that only differ in query and output finalization.
+    """
+    groups: List[List[str]] = []
+    for output_format in formats:
+        pipeline = backend_class.output_format_processing_pipeline[output_format]
+        for group in groups:
+            if backend_class.output_format_processing_pipeline[group[0]] == pipeline:
+                group.append(output_format)
+                break
+        else:
+            groups.append([output_format])
+    return groups
+
+def _copy_rule_metadata(rule):
+    """
+    Copy a rule together with its list, dict and set attributes. The detection is shared.
+    """
+    copied = copy.copy(rule)
+    for name, value in vars(rule).items():
+        if isinstance(value, (list, dict, set)):
+            setattr(copied, name, copy.copy(value))
+    return copied
+
+def convert_collection_formats(
+    backend: "Backend",
+    rule_collection: "SigmaCollection",
+    formats: List[str],
+    correlation_method: Optional[str] = None,
+    skip_unsupported: bool = False,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Convert a parsed rule collection once and finalize the queries for several output formats.
+
+    All formats must share the same output format processing pipeline (see
+    _group_formats()) and the collection must not contain correlation rules,
+    whose conversion depends on the output format.
+
+    Args:
+        backend: Backend created by create_backend()
+        rule_collection: Parsed rule collection
+        formats: Output formats of the backend
+        correlation_method: Optional correlation method
+        skip_unsupported: Skip rules that can't be handled by the backend
+        deadline: Optional time.monotonic() value after which the conversion is aborted
+
+    Returns:
+        Dict mapping each format to the converted rule in that format
+    """
+    # Capture the queries before format-specific finalization while converting for the first format.
+    # Some backends modify rule metadata while finalizing (e.g. remove ATT&CK tags they moved into
+    # another field), therefore every format is finalized on its own copy of the unfinalized rule.
+    captured = []
+    snapshots: Dict[int, Any] = {}
+    query_counts: Dict[int, int] = {}
+
+    def capture(rule, output_format, index, cond, result):
+        check_cancelled(deadline)
+        if id(rule) not in snapshots:
+            snapshots[id(rule)] = _copy_rule_metadata(rule)
+        if result is not None:
+            query_index = query_counts.get(id(rule), 0)
+            query_counts[id(rule)] = query_index + 1
+            captured.append((rule, query_index, result))
+        return result
+
+    backend.errors = []
+    result = backend.convert(rule_collection, formats[0], correlation_method, callback=capture)
+    conversion_errors = list(backend.errors)
+    outputs = {formats[0]: _collect_result(backend, result, skip_unsupported)}
+
+    for output_format in formats[1:]:
+        check_cancelled(deadline)
+        backend.errors = list(conversion_errors)
+        queries = []
+        rule_copies: Dict[int, Any] = {}
+        for rule, query_index, query in captured:
+            if id(rule) not in rule_copies:
+                rule_copies[id(rule)] = _copy_rule_metadata(snapshots[id(rule)])
+            try:
+                queries.append(backend.finalize_query(
+                    rule_copies[id(rule)],
+                    query,
+                    query_index,
+                    rule.get_conversion_states()[query_index],
+                    output_format,
+                ))
+            except SigmaError as e:
+                if not backend.collect_errors:
+                    raise
+                backend.errors.append((rule, e))
+        result = backend.finalize(queries, output_format)
+        outputs[output_format] = _collect_result(backend, result, skip_unsupported)
+    return outputs
+
+def convert_rule_formats(
+    rule_yaml: str,
+    target: str,
+    formats: List[str],
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    filter_yml: str = None,
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False,
+    time_budget: Optional[float] = None,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False
+) -> Dict[str, Any]:
+    """
+    Convert a Sigma rule to several output formats of the same backend.
+
+    Parsing, pipeline application and query generation are done once for
+    all formats sharing an output format processing pipeline; only the
+    format-specific finalization runs per format. Rule files containing
+    correlation rules are converted separately for each format.
+
+    Args:
+        rule_yaml: YAML string containing the Sigma rule
+        target: Target backend identifier
+        formats: Output formats for the backend
+        pipeline_names: Optional list of pipeline names to use
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        filter_yml: Optional YAML containing filter definitions
+        correlation_method: Optional correlation method
+        backend_options: Optional backend-specific options
+        skip_unsupported: Skip rules that can't be handled by the backend
+        time_budget: Optional wall-clock time in seconds after which the conversion is aborted
+        simplify_conditions: Simplify condition trees before conversion (see simplify_condition())
+        optimize_pipeline: Optimize and cache the processing pipeline (see optimize_processing_pipeline())
+
+    Returns:
+        Dict mapping each format to the converted rule in that format
+    """
+    formats = list(dict.fromkeys(formats))
+    if not formats:
+        return {}
+    with _interrupt_as_cancellation():
+        return _convert_rule_formats(
+            rule_yaml,
+            target,
+            formats,
+            pipeline_names,
+            pipeline_ymls,
+            filter_yml,
+            correlation_method,
+            backend_options,
+            skip_unsupported,
+            _deadline(time_budget),
+            simplify_conditions,
+            optimize_pipeline,
+        )
+
+def _convert_rule_formats(
+    rule_yaml: str,
+    target: str,
+    formats: List[str],
+    pipeline_names: Optional[List[str]],
+    pipeline_ymls: Optional[List[str]],
+    filter_yml: Optional[str],
+    correlation_method: Optional[str],
+    backend_options: Optional[Dict[str, Any]],
+    skip_unsupported: bool,
+    deadline: Optional[float],
+    simplify_conditions: bool,
+    optimize_pipeline: bool
+) -> Dict[str, Any]:
+    def load() -> "SigmaCollection":
+        rule_collection = load_rule_collection(rule_yaml, filter_yml)
+        if simplify_conditions:
+            simplify_rule_conditions(rule_collection)
+        return rule_collection
+
+    check_cancelled(deadline)
+    processing_pipeline = build_processing_pipeline(pipeline_names, pipeline_ymls, optimize_pipeline)
+    backend = create_backend(
+        target,
+        processing_pipeline,
+        format=formats,
+        correlation_method=correlation_method,
+        backend_options=backend_options,
+        skip_unsupported=skip_unsupported,
+    )
+
+    outputs: Dict[str, Any] = {}
+    rule_collection = None
+    for group in _group_formats(type(backend), formats):
+        check_cancelled(deadline)
+        # Pipelines modify the rules in place, each pass needs a freshly parsed collection
+        rule_collection = rule_collection or load()
+        if any(isinstance(rule, SigmaCorrelationRule) for rule in rule_collection.rules):
+            for output_format in group:
+                rule_collection = rule_collection or load()
+                outputs[output_format] = convert_collection(
+                    backend, rule_collection, output_format, correlation_method, skip_unsupported, deadline
+                )
+                rule_collection = None
+        else:
+            outputs.update(convert_collection_formats(
+                backend, rule_collection, group, correlation_method, skip_unsupported, deadline
+            ))
+            rule_collection = None
+
+    # Keep the order of the requested formats
+    return {output_format: outputs[output_format] for output_format in formats}
+
+def convert_rule(
+    rule_yaml: str, 
+    target: str, 
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    filter_yml: str = None,
+    format: str = "default",
+    correlation_method: Optional[str] = None,
+    backend_options: Dict[str, Any] = None,
+    skip_unsupported: bool = False,
+    time_budget: Optional[float] = None,
+    simplify_conditions: bool = False,
+    optimize_pipeline: bool = False
+) -> Union[str, List[str], List[Dict], Dict, bytes]:
+    """
+    Convert a Sigma rule to the target format with optional pipeline processing.
+
+    Raises ConversionCancelled if the flag registered with set_cancel_flag()
+    is set and ConversionBudgetExceeded if time_budget is exceeded.
+    
+    Args:
+        rule_yaml: YAML string containing the Sigma rule
+        target: Target backend identifier
+        pipeline_names: Optional list of pipeline names to use (these must be provided as YAML)
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        filter_yml: Optional YAML containing filter definitions
+        format: Output format for the backend
+        correlation_method: Optional correlation method
+        backend_options: Optional backend-specific options
+        skip_unsupported: Skip rules that can't be handled by the backend
+        time_budget: Optional wall-clock time in seconds after which the conversion is aborted
+        simplify_conditions: Simplify condition trees before conversion (see simplify_condition())
+        optimize_pipeline: Optimize and cache the processing pipeline (see optimize_processing_pipeline())
+
+    Returns:
+        The converted rule in the format specified by the backend
+    """
+    deadline = _deadline(time_budget)
+    # Fingerprinting parses the rule and builds the pipeline, it can be interrupted as well
+    with _interrupt_as_cancellation():
+        # Return the previous result if only descriptive fields of the rule changed
+        fingerprint, documents, processing_pipeline = _rule_fingerprint(
+            rule_yaml,
+            target,
+            pipeline_names,
+            pipeline_ymls,
+            filter_yml,
+            format,
+            correlation_method,
+            backend_options,
+            skip_unsupported,
+            simplify_conditions,
+            optimize_pipeline,
+        )
+        if fingerprint is not None and fingerprint in _conversion_cache:
+            _conversion_cache.move_to_end(fingerprint)
+            return copy.deepcopy(_conversion_cache[fingerprint])
+        if fingerprint is not None:
+            result = _persistent_get("conversion", fingerprint, target)
+            if result is not _MISSING:
+                _conversion_cache[fingerprint] = copy.deepcopy(result)
+                if len(_conversion_cache) > CONVERSION_CACHE_SIZE:
+                    _conversion_cache.popitem(last=False)
+                return result
+
+        check_cancelled(deadline)
+        rule_collection = load_rule_collection(rule_yaml, filter_yml, documents)
+        if simplify_conditions:
+            simplify_rule_conditions(rule_collection)
+        check_cancelled(deadline)
+        if processing_pipeline is _MISSING:
+            processing_pipeline = build_processing_pipeline(pipeline_names, pipeline_ymls, optimize_pipeline)
+        check_cancelled(deadline)
+        backend = create_backend(
+            target,
+            processing_pipeline,
+            format=format,
+            correlation_method=correlation_method,
+            backend_options=backend_options,
+            skip_unsupported=skip_unsupported,
+        )
+        result = convert_collection(backend, rule_collection, format, correlation_method, skip_unsupported, deadline)
+
+    if fingerprint is not None:
+        _conversion_cache[fingerprint] = copy.deepcopy(result)
+        if len(_conversion_cache) > CONVERSION_CACHE_SIZE:
+            _conversion_cache.popitem(last=False)
+        _persistent_put("conversion", fingerprint, result, target)
+    return result
\ No newline at end of file
@@ -0,0 +1,1140 @@
+"""
+Local evaluation of Sigma rules against sample events for native CPython deployments.
+
+convert_rule() turns a rule into a query for a SIEM. compile_rule() instead
+turns a parsed rule into a predicate plan that is evaluated in-process over
+batches of events, e.g. NDJSON exports or EVTX records dumped to JSON, to test
+rules before deploying them:
+
+    python sigma_evaluation.py -r rules/windows/process_creation events.ndjson
+
+Batches are evaluated column by column. Every field a rule references is
+materialized once per batch as one string of all its (lowercased) values,
+separated by NUL characters. Plain equals/contains/startswith/endswith tests
+are then str.find() scans over the whole column, wildcard patterns are
+prefiltered by their longest literal and confirmed with a precompiled regular
+expression. Columns with few distinct values, like image paths, are tested
+once per distinct value instead. AND nodes evaluate their children in order of
+observed selectivity and test later children row by row on the remaining
+candidates.
+
+compile_rules() shares the atoms of a rule pack: leaves testing the same
+field, modifier and value are merged into one leaf that tests each row of a
+batch at most once and hands its cached result to every rule. Long literal
+lists of one field are matched in a single pass with a trie-shaped regular
+expression.
+
+This module is not loaded by the web worker.
+"""
+import argparse
+import ipaddress
+import itertools
+import json
+import pathlib
+import re
+import sys
+import time
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import sigma_converter
+import yaml
+from sigma.conditions import (
+    ConditionAND,
+    ConditionFieldEqualsValueExpression,
+    ConditionNOT,
+    ConditionOR,
+    ConditionValueExpression,
+)
+from sigma.exceptions import SigmaError, SigmaFeatureNotSupportedByBackendError
+from sigma.processing.pipeline import ProcessingPipeline
+from sigma.rule import SigmaRule
+from sigma.types import (
+    SigmaBool,
+    SigmaCasedString,
+    SigmaCIDRExpression,
+    SigmaCompareExpression,
+    SigmaExists,
+    SigmaExpansion,
+    SigmaFieldReference,
+    SigmaNull,
+    SigmaNumber,
+    SigmaRegularExpression,
+    SigmaRegularExpressionFlag,
+    SigmaString,
+    SpecialChars,
+)
+
+DEFAULT_BATCH_SIZE = 100_000
+DEFAULT_SAMPLES = 3
+
+# Candidate sets smaller than this fraction of the batch are tested row by
+# row instead of scanning the whole column
+ROW_TEST_FRACTION = 0.02
+
+# Literals matching more than this fraction of the values are tested value by
+# value instead of searching the column text hit by hit
+FIND_SELECTIVITY = 0.02
+
+# Columns with fewer distinct values than this fraction of their values are
+# tested once per distinct value
+DISTINCT_FRACTION = 0.5
+
+# OR nodes with at least this many literal tests of one field match them all
+# with one trie-shaped regular expression. One str.find() pass per literal is
+# faster for shorter lists, and its literals are shared with other rules.
+TRIE_MIN_LITERALS = 64
+
+_SEPARATOR = "\0"
+
+# Value of fields missing from an event
+_MISSING = object()
+
+_REGEX_FLAGS = {
+    SigmaRegularExpressionFlag.IGNORECASE: re.IGNORECASE,
+    SigmaRegularExpressionFlag.MULTILINE: re.MULTILINE,
+    SigmaRegularExpressionFlag.DOTALL: re.DOTALL,
+}
+
+# Events
+
+def flatten_evtx(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten an EVTX record dumped to JSON (e.g. by evtx_dump) to Sigma field names.
+
+    System fields become top-level fields, attributes are appended to the
+    element name (Provider_Name), and EventData/UserData fields are lifted.
+    Events that are not EVTX records are returned unchanged.
+    """
+    record = event.get("Event")
+    if not isinstance(record, dict) or "System" not in record:
+        return event
+    flat = {}
+    for key, value in (record.get("System") or {}).items():
+        if isinstance(value, dict):
+            if "#text" in value:
+                flat[key] = value["#text"]
+            for name, attribute in (value.get("#attributes") or {}).items():
+                flat[f"{key}_{name}"] = attribute
+        else:
+            flat[key] = value
+    for section in ("EventData", "UserData"):
+        data = record.get(section)
+        if not isinstance(data, dict):
+            continue
+        if section == "UserData" and len(data) == 1:
+            # <UserData><SomeEvent xmlns=...>fields</SomeEvent></UserData>
+            data = next(iter(data.values()))
+            if not isinstance(data, dict):
+                continue
+        for key, value in data.items():
+            if key == "#attributes":
+                continue
+            if key == "Data" and isinstance(value, list):
+                # Unnamed <Data> elements
+                for i, item in enumerate(value):
+                    flat[f"Data{i}"] = item.get("#text") if isinstance(item, dict) else item
+            else:
+                flat[key] = value
+    return flat
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read events from a JSON file.
+
+    Accepts NDJSON, a JSON array, and concatenated JSON objects as written
+    by evtx_dump (with its "Record <n>" lines). EVTX records are flattened
+    with flatten_evtx().
+    """
+    text = pathlib.Path(path).read_text(encoding="utf-8")
+    decoder = json.JSONDecoder()
+    if text.lstrip().startswith("["):
+        events = json.loads(text)
+    else:
+        events = []
+        pos = 0
+        while True:
+            pos = _skip_to_object(text, pos)
+            if pos < 0:
+                break
+            event, pos = decoder.raw_decode(text, pos)
+            events.append(event)
+    for event in events:
+        if isinstance(event, dict):
+            yield flatten_evtx(event)
+
+def _skip_to_object(text: str, pos: int) -> int:
+    # Position of the next JSON object, skipping whitespace and evtx_dump record headers
+    while pos < len(text):
+        if text[pos].isspace():
+            pos += 1
+        elif text[pos] == "{":
+            return pos
+        else:
+            end = text.find("\n", pos)
+            if not text.startswith("Record ", pos):
+                raise SigmaError(f"Invalid event data at offset {pos}")
+            if end < 0:
+                return -1
+            pos = end + 1
+    return -1
+
+def iter_batches(events: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator["EventBatch"]:
+    batch = []
+    for event in events:
+        batch.append(event)
+        if len(batch) >= batch_size:
+            yield EventBatch(batch)
+            batch = []
+    if batch:
+        yield EventBatch(batch)
+
+def _string_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+def _lookup(event: Dict[str, Any], field: str) -> Tuple[bool, Any]:
+    # Flat field names first, then dotted paths into nested objects
+    if field in event:
+        return True, event[field]
+    if "." in field:
+        value = event
+        for part in field.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return False, None
+            value = value[part]
+        return True, value
+    return False, None
+
+def _normalize(value: Any, cased: bool) -> Any:
+    # Column value of anything but a plain string
+    if value is None or value is _MISSING:
+        return None
+    if not isinstance(value, (list, tuple)):
+        value = _string_value(value)
+        return value if cased else value.lower()
+    items = tuple(_string_value(item) for item in value if item is not None)
+    return items if cased else tuple(item.lower() for item in items)
+
+def _leaf_values(value: Any, values: List[str]) -> List[str]:
+    if isinstance(value, dict):
+        for item in value.values():
+            _leaf_values(item, values)
+    elif isinstance(value, list):
+        for item in value:
+            _leaf_values(item, values)
+    elif value is not None:
+        values.append(_string_value(value))
+    return values
+
+class Column:
+    """
+    Values of one field over a batch.
+
+    values holds one entry per row: None if the field is missing or null, a
+    string, or a tuple of strings for list values. The NUL separated text of
+    all values and the rows of each distinct value are built on first use.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], field: Optional[str], cased: bool):
+        self._text: Optional[str] = None
+        if field is None:
+            # Keyword searches match any value of the event
+            raw = [tuple(_leaf_values(event, [])) for event in events]
+        elif "." in field:
+            raw = [value if found else _MISSING for found, value in (_lookup(event, field) for event in events)]
+        else:
+            raw = [event.get(field, _MISSING) for event in events]
+        if cased:
+            self.values: List[Any] = [value if value.__class__ is str else _normalize(value, cased) for value in raw]
+        else:
+            self.values = [value.lower() if value.__class__ is str else _normalize(value, cased) for value in raw]
+        self._raw = raw
+        self.items: Optional[List[str]] = None
+        self.item_rows: List[int] = []
+        self._groups: Optional[Dict[str, List[int]]] = None
+        self._absent: Optional[Set[int]] = None
+        self._null: Optional[Set[int]] = None
+
+    @property
+    def absent(self) -> Set[int]:
+        """Rows without the field."""
+        if self._absent is None:
+            self._absent = {row for row, value in enumerate(self._raw) if value is _MISSING}
+        return self._absent
+
+    @property
+    def null(self) -> Set[int]:
+        """Rows where the field is missing or null."""
+        if self._null is None:
+            self._null = {row for row, value in enumerate(self.values) if value is None}
+        return self._null
+
+    def _build_items(self):
+        rows = [row for row, value in enumerate(self.values) if value is not None]
+        values = self.values
+        items = [values[row] for row in rows]
+        if all(item.__class__ is str for item in items):
+            self.item_rows = rows
+            self.items = items
+            return
+        # List values contribute one item per element
+        self.item_rows = []
+        self.items = []
+        for row, value in zip(rows, items):
+            if isinstance(value, str):
+                self.items.append(value)
+                self.item_rows.append(row)
+            else:
+                self.items.extend(value)
+                self.item_rows.extend([row] * len(value))
+
+    def _build_text(self):
+        if self.items is None:
+            self._build_items()
+        text = _SEPARATOR.join(self.items)
+        if text.count(_SEPARATOR) != max(len(self.items) - 1, 0):
+            # Separators inside of values would split items
+            self.items = [item.replace(_SEPARATOR, " ") for item in self.items]
+            text = _SEPARATOR.join(self.items)
+        self._text = _SEPARATOR + text + _SEPARATOR
+        self.starts = list(itertools.accumulate((len(item) + 1 for item in self.items), initial=1))
+
+    def find(self, needle: str, lead: int) -> Set[int]:
+        """
+        Rows with an item containing needle.
+
+        Args:
+            needle: Text to find, may include the separators around an item
+            lead: 1 if the needle starts with the separator before an item, else 0
+        """
+        if self._text is None:
+            self._build_text()
+        text = self._text
+        starts = self.starts
+        item_rows = self.item_rows
+        find = text.find
+        rows = set()
+        pos = find(needle)
+        while pos >= 0:
+            item = bisect_right(starts, pos + lead) - 1
+            rows.add(item_rows[item])
+            # Continue with the next item
+            pos = find(needle, starts[item + 1] - lead)
+        return rows
+
+    def search(self, regex: "re.Pattern") -> Set[int]:
+        """
+        Rows with an item matched by regex.
+
+        Matches may include the separators around an item but not span items.
+        """
+        if self._text is None:
+            self._build_text()
+        text = self._text
+        starts = self.starts
+        item_rows = self.item_rows
+        search = regex.search
+        rows = set()
+        match = search(text)
+        while match:
+            pos = match.start()
+            if text[pos] == _SEPARATOR:
+                pos += 1
+            item = bisect_right(starts, pos) - 1
+            rows.add(item_rows[item])
+            # Continue at the separator before the next item
+            match = search(text, starts[item + 1] - 1)
+        return rows
+
+    def groups(self) -> Optional[Dict[str, List[int]]]:
+        """
+        Rows of each distinct value, or None if most values are distinct.
+        """
+        if self._groups is None:
+            if self.items is None:
+                self._build_items()
+            # An empty dictionary marks columns of mostly distinct values
+            self._groups = {}
+            if len(set(self.items)) < len(self.items) * DISTINCT_FRACTION:
+                groups = self._groups
+                for row, item in zip(self.item_rows, self.items):
+                    rows = groups.get(item)
+                    if rows is None:
+                        groups[item] = [row]
+                    else:
+                        rows.append(row)
+        return self._groups or None
+
+    def all_items(self) -> Iterator[Tuple[int, str]]:
+        if self.items is None:
+            self._build_items()
+        return zip(self.item_rows, self.items)
+
+class EventBatch:
+    """Batch of events with lazily materialized field columns."""
+
+    _serials = itertools.count()
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+        self.size = len(events)
+        self.serial = next(self._serials)
+        self._columns: Dict[Tuple[Optional[str], bool], Column] = {}
+
+    def column(self, field: Optional[str], cased: bool = False) -> Column:
+        key = (field, cased)
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = Column(self.events, field, cased)
+        return column
+
+    def all_rows(self) -> Set[int]:
+        return set(range(self.size))
+
+# Predicate plans
+
+class PlanNode:
+    """
+    Node of a predicate plan.
+
+    evaluate() returns the rows of the batch the node matches, restricted to
+    rows if given. Matched and tested row counts are kept over all batches to
+    order the children of AND and OR nodes by selectivity. Until a node was
+    evaluated its selectivity is estimated from its children or the prior of
+    its leaf type.
+    """
+
+    # Relative cost of testing a row, multiplies the selectivity when ordering
+    cost = 1.0
+    # Selectivity before any rows were tested
+    prior = 0.5
+
+    def __init__(self):
+        self.matched = 0
+        self.tested = 0
+
+    def selectivity(self) -> float:
+        if self.tested:
+            return self.matched / self.tested
+        return self.estimate()
+
+    def estimate(self) -> float:
+        return self.prior
+
+    def batch_cost(self, batch: "EventBatch") -> float:
+        return self.cost
+
+    def evaluate(self, batch: EventBatch, rows: Optional[Set[int]] = None) -> Set[int]:
+        result = self._evaluate(batch, rows)
+        self.tested += batch.size if rows is None else len(rows)
+        self.matched += len(result)
+        return result
+
+    def _evaluate(self, batch: EventBatch, rows: Optional[Set[int]]) -> Set[int]:
+        raise NotImplementedError
+
+class AndNode(PlanNode):
+    def __init__(self, children: List[PlanNode]):
+        super().__init__()
+        self.children = children
+
+    def estimate(self):
+        return min(child.selectivity() for child in self.children)
+
+    def _evaluate(self, batch, rows):
+        self.children.sort(key=lambda child: child.selectivity() * child.batch_cost(batch))
+        for child in self.children:
+            rows = child.evaluate(batch, rows)
+            if not rows:
+                break
+        return rows
+
+class OrNode(PlanNode):
+    def __init__(self, children: List[PlanNode]):
+        super().__init__()
+        self.children = children
+
+    def estimate(self):
+        return min(1.0, sum(child.selectivity() for child in self.children))
+
+    def _evaluate(self, batch, rows):
+        result = set()
+        if rows is None:
+            for child in self.children:
+                result |= child.evaluate(batch)
+            return result
+        # Children that match most rows first, the others only test the rest
+        self.children.sort(key=lambda child: -child.selectivity() / child.cost)
+        rows = set(rows)
+        for child in self.children:
+            matched = child.evaluate(batch, rows)
+            result |= matched
+            rows -= matched
+            if not rows:
+                break
+        return result
+
+class NotNode(PlanNode):
+    def __init__(self, child: PlanNode):
+        super().__init__()
+        self.child = child
+
+    def estimate(self):
+        return 1.0 - self.child.selectivity()
+
+    def _evaluate(self, batch, rows):
+        if rows is None:
+            rows = batch.all_rows()
+        return rows - self.child.evaluate(batch, rows)
+
+class Leaf(PlanNode):
+    """
+    Test of the values of one field.
+
+    Subclasses implement test() for a single value and may implement scan()
+    for the whole column. Leaves without a fast scan always test the
+    candidate rows they are given. Leaves shared by several rules remember
+    which rows of the batch they tested and matched, so every row is tested
+    at most once however many rules ask for it.
+    """
+
+    fast_scan = False
+
+    def __init__(self, field: Optional[str], cased: bool = False):
+        super().__init__()
+        self.field = field
+        self.cased = cased
+        self.shared = False
+        self._serial = -1
+        self._complete = False
+        self._known: Set[int] = set()
+        self._cached: Set[int] = set()
+
+    def key(self) -> Tuple:
+        """
+        Identity of the test, equal for leaves testing the same field, modifier and value.
+        """
+        raise NotImplementedError
+
+    def evaluate(self, batch, rows=None):
+        if not self.shared:
+            return super().evaluate(batch, rows)
+        if self._serial != batch.serial:
+            self._serial = batch.serial
+            self._complete = False
+            self._known = set()
+            self._cached = set()
+        if not self._complete:
+            pending = None if rows is None else rows - self._known
+            if pending is None or (self.fast_scan and len(pending) > batch.size * ROW_TEST_FRACTION):
+                self._cached = super().evaluate(batch)
+                self._complete = True
+            elif pending:
+                self._cached |= super().evaluate(batch, pending)
+                self._known |= pending
+        return set(self._cached) if rows is None else self._cached & rows
+
+    def batch_cost(self, batch):
+        # Results of the whole batch are free once computed
+        return 0.0 if self.shared and self._complete and self._serial == batch.serial else self.cost
+
+    def _evaluate(self, batch, rows):
+        column = batch.column(self.field, self.cased)
+        if rows is None or (self.fast_scan and len(rows) > batch.size * ROW_TEST_FRACTION):
+            result = self.scan(column)
+            return result if rows is None else result & rows
+        return {row for row in rows if self.test_row(column, row)}
+
+    def scan(self, column: Column) -> Set[int]:
+        test = self.test
+        rows = set()
+        groups = column.groups()
+        if groups is not None:
+            for item, item_rows in groups.items():
+                if test(item):
+                    rows.update(item_rows)
+            return rows
+        for row, item in column.all_items():
+            if test(item):
+                rows.add(row)
+        return rows
+
+    def test_row(self, column: Column, row: int) -> bool:
+        value = column.values[row]
+        if value is None:
+            return False
+        if isinstance(value, str):
+            return self.test(value)
+        return any(self.test(item) for item in value)
+
+    def test(self, value: str) -> bool:
+        raise NotImplementedError
+
+class LiteralLeaf(Leaf):
+    """Equals, startswith, endswith or contains test of a literal."""
+
+    fast_scan = True
+
+    def __init__(self, field: Optional[str], cased: bool, kind: str, literal: str):
+        super().__init__(field, cased)
+        self.kind = kind
+        self.literal = literal
+        self.prior = 0.01 if kind == "exact" else 0.05
+
+    def key(self):
+        return ("literal", self.field, self.cased, self.kind, self.literal)
+
+    def scan(self, column):
+        literal = self.literal
+        groups = column.groups()
+        if groups is not None:
+            if self.kind == "exact":
+                return set(groups.get(literal, ()))
+            return super().scan(column)
+        if self.selectivity() > FIND_SELECTIVITY:
+            return self._filter(column)
+        if self.kind == "exact":
+            return column.find(_SEPARATOR + literal + _SEPARATOR, 1)
+        if self.kind == "startswith":
+            return column.find(_SEPARATOR + literal, 1)
+        if self.kind == "endswith":
+            return column.find(literal + _SEPARATOR, 0)
+        if not literal:
+            return {row for row, value in enumerate(column.values) if value}
+        return column.find(literal, 0)
+
+    def _filter(self, column: Column) -> Set[int]:
+        literal = self.literal
+        items = column.all_items()
+        if self.kind == "exact":
+            return {row for row, item in items if item == literal}
+        if self.kind == "startswith":
+            return {row for row, item in items if item.startswith(literal)}
+        if self.kind == "endswith":
+            return {row for row, item in items if item.endswith(literal)}
+        return {row for row, item in items if literal in item}
+
+    def test(self, value):
+        if self.kind == "exact":
+            return value == self.literal
+        if self.kind == "startswith":
+            return value.startswith(self.literal)
+        if self.kind == "endswith":
+            return value.endswith(self.literal)
+        return self.literal in value
+
+class MultiLiteralLeaf(Leaf):
+    """
+    Any of many literal tests of one field.
+
+    The literals are matched against the NUL separated column text with one
+    regular expression shaped like their trie, so the column is searched
+    once however many literals there are.
+    """
+
+    fast_scan = True
+    cost = 2.0
+
+    def __init__(self, field: Optional[str], cased: bool, literals: List[LiteralLeaf]):
+        super().__init__(field, cased)
+        self.needles = tuple(sorted({_needle(leaf.kind, leaf.literal) for leaf in literals}))
+        self.regex = re.compile(_trie_pattern(self.needles))
+        self.prior = min(1.0, sum(leaf.prior for leaf in literals))
+
+    def key(self):
+        return ("literals", self.field, self.cased, self.needles)
+
+    def scan(self, column):
+        if column.groups() is not None or self.selectivity() > FIND_SELECTIVITY:
+            return super().scan(column)
+        return column.search(self.regex)
+
+    def test(self, value):
+        return self.regex.search(_SEPARATOR + value + _SEPARATOR) is not None
+
+def _needle(kind: str, literal: str) -> str:
+    # Text to find in the NUL separated column text
+    if kind == "exact":
+        return _SEPARATOR + literal + _SEPARATOR
+    if kind == "startswith":
+        return _SEPARATOR + literal
+    if kind == "endswith":
+        return literal + _SEPARATOR
+    return literal
+
+def _trie_pattern(needles: Sequence[str]) -> str:
+    """
+    Regular expression matching any of the needles, nested like their trie.
+
+    Needles extending a shorter needle are dropped, a match of the shorter one
+    suffices.
+    """
+    trie: Dict[str, Any] = {}
+    for needle in needles:
+        node = trie
+        for char in needle:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_node_pattern(trie)
+
+def _trie_node_pattern(node: Dict[str, Any]) -> str:
+    if "" in node:
+        return ""
+    alternatives = []
+    for char, child in sorted(node.items()):
+        prefix = re.escape(char)
+        # Chains of single children become literal runs
+        while len(child) == 1 and "" not in child:
+            char, child = next(iter(child.items()))
+            prefix += re.escape(char)
+        alternatives.append(prefix + _trie_node_pattern(child))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+class PatternLeaf(Leaf):
+    """Wildcard pattern, prefiltered by its longest literal."""
+
+    cost = 2.0
+    prior = 0.05
+
+    def __init__(self, field: Optional[str], cased: bool, regex: str, literal: str):
+        super().__init__(field, cased)
+        self.regex = re.compile(regex, re.DOTALL)
+        self.literal = literal
+        self.fast_scan = bool(literal)
+
+    def key(self):
+        return ("pattern", self.field, self.cased, self.regex.pattern)
+
+    def scan(self, column):
+        if not self.literal or column.groups() is not None:
+            return super().scan(column)
+        if self.selectivity() > FIND_SELECTIVITY:
+            literal = self.literal
+            fullmatch = self.regex.fullmatch
+            return {row for row, item in column.all_items() if literal in item and fullmatch(item)}
+        candidates = column.find(self.literal, 0)
+        return {row for row in candidates if self.test_row(column, row)}
+
+    def test(self, value):
+        return self.regex.fullmatch(value) is not None
+
+class RegexLeaf(Leaf):
+    cost = 4.0
+    prior = 0.2
+
+    def __init__(self, field: Optional[str], regex: str, flags: int):
+        super().__init__(field, cased=True)
+        self.regex = re.compile(regex, flags)
+
+    def key(self):
+        return ("regex", self.field, self.regex.pattern, self.regex.flags)
+
+    def test(self, value):
+        return self.regex.search(value) is not None
+
+class CIDRLeaf(Leaf):
+    cost = 4.0
+    prior = 0.2
+
+    def __init__(self, field: Optional[str], network):
+        super().__init__(field)
+        self.network = network
+
+    def key(self):
+        return ("cidr", self.field, str(self.network))
+
+    def test(self, value):
+        try:
+            return ipaddress.ip_address(value) in self.network
+        except ValueError:
+            return False
+
+class CompareLeaf(Leaf):
+    cost = 2.0
+
+    _operators = {
+        "LT": lambda a, b: a < b,
+        "LTE": lambda a, b: a <= b,
+        "GT": lambda a, b: a > b,
+        "GTE": lambda a, b: a >= b,
+        "NEQ": lambda a, b: a != b,
+    }
+
+    def __init__(self, field: Optional[str], op: str, number):
+        super().__init__(field)
+        self.op = op
+        self.compare = self._operators[op]
+        self.number = number
+
+    def key(self):
+        return ("compare", self.field, self.op, self.number)
+
+    def test(self, value):
+        try:
+            return self.compare(float(value), self.number)
+        except ValueError:
+            return False
+
+class NullLeaf(Leaf):
+    """Field is missing or null."""
+
+    fast_scan = True
+
+    def key(self):
+        return ("null", self.field)
+
+    def scan(self, column):
+        return set(column.null)
+
+    def test_row(self, column, row):
+        return row in column.null
+
+class ExistsLeaf(Leaf):
+    fast_scan = True
+
+    def __init__(self, field: Optional[str], exists: bool):
+        super().__init__(field)
+        self.exists = exists
+
+    def key(self):
+        return ("exists", self.field, self.exists)
+
+    def scan(self, column):
+        if self.exists:
+            return set(range(len(column.values))) - column.absent
+        return set(column.absent)
+
+    def test_row(self, column, row):
+        return (row not in column.absent) == self.exists
+
+class FieldReferenceLeaf(Leaf):
+    """Value equals (or starts or ends with) the value of another field."""
+
+    cost = 2.0
+    prior = 0.1
+
+    def __init__(self, field: Optional[str], reference: SigmaFieldReference):
+        super().__init__(field)
+        self.reference = reference.field
+        self.starts_with = reference.starts_with
+        self.ends_with = reference.ends_with
+
+    def key(self):
+        return ("fieldref", self.field, self.reference, self.starts_with, self.ends_with)
+
+    def _evaluate(self, batch, rows):
+        column = batch.column(self.field)
+        other = batch.column(self.reference)
+        if rows is None:
+            rows = range(batch.size)
+        return {row for row in rows if self._test_values(column.values[row], other.values[row])}
+
+    def _test_values(self, value, other) -> bool:
+        if value is None or other is None:
+            return False
+        values = (value,) if isinstance(value, str) else value
+        others = (other,) if isinstance(other, str) else other
+        for a in values:
+            for b in others:
+                if self.starts_with and self.ends_with:
+                    if b in a:
+                        return True
+                elif self.starts_with:
+                    if a.startswith(b):
+                        return True
+                elif self.ends_with:
+                    if a.endswith(b):
+                        return True
+                elif a == b:
+                    return True
+        return False
+
+def _string_leaf(field: Optional[str], value: SigmaString) -> Leaf:
+    cased = isinstance(value, SigmaCasedString)
+    parts = []
+    for part in value.s:
+        if isinstance(part, str):
+            parts.append(part if cased else part.lower())
+        elif part in (SpecialChars.WILDCARD_MULTI, SpecialChars.WILDCARD_SINGLE):
+            parts.append(part)
+        else:
+            raise SigmaFeatureNotSupportedByBackendError(
+                f"Unresolved placeholder in value of field {field}, use a pipeline to resolve it"
+            )
+    multi = SpecialChars.WILDCARD_MULTI
+    if field is None:
+        # Keywords match anywhere in any value
+        if not parts or parts[0] != multi:
+            parts.insert(0, multi)
+        if parts[-1] != multi:
+            parts.append(multi)
+    literals = [part for part in parts if isinstance(part, str)]
+    specials = [part for part in parts if not isinstance(part, str)]
+    if not specials:
+        return LiteralLeaf(field, cased, "exact", "".join(literals))
+    if all(special == multi for special in specials) and len(literals) <= 1:
+        literal = literals[0] if literals else ""
+        if parts == [multi, literal]:
+            return LiteralLeaf(field, cased, "endswith", literal)
+        if parts == [literal, multi]:
+            return LiteralLeaf(field, cased, "startswith", literal)
+        if parts in ([multi, literal, multi], [multi]):
+            return LiteralLeaf(field, cased, "contains", literal)
+    regex = "".join(
+        re.escape(part) if isinstance(part, str) else (".*" if part == multi else ".")
+        for part in parts
+    )
+    return PatternLeaf(field, cased, regex, max(literals, key=len, default=""))
+
+def _value_node(field: Optional[str], value) -> PlanNode:
+    if isinstance(value, SigmaExpansion):
+        return OrNode([_value_node(field, item) for item in value.values])
+    if isinstance(value, SigmaString):
+        return _string_leaf(field, value)
+    if isinstance(value, SigmaBool):
+        return LiteralLeaf(field, False, "exact", "true" if value.boolean else "false")
+    if isinstance(value, SigmaNumber):
+        return LiteralLeaf(field, False, "exact", str(value.number).lower())
+    if isinstance(value, SigmaNull):
+        return NullLeaf(field)
+    if isinstance(value, SigmaExists):
+        return ExistsLeaf(field, value.exists)
+    if isinstance(value, SigmaRegularExpression):
+        flags = 0
+        for flag in value.flags:
+            flags |= _REGEX_FLAGS[flag]
+        return RegexLeaf(field, value.regexp.to_plain(), flags)
+    if isinstance(value, SigmaCIDRExpression):
+        return CIDRLeaf(field, value.network)
+    if isinstance(value, SigmaCompareExpression):
+        return CompareLeaf(field, value.op.name, value.number.number)
+    if isinstance(value, SigmaFieldReference):
+        return FieldReferenceLeaf(field, value)
+    raise SigmaFeatureNotSupportedByBackendError(
+        f"Values of type {type(value).__name__} can't be evaluated locally"
+    )
+
+def _merge_literals(children: List[PlanNode]) -> List[PlanNode]:
+    # Long literal lists of one field, e.g. Image|endswith: [...], become one trie matcher
+    literals: Dict[Tuple[Optional[str], bool], List[LiteralLeaf]] = {}
+    for child in children:
+        if type(child) is LiteralLeaf and child.literal:
+            literals.setdefault((child.field, child.cased), []).append(child)
+    merged = []
+    for child in children:
+        if type(child) is LiteralLeaf and child.literal:
+            group = literals[(child.field, child.cased)]
+            if len(group) >= TRIE_MIN_LITERALS:
+                if child is group[0]:
+                    merged.append(MultiLiteralLeaf(child.field, child.cased, group))
+                continue
+        merged.append(child)
+    return merged
+
+def _plan_node(cond) -> PlanNode:
+    if isinstance(cond, ConditionAND):
+        return AndNode([_plan_node(arg) for arg in cond.args])
+    if isinstance(cond, ConditionOR):
+        children = _merge_literals([_plan_node(arg) for arg in cond.args])
+        return children[0] if len(children) == 1 else OrNode(children)
+    if isinstance(cond, ConditionNOT):
+        return NotNode(_plan_node(cond.args[0]))
+    if isinstance(cond, ConditionFieldEqualsValueExpression):
+        return _value_node(cond.field, cond.value)
+    if isinstance(cond, ConditionValueExpression):
+        return _value_node(None, cond.value)
+    raise SigmaFeatureNotSupportedByBackendError(
+        f"Condition element {type(cond).__name__} can't be evaluated locally"
+    )
+
+class RulePlan:
+    """Compiled predicate plan of a Sigma rule."""
+
+    def __init__(self, rule: SigmaRule, root: PlanNode):
+        self.rule = rule
+        self.root = root
+
+    def evaluate(self, batch: EventBatch) -> List[int]:
+        """
+        Rows of the batch matched by the rule, in ascending order.
+        """
+        return sorted(self.root.evaluate(batch))
+
+class AtomIndex:
+    """
+    Distinct leaves of a rule pack.
+
+    add() replaces the leaves of a plan by equal leaves of earlier plans, so
+    each distinct (field, modifier, value) atom is evaluated once per batch.
+    """
+
+    def __init__(self):
+        self.atoms: Dict[Tuple, Leaf] = {}
+        self.leaves = 0
+
+    def add(self, plan: RulePlan):
+        plan.root = self._intern(plan.root)
+
+    def _intern(self, node: PlanNode) -> PlanNode:
+        if isinstance(node, Leaf):
+            self.leaves += 1
+            atom = self.atoms.setdefault(node.key(), node)
+            if atom is not node:
+                atom.shared = True
+            return atom
+        if isinstance(node, NotNode):
+            node.child = self._intern(node.child)
+        elif isinstance(node, (AndNode, OrNode)):
+            node.children = [self._intern(child) for child in node.children]
+        return node
+
+def compile_rule(rule: SigmaRule, processing_pipeline: Optional[ProcessingPipeline] = None) -> RulePlan:
+    """
+    Compile a parsed Sigma rule into a predicate plan.
+
+    Args:
+        rule: The rule, it is modified by the processing pipeline
+        processing_pipeline: Optional pipeline applied to the rule first, e.g. to map
+            field names to those of the events
+
+    Returns:
+        The predicate plan
+    """
+    if processing_pipeline is not None:
+        processing_pipeline.apply(rule)
+    conditions = [_plan_node(condition.parse()) for condition in rule.detection.parsed_condition]
+    return RulePlan(rule, conditions[0] if len(conditions) == 1 else OrNode(conditions))
+
+def compile_rules(
+    rule_yamls: Iterable[str],
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    atom_index: Optional[AtomIndex] = None,
+) -> Tuple[List[RulePlan], List[str]]:
+    """
+    Parse and compile rules.
+
+    Args:
+        rule_yamls: YAML strings containing Sigma rules
+        pipeline_names: Optional list of built-in pipeline names
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        atom_index: Index sharing the leaves of the plans, a new one by default
+
+    Returns:
+        Predicate plans and errors of the rules that can't be evaluated
+    """
+    if atom_index is None:
+        atom_index = AtomIndex()
+    plans = []
+    errors = []
+    for rule_yaml in rule_yamls:
+        try:
+            rule_collection = sigma_converter.load_rule_collection(rule_yaml)
+        except (SigmaError, yaml.YAMLError) as e:
+            errors.append(str(e))
+            continue
+        for rule in rule_collection.rules:
+            if not isinstance(rule, SigmaRule):
+                errors.append(f"{rule.title}: correlation rules can't be evaluated locally")
+                continue
+            try:
+                processing_pipeline = sigma_converter.build_processing_pipeline(pipeline_names, pipeline_ymls)
+                plan = compile_rule(rule, processing_pipeline)
+            except SigmaError as e:
+                errors.append(f"{rule.title}: {e}")
+                continue
+            atom_index.add(plan)
+            plans.append(plan)
+    return plans, errors
+
+def evaluate_rules(
+    plans: List[RulePlan],
+    events: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    samples: int = DEFAULT_SAMPLES,
+) -> Dict[str, Any]:
+    """
+    Evaluate compiled rules over events.
+
+    Args:
+        plans: Predicate plans from compile_rule() or compile_rules()
+        events: Events, e.g. from read_events()
+        batch_size: Number of events evaluated at once
+        samples: Number of matched events kept per rule
+
+    Returns:
+        {"events": ..., "seconds": ..., "rules": [...]} with match count, sample
+        events and evaluation time per rule
+    """
+    results = [
+        {"id": str(plan.rule.id or ""), "title": plan.rule.title, "matches": 0, "samples": [], "seconds": 0.0}
+        for plan in plans
+    ]
+    total = 0
+    start = time.perf_counter()
+    for batch in iter_batches(events, batch_size):
+        for plan, result in zip(plans, results):
+            rule_start = time.perf_counter()
+            rows = plan.evaluate(batch)
+            result["seconds"] += time.perf_counter() - rule_start
+            result["matches"] += len(rows)
+            for row in rows[:samples - len(result["samples"])]:
+                result["samples"].append(batch.events[row])
+        total += batch.size
+    return {"events": total, "seconds": time.perf_counter() - start, "rules": results}
+
+def rule_files(paths: Sequence[str]) -> List[pathlib.Path]:
+    """
+    Rule files given as files or directories searched for .yml/.yaml files.
+    """
+    files = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in (".yml", ".yaml")))
+        else:
+            files.append(path)
+    return files
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate Sigma rules against sample events.")
+    parser.add_argument("events", nargs="+", help="Event files (NDJSON, JSON array or evtx_dump JSON)")
+    parser.add_argument("-r", "--rules", action="append", required=True, help="Rule file or directory")
+    parser.add_argument("-p", "--pipeline", action="append", default=[], help="Built-in pipeline name")
+    parser.add_argument("--pipeline-file", action="append", default=[], help="Custom pipeline YAML file")
+    parser.add_argument("-b", "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Events per batch")
+    parser.add_argument("-s", "--samples", type=int, default=DEFAULT_SAMPLES, help="Matched events shown per rule")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    plans, errors = compile_rules(
+        (path.read_text(encoding="utf-8") for path in rule_files(args.rules)),
+        args.pipeline,
+        [pathlib.Path(p).read_text(encoding="utf-8") for p in args.pipeline_file],
+    )
+    for error in errors:
+        print(f"Skipped: {error}", file=sys.stderr)
+    events = (event for path in args.events for event in read_events(path))
+    report = evaluate_rules(plans, events, args.batch_size, args.samples)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+        return 0
+    for result in report["rules"]:
+        if result["matches"]:
+            print(f"{result['matches']:>8} {result['seconds'] * 1000:8.1f} ms  {result['title']}")
+            for sample in result["samples"]:
+                print(f"{'':>19}{json.dumps(sample, ensure_ascii=False, default=str)[:160]}")
+    matched = sum(1 for result in report["rules"] if result["matches"])
+    print(f"{len(plans)} rules, {matched} matched, {report['events']} events in {report['seconds']:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
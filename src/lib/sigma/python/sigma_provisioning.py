@@ -0,0 +1,377 @@
+"""
+Installation of pySigma, pipelines and backends from a local wheelhouse.
+
+Instead of resolving every package against PyPI at runtime, the wheels are
+downloaded once into a directory (the wheelhouse) and a lock manifest is built
+from their metadata. scripts/build-wheelhouse.py does both for the web worker,
+for other wheelhouses the lock is built with:
+
+    python sigma_provisioning.py lock public/wheels
+
+The lock (lock.json in the wheelhouse) pins one wheel per package with its
+hash and the dependencies that apply to the target environment, Pyodide by
+default. Requirements without a wheel in the wheelhouse, e.g. packages with
+compiled extensions that the Pyodide distribution provides, are listed as
+external. install_plan() resolves the wheels needed for a set of packages from
+the lock alone, without network access or a resolver.
+
+Wheels are plain archives without install-time steps, so all wheels of a plan
+are independent of each other and are installed concurrently: the web worker
+passes them to a single micropip.install(..., deps=False) call, install()
+unpacks them with a thread pool into a site-packages directory:
+
+    python sigma_provisioning.py install public/wheels -t site-packages --workspace converted/
+
+workspace_packages() collects the backends recorded in the manifests of
+sigma_bulk.py output directories, so the backends a workspace uses are
+installed up front.
+
+The web worker runs this module in its own namespace before pySigma is
+installed, so only the lock builder imports anything outside the standard
+library.
+"""
+import argparse
+import email.parser
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import re
+import shutil
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+LOCK_NAME = "lock.json"
+LOCK_VERSION = 1
+
+# Packages installed before any backend
+BASE_PACKAGES = ["pysigma", "pysigma-pipeline-windows", "pysigma-pipeline-sysmon"]
+
+# Marker environment of the Pyodide release the web worker loads
+PYODIDE_ENVIRONMENT = {
+    "implementation_name": "cpython",
+    "implementation_version": "3.13.2",
+    "os_name": "posix",
+    "platform_machine": "wasm32",
+    "platform_python_implementation": "CPython",
+    "platform_release": "4.0.9",
+    "platform_system": "Emscripten",
+    "platform_version": "#1",
+    "python_full_version": "3.13.2",
+    "python_version": "3.13",
+    "sys_platform": "emscripten",
+}
+
+# Output directory manifest of sigma_bulk.convert_tree()
+WORKSPACE_MANIFEST_NAME = ".sigma-manifest.json"
+
+class ProvisioningError(Exception):
+    pass
+
+def normalize_name(name: str) -> str:
+    """
+    Normalized package name (PEP 503), e.g. "pySigma_backend.Splunk" -> "pysigma-backend-splunk".
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def read_wheel_metadata(path: str) -> Dict[str, Any]:
+    """
+    Name, version and requirements of a wheel.
+
+    Returns:
+        Dictionary with "name", "version" and "requires_dist" (list of requirement strings)
+    """
+    with zipfile.ZipFile(path) as wheel:
+        metadata_files = [name for name in wheel.namelist() if re.fullmatch(r"[^/]+\.dist-info/METADATA", name)]
+        if len(metadata_files) != 1:
+            raise ProvisioningError(f"{os.path.basename(path)} is not a wheel")
+        metadata = email.parser.BytesParser().parsebytes(wheel.read(metadata_files[0]), headersonly=True)
+    return {
+        "name": metadata["Name"],
+        "version": metadata["Version"],
+        "requires_dist": metadata.get_all("Requires-Dist") or [],
+    }
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_lock(wheelhouse: str, environment: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Build the lock manifest of all wheels in a directory.
+
+    Requirements are evaluated for the given marker environment, extras of
+    dependencies are not followed.
+
+    Args:
+        wheelhouse: Directory containing the wheels
+        environment: Marker environment, defaults to PYODIDE_ENVIRONMENT
+
+    Returns:
+        Lock manifest
+    """
+    from packaging.requirements import Requirement
+
+    environment = {**PYODIDE_ENVIRONMENT, **(environment or {}), "extra": ""}
+    packages: Dict[str, Dict[str, Any]] = {}
+    specifiers: Dict[str, List[Any]] = {}
+    for file in sorted(os.listdir(wheelhouse)):
+        if not file.endswith(".whl"):
+            continue
+        path = os.path.join(wheelhouse, file)
+        metadata = read_wheel_metadata(path)
+        name = normalize_name(metadata["name"])
+        if name in packages:
+            raise ProvisioningError(f"Several wheels of {name}: {packages[name]['file']}, {file}")
+        requires = []
+        for requirement_text in metadata["requires_dist"]:
+            requirement = Requirement(requirement_text)
+            if requirement.marker is not None and not requirement.marker.evaluate(environment):
+                continue
+            requirement_name = normalize_name(requirement.name)
+            requires.append(requirement_name)
+            specifiers.setdefault(requirement_name, []).append((name, requirement.specifier))
+        packages[name] = {
+            "name": metadata["name"],
+            "version": metadata["version"],
+            "file": file,
+            "sha256": _sha256(path),
+            "requires": sorted(set(requires)),
+        }
+
+    for name, requirements in specifiers.items():
+        if name not in packages:
+            continue
+        version = packages[name]["version"]
+        for required_by, specifier in requirements:
+            if not specifier.contains(version, prereleases=True):
+                raise ProvisioningError(f"{required_by} requires {name}{specifier}, the wheelhouse has {version}")
+
+    return {
+        "version": LOCK_VERSION,
+        "environment": {key: value for key, value in environment.items() if key != "extra"},
+        "packages": packages,
+        "external": sorted(set(specifiers) - set(packages)),
+    }
+
+def write_lock(wheelhouse: str, lock: Dict[str, Any]) -> str:
+    """
+    Write the lock manifest into the wheelhouse.
+
+    Returns:
+        Path of the lock manifest
+    """
+    path = os.path.join(wheelhouse, LOCK_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(lock, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+def load_lock(lock: Any) -> Dict[str, Any]:
+    """
+    Parse and check a lock manifest.
+
+    Args:
+        lock: JSON text, path of a wheelhouse or lock file, or an already parsed lock
+
+    Returns:
+        Lock manifest
+    """
+    if isinstance(lock, (str, pathlib.Path)) and not str(lock).lstrip().startswith("{"):
+        path = os.path.join(lock, LOCK_NAME) if os.path.isdir(lock) else lock
+        with open(path, encoding="utf-8") as f:
+            lock = f.read()
+    if isinstance(lock, str):
+        lock = json.loads(lock)
+    if not isinstance(lock, dict) or lock.get("version") != LOCK_VERSION:
+        raise ProvisioningError("Unsupported lock manifest version")
+    return lock
+
+def installed_versions(paths: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Versions of the installed distributions by normalized name.
+
+    Args:
+        paths: Directories to look in, defaults to sys.path
+    """
+    return {
+        normalize_name(dist.metadata["Name"]): dist.version
+        for dist in importlib.metadata.distributions(**({"path": paths} if paths is not None else {}))
+        if dist.metadata["Name"]
+    }
+
+def install_plan(lock: Any, packages: Iterable[str], installed: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Resolve the wheels needed to install packages and their dependencies.
+
+    Args:
+        lock: Lock manifest (see load_lock())
+        packages: Names of the packages to install
+        installed: Installed versions by normalized name, defaults to installed_versions().
+            Packages installed with the locked version are skipped.
+
+    Returns:
+        Dictionary with "wheels" (lock entries, dependencies first) and
+        "external" (required packages without a wheel, to install otherwise)
+    """
+    lock = load_lock(lock)
+    if installed is None:
+        installed = installed_versions()
+    locked = lock["packages"]
+    external = set(lock.get("external", ()))
+    wheels: List[Dict[str, Any]] = []
+    needed_external: List[str] = []
+    missing: List[str] = []
+    visited = set()
+
+    def visit(name: str) -> None:
+        if name in visited:
+            return
+        visited.add(name)
+        entry = locked.get(name)
+        if entry is None:
+            if name in installed:
+                pass
+            elif name in external:
+                needed_external.append(name)
+            else:
+                missing.append(name)
+            return
+        for requirement in entry["requires"]:
+            visit(requirement)
+        if installed.get(name) != entry["version"]:
+            wheels.append(entry)
+
+    for package in packages:
+        visit(normalize_name(package))
+    if missing:
+        raise ProvisioningError(f"Not in the wheelhouse: {', '.join(sorted(missing))}")
+    return {"wheels": wheels, "external": sorted(needed_external)}
+
+def install_wheel(path: str, site_packages: str, sha256: Optional[str] = None) -> None:
+    """
+    Unpack a wheel into a site-packages directory.
+
+    Files of the .data directory other than purelib and platlib (scripts,
+    headers, data) are not installed.
+
+    Args:
+        path: Wheel file
+        site_packages: Installation directory
+        sha256: Expected hash of the wheel file
+    """
+    if sha256 is not None and _sha256(path) != sha256:
+        raise ProvisioningError(f"Hash mismatch of {os.path.basename(path)}")
+    with zipfile.ZipFile(path) as wheel:
+        for info in wheel.infolist():
+            name = info.filename
+            parts = name.split("/")
+            if parts[0].endswith(".data"):
+                if len(parts) < 3 or parts[1] not in ("purelib", "platlib"):
+                    continue
+                parts = parts[2:]
+            if info.is_dir() or ".." in parts or name.startswith("/"):
+                continue
+            destination = os.path.join(site_packages, *parts)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            with wheel.open(info) as source, open(destination, "wb") as target:
+                shutil.copyfileobj(source, target)
+        dist_info = next((n.split("/")[0] for n in wheel.namelist() if n.split("/")[0].endswith(".dist-info")), None)
+    if dist_info is not None:
+        with open(os.path.join(site_packages, dist_info, "INSTALLER"), "w", encoding="utf-8") as f:
+            f.write("sigma_provisioning\n")
+
+def install(
+    wheelhouse: str,
+    packages: Iterable[str],
+    site_packages: str,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Install packages and their dependencies from the wheelhouse.
+
+    Args:
+        wheelhouse: Directory containing the wheels and the lock manifest
+        packages: Names of the packages to install
+        site_packages: Installation directory
+        max_workers: Number of threads unpacking wheels
+
+    Returns:
+        The install plan (see install_plan()) that was carried out
+    """
+    os.makedirs(site_packages, exist_ok=True)
+    plan = install_plan(wheelhouse, packages, installed_versions([site_packages]))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(install_wheel, os.path.join(wheelhouse, entry["file"]), site_packages, entry["sha256"])
+            for entry in plan["wheels"]
+        ]
+        for future in futures:
+            future.result()
+    return plan
+
+def workspace_packages(paths: Iterable[str]) -> List[str]:
+    """
+    Backend packages recorded in the sigma_bulk.py manifests below the given directories.
+    """
+    packages = set()
+    for path in paths:
+        for manifest_path in pathlib.Path(path).rglob(WORKSPACE_MANIFEST_NAME):
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            backend = manifest.get("backend") if isinstance(manifest, dict) else None
+            if backend:
+                packages.add(normalize_name(backend))
+    return sorted(packages)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Install pySigma packages from a local wheelhouse.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    lock_parser = commands.add_parser("lock", help="Build the lock manifest of a wheelhouse")
+    lock_parser.add_argument("wheelhouse", help="Directory containing the wheels")
+    lock_parser.add_argument(
+        "--native", action="store_true", help="Evaluate requirements for this interpreter instead of Pyodide"
+    )
+    install_parser = commands.add_parser("install", help="Install packages from a wheelhouse")
+    install_parser.add_argument("wheelhouse", help="Directory containing the wheels and the lock manifest")
+    install_parser.add_argument("packages", nargs="*", help="Packages to install besides the base packages")
+    install_parser.add_argument("-t", "--target", required=True, help="Installation directory")
+    install_parser.add_argument(
+        "--workspace", action="append", default=[], help="Also install the backends used by this output directory"
+    )
+    install_parser.add_argument("-j", "--workers", type=int, help="Number of threads unpacking wheels")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "lock":
+            environment = None
+            if args.native:
+                from packaging.markers import default_environment
+                environment = default_environment()
+            lock = build_lock(args.wheelhouse, environment)
+            path = write_lock(args.wheelhouse, lock)
+            print(f"{len(lock['packages'])} wheels locked in {path}")
+            for name in lock["external"]:
+                print(f"External: {name}", file=sys.stderr)
+        else:
+            packages = BASE_PACKAGES + args.packages + workspace_packages(args.workspace)
+            plan = install(args.wheelhouse, packages, args.target, args.workers)
+            print(f"{len(plan['wheels'])} wheels installed into {args.target}")
+            for name in plan["external"]:
+                print(f"Not in the wheelhouse, install separately: {name}", file=sys.stderr)
+    except (ProvisioningError, OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
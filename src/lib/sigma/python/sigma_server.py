@@ -0,0 +1,266 @@
+"""
+Long-running JSON-RPC 2.0 conversion server for native CPython deployments.
+
+Requests and responses are single-line JSON documents, one per line, read from
+stdin/written to stdout or exchanged over a local TCP socket. Example:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "convert_rule",
+     "params": {"rule_yaml": "...", "target": "splunk", "pipeline_names": ["sysmon"]}}
+
+Pass "time_budget" (seconds) to bound a conversion; conversions exceeding it
+fail with error data {"status": "budget_exceeded"}.
+
+Conversions run in a process pool. Identical requests that arrive while the
+same conversion is still running share its result instead of being converted
+again, and the number of outstanding requests is bounded per connection and
+in total.
+
+This module is not loaded by the web worker.
+"""
+import argparse
+import asyncio
+import base64
+import inspect
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import sigma_converter
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Implementation-defined server errors
+CONVERSION_ERROR = -32000
+SERVER_BUSY = -32001
+
+METHODS = ("convert_rule", "get_available_pipelines")
+
+# Maximum size of a single request line
+MAX_LINE_LENGTH = 16 * 1024 * 1024
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+def _call(method: str, params: Any) -> Tuple[bool, Any]:
+    """
+    Run a sigma_converter function. Executed in a worker process.
+
+    Returns:
+        (True, result) on success or (False, (code, message[, data])) on failure
+    """
+    func = getattr(sigma_converter, method)
+    try:
+        if isinstance(params, dict):
+            arguments = inspect.signature(func).bind(**params)
+        else:
+            arguments = inspect.signature(func).bind(*params)
+    except TypeError as e:
+        # Wrong parameter names or count
+        return False, (INVALID_PARAMS, str(e))
+    try:
+        result = func(*arguments.args, **arguments.kwargs)
+    except (sigma_converter.ConversionCancelled, sigma_converter.ConversionBudgetExceeded) as e:
+        return False, (CONVERSION_ERROR, str(e), {"status": e.status})
+    except Exception as e:
+        return False, (CONVERSION_ERROR, str(e))
+    if isinstance(result, bytes):
+        result = {"encoding": "base64", "data": base64.b64encode(result).decode("ascii")}
+    return True, result
+
+class ConversionServer:
+    """
+    JSON-RPC dispatcher with single-flight coalescing and bounded concurrency.
+
+    Args:
+        executor: Executor for conversions (defaults to a process pool)
+        max_workers: Number of worker processes if no executor is given
+        max_pending: Maximum number of distinct conversions queued or running
+            at once; further requests are rejected with SERVER_BUSY
+        max_connection_requests: Maximum number of unanswered requests per
+            connection; the server stops reading from a connection at this limit
+        cache_dir: Directory shared by the worker processes to keep conversion
+            results across restarts (see sigma_converter.set_persistent_cache())
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        max_connection_requests: int = 16,
+        cache_dir: Optional[str] = None,
+    ):
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=sigma_converter.set_persistent_cache,
+            initargs=(cache_dir,),
+        )
+        self.max_pending = max_pending
+        self.max_connection_requests = max_connection_requests
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def call(self, method: str, params: Any) -> Any:
+        """
+        Run a method, sharing the computation with identical in-flight calls.
+        """
+        key = json.dumps([method, params], sort_keys=True)
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            if len(self.in_flight) >= self.max_pending:
+                raise RPCError(SERVER_BUSY, "Too many pending conversions, retry later.")
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self.executor, _call, method, params))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # shield() keeps a cancelled waiter from cancelling the shared computation
+        ok, result = await asyncio.shield(future)
+        if not ok:
+            raise RPCError(*result)
+        return result
+
+    async def handle_message(self, message: Any) -> Optional[Dict[str, Any]]:
+        """
+        Handle a decoded JSON-RPC request.
+
+        Returns:
+            The response, or None for notifications
+        """
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or not isinstance(message.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = message.get("id")
+        method = message["method"]
+        params = message.get("params", {})
+        try:
+            if method not in METHODS:
+                raise RPCError(METHOD_NOT_FOUND, f"Method '{method}' not found")
+            if not isinstance(params, (dict, list)):
+                raise RPCError(INVALID_PARAMS, "Params must be an object or an array")
+            result = await self.call(method, params)
+        except RPCError as e:
+            response = _error_response(request_id, e.code, e.message, e.data)
+        except Exception as e:
+            response = _error_response(request_id, INTERNAL_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in message else None
+
+    async def handle_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return _error_response(None, PARSE_ERROR, f"Parse error: {e}")
+        return await self.handle_message(message)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer requests from one stream until it is closed. Responses are written
+        as they complete and may arrive in a different order than the requests.
+        """
+        slots = asyncio.Semaphore(self.max_connection_requests)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line: bytes) -> None:
+            try:
+                response = await self.handle_line(line)
+                if response is not None:
+                    try:
+                        data = json.dumps(response)
+                    except (TypeError, ValueError) as e:
+                        data = json.dumps(_error_response(response.get("id"), INTERNAL_ERROR, f"Result is not JSON serializable: {e}"))
+                    async with write_lock:
+                        writer.write(data.encode("utf-8") + b"\n")
+                        await writer.drain()
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                # Stop reading while the connection has too many unanswered requests
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line exceeded MAX_LINE_LENGTH; the stream cannot be resynchronised
+                    slots.release()
+                    async with write_lock:
+                        writer.write(json.dumps(_error_response(None, INVALID_REQUEST, "Request too large")).encode("utf-8") + b"\n")
+                        await writer.drain()
+                    break
+                if not line:
+                    slots.release()
+                    break
+                if not line.strip():
+                    slots.release()
+                    continue
+                task = asyncio.ensure_future(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.serve_connection, host, port, limit=MAX_LINE_LENGTH)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_LINE_LENGTH)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.serve_connection(reader, writer)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def _error_response(request_id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve Sigma conversions over JSON-RPC.")
+    parser.add_argument("--tcp", metavar="HOST:PORT", help="Listen on a TCP socket instead of stdio")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--max-pending", type=int, default=64, help="Maximum number of distinct pending conversions")
+    parser.add_argument("--max-connection-requests", type=int, default=16, help="Maximum unanswered requests per connection")
+    parser.add_argument("--cache-dir", help="Keep conversion results in this directory across restarts")
+    args = parser.parse_args(argv)
+
+    server = ConversionServer(
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        max_connection_requests=args.max_connection_requests,
+        cache_dir=args.cache_dir,
+    )
+    try:
+        if args.tcp:
+            host, _, port = args.tcp.rpartition(":")
+            asyncio.run(server.serve_tcp(host or "127.0.0.1", int(port)))
+        else:
+            asyncio.run(server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
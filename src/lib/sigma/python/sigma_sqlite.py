@@ -0,0 +1,361 @@
+"""
+In-memory SQLite evaluation of Sigma rules for native CPython deployments.
+
+Rules are converted with the sqlite backend, i.e. convert_rule(target="sqlite"),
+and the resulting queries run against sample events bulk-loaded into an
+in-memory database. This regression-tests rule logic at scale offline with the
+same SQL a deployment would run:
+
+    python sigma_sqlite.py -r rules/windows/process_creation events.ndjson
+
+Events are flattened (nested objects become dotted field names) and inserted
+with executemany(). Columns use NUMERIC affinity and NOCASE collation, so
+numeric strings compare as numbers and equality is case-insensitive like in
+Sigma. Fields referenced by the queries are indexed after loading. Every rule
+reports its query time and whether SQLite has to scan the whole table, which
+points at patterns no index can serve, e.g. LIKE '%x%'.
+
+This module is not loaded by the web worker.
+"""
+import argparse
+import functools
+import json
+import pathlib
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import sigma_converter
+import yaml
+from sigma.exceptions import SigmaError
+
+from sigma_evaluation import read_events, rule_files
+
+TABLE = "logs"
+DEFAULT_SAMPLES = 3
+LOAD_BATCH_SIZE = 10_000
+
+# Queries running longer than this are marked as slow in the summary
+SLOW_QUERY_SECONDS = 0.05
+
+# String literals and identifiers of the generated SQL
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_IDENTIFIER_PATTERN = re.compile(r'`([^`]+)`|"((?:[^"]|"")+)"|([A-Za-z_][A-Za-z0-9_]*)')
+_QUERY_SEPARATOR = re.compile(r"\n\n(?=SELECT |WITH )")
+_MISSING_COLUMN_PATTERN = re.compile(r"no such column: (.+)$")
+
+@functools.lru_cache(maxsize=1024)
+def _compile_regex(pattern: str) -> "re.Pattern":
+    return re.compile(pattern)
+
+def _regexp(pattern: str, value: Any) -> Optional[bool]:
+    # SQLite evaluates "value REGEXP pattern" as regexp(pattern, value)
+    if pattern is None or value is None:
+        return None
+    return _compile_regex(pattern).search(str(value)) is not None
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def flatten_event(event: Dict[str, Any], prefix: str = "", flat: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Flatten an event to column values.
+
+    Nested objects become dotted field names, lists are stored as JSON and
+    booleans as 1 and 0, which is what the sqlite backend compares them with.
+    """
+    if flat is None:
+        flat = {}
+    for key, value in event.items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            flatten_event(value, name + ".", flat)
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, ensure_ascii=False)
+        elif isinstance(value, bool):
+            flat[name] = int(value)
+        else:
+            flat[name] = value
+    return flat
+
+def referenced_fields(query: str) -> Set[str]:
+    """
+    Lowercased names of the identifiers used by a query outside of string literals.
+    """
+    fields = set()
+    for quoted, double_quoted, plain in _IDENTIFIER_PATTERN.findall(_LITERAL_PATTERN.sub("''", query)):
+        fields.add((quoted or double_quoted.replace('""', '"') or plain).lower())
+    return fields
+
+class EventDatabase:
+    """
+    Events loaded into one SQLite table.
+
+    SQLite column names are case-insensitive, fields differing only in case
+    share a column.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.connection = sqlite3.connect(path)
+        self.connection.create_function("regexp", 2, _regexp, deterministic=True)
+        # Lowercased field name to column name
+        self.columns: Dict[str, str] = {}
+        self.indexed: Set[str] = set()
+        self.rows = 0
+
+    def close(self):
+        self.connection.close()
+
+    def _add_columns(self, names: Iterable[str]):
+        for name in names:
+            key = name.lower()
+            if key in self.columns:
+                continue
+            if not self.columns:
+                self.connection.execute(f"CREATE TABLE {TABLE} ({_quote(name)} NUMERIC COLLATE NOCASE)")
+            else:
+                self.connection.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(name)} NUMERIC COLLATE NOCASE")
+            self.columns[key] = name
+
+    def load(self, events: Iterable[Dict[str, Any]], batch_size: int = LOAD_BATCH_SIZE) -> int:
+        """
+        Insert events.
+
+        Args:
+            events: Events, e.g. from read_events()
+            batch_size: Number of events inserted with one executemany() call
+
+        Returns:
+            Number of inserted events
+        """
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for event in events:
+            batch.append(flatten_event(event))
+            if len(batch) >= batch_size:
+                count += self._insert(batch)
+                batch = []
+        if batch:
+            count += self._insert(batch)
+        self.connection.commit()
+        self.rows += count
+        return count
+
+    def _insert(self, batch: List[Dict[str, Any]]) -> int:
+        names: Dict[str, str] = {}
+        for event in batch:
+            for name in event:
+                names.setdefault(name.lower(), name)
+        if not names:
+            return 0
+        self._add_columns(names.values())
+        keys = sorted(names)
+        columns = ", ".join(_quote(self.columns[key]) for key in keys)
+        placeholders = ", ".join("?" * len(keys))
+        rows = []
+        for event in batch:
+            values = {name.lower(): value for name, value in event.items()}
+            rows.append(tuple(values.get(key) for key in keys))
+        self.connection.executemany(f"INSERT INTO {TABLE} ({columns}) VALUES ({placeholders})", rows)
+        return len(batch)
+
+    def create_indexes(self, fields: Iterable[str]) -> List[str]:
+        """
+        Index the given fields that are columns of the table.
+
+        Returns:
+            Names of the newly indexed columns
+        """
+        created = []
+        for field in fields:
+            key = field.lower()
+            if key not in self.columns or key in self.indexed:
+                continue
+            name = self.columns[key]
+            self.connection.execute(f"CREATE INDEX {_quote('idx_' + name)} ON {TABLE} ({_quote(name)})")
+            self.indexed.add(key)
+            created.append(name)
+        if created:
+            self.connection.execute("ANALYZE")
+        return created
+
+    def query_plan(self, query: str) -> List[str]:
+        """
+        Steps of the query plan chosen by SQLite.
+        """
+        return [row[-1] for row in self.connection.execute("EXPLAIN QUERY PLAN " + query)]
+
+    def run(self, query: str, samples: int = DEFAULT_SAMPLES) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Run a query.
+
+        Returns:
+            Number of matched rows and the first matched rows without their null columns
+        """
+        while True:
+            try:
+                cursor = self.connection.execute(query)
+                break
+            except sqlite3.OperationalError as e:
+                # Fields missing from all events are null
+                match = _MISSING_COLUMN_PATTERN.search(str(e))
+                if match is None or match.group(1).lower() in self.columns:
+                    raise
+                self._add_columns([match.group(1)])
+        names = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+        hits = [
+            {name: value for name, value in zip(names, row) if value is not None}
+            for row in rows[:samples]
+        ]
+        return len(rows), hits
+
+def convert_rules(
+    rule_yamls: Iterable[str],
+    pipeline_names: List[str] = None,
+    pipeline_ymls: List[str] = None,
+    backend_options: Dict[str, Any] = None,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Convert rules to SQLite queries against the events table.
+
+    Args:
+        rule_yamls: YAML strings containing Sigma rules
+        pipeline_names: Optional list of built-in pipeline names
+        pipeline_ymls: Optional list of YAML strings containing custom pipeline definitions
+        backend_options: Optional options of the sqlite backend
+
+    Returns:
+        {"id": ..., "title": ..., "query": ...} per query and errors of the rules that can't be converted
+    """
+    if "sqlite" not in sigma_converter.get_plugins().backends:
+        raise SigmaError("Backend 'sqlite' is not installed or does not exist.")
+    queries = []
+    errors = []
+    for rule_yaml in rule_yamls:
+        try:
+            rules = sigma_converter.load_rule_collection(rule_yaml).rules
+            result = sigma_converter.convert_rule(
+                rule_yaml, "sqlite", pipeline_names, pipeline_ymls, backend_options=backend_options
+            )
+        except (SigmaError, yaml.YAMLError) as e:
+            errors.append(str(e))
+            continue
+        parts = result if isinstance(result, list) else _QUERY_SEPARATOR.split(str(result))
+        parts = [part.replace("<TABLE_NAME>", TABLE) for part in parts if part]
+        for i, query in enumerate(parts):
+            # Queries follow the rules unless correlation rules added some
+            rule = rules[i] if len(parts) == len(rules) else rules[0]
+            title = rule.title if len(parts) == len(rules) else f"{rule.title} ({i + 1}/{len(parts)})"
+            queries.append({"id": str(rule.id or ""), "title": title, "query": query})
+    return queries, errors
+
+def evaluate_queries(
+    queries: List[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
+    samples: int = DEFAULT_SAMPLES,
+    database: Optional[EventDatabase] = None,
+) -> Dict[str, Any]:
+    """
+    Load events and run converted queries against them.
+
+    Args:
+        queries: Queries from convert_rules()
+        events: Events, e.g. from read_events()
+        samples: Number of matched rows kept per query
+        database: Database to load the events into, a new in-memory database by default
+
+    Returns:
+        {"events": ..., "load_seconds": ..., "index_seconds": ..., "seconds": ..., "rules": [...]}
+        with match count, sample hits, query time and full table scan flag per query
+    """
+    own_database = database is None
+    if own_database:
+        database = EventDatabase()
+    try:
+        start = time.perf_counter()
+        count = database.load(events)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        database.create_indexes(set().union(*(referenced_fields(query["query"]) for query in queries)))
+        index_seconds = time.perf_counter() - start
+
+        results = []
+        start = time.perf_counter()
+        for query in queries:
+            result = dict(query)
+            try:
+                query_start = time.perf_counter()
+                result["matches"], result["samples"] = database.run(query["query"], samples)
+                result["seconds"] = time.perf_counter() - query_start
+                result["full_scan"] = any(step.startswith("SCAN") for step in database.query_plan(query["query"]))
+            except sqlite3.Error as e:
+                result.update(matches=0, samples=[], seconds=0.0, full_scan=False, error=str(e))
+            results.append(result)
+        return {
+            "events": count,
+            "load_seconds": load_seconds,
+            "index_seconds": index_seconds,
+            "seconds": time.perf_counter() - start,
+            "rules": results,
+        }
+    finally:
+        if own_database:
+            database.close()
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Sigma rules converted to SQLite against sample events.")
+    parser.add_argument("events", nargs="+", help="Event files (NDJSON, JSON array or evtx_dump JSON)")
+    parser.add_argument("-r", "--rules", action="append", required=True, help="Rule file or directory")
+    parser.add_argument("-p", "--pipeline", action="append", default=[], help="Built-in pipeline name")
+    parser.add_argument("--pipeline-file", action="append", default=[], help="Custom pipeline YAML file")
+    parser.add_argument("-s", "--samples", type=int, default=DEFAULT_SAMPLES, help="Matched events shown per rule")
+    parser.add_argument("--database", default=":memory:", help="SQLite database file to keep the loaded events")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        queries, errors = convert_rules(
+            (path.read_text(encoding="utf-8") for path in rule_files(args.rules)),
+            args.pipeline,
+            [pathlib.Path(p).read_text(encoding="utf-8") for p in args.pipeline_file],
+        )
+    except SigmaError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for error in errors:
+        print(f"Skipped: {error}", file=sys.stderr)
+    events = (event for path in args.events for event in read_events(path))
+    database = EventDatabase(args.database)
+    try:
+        report = evaluate_queries(queries, events, args.samples, database)
+    finally:
+        database.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+        return 0
+    for result in sorted(report["rules"], key=lambda result: -result["seconds"]):
+        flags = " ".join(flag for flag, on in [
+            ("slow", result["seconds"] > SLOW_QUERY_SECONDS),
+            ("scan", result["full_scan"]),
+            ("error", "error" in result),
+        ] if on)
+        if result["matches"] or flags:
+            print(f"{result['matches']:>8} {result['seconds'] * 1000:8.1f} ms {flags:<10} {result['title']}")
+            if "error" in result:
+                print(f"{'':>29}{result['error']}")
+            for sample in result["samples"]:
+                print(f"{'':>29}{json.dumps(sample, ensure_ascii=False, default=str)[:160]}")
+    matched = sum(1 for result in report["rules"] if result["matches"])
+    print(
+        f"{len(queries)} queries, {matched} matched, {report['events']} events loaded in "
+        f"{report['load_seconds']:.2f}s, queries ran in {report['seconds']:.2f}s"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
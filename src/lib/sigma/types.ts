@@ -9,4 +9,6 @@ export type { SigmaTarget };
 export interface SigmaConversionResult {
     query: string;
     error?: string;
+    // Set when the conversion was cancelled by a newer one (see SigmaConverter.cancel())
+    cancelled?: boolean;
 }
@@ -0,0 +1,59 @@
+/**
+ * Conversion cancellation through a buffer shared between the main thread and the worker.
+ *
+ * Element SIGNAL is Pyodide's interrupt buffer: writing SIGINT to it raises
+ * KeyboardInterrupt in whatever Python code the worker runs. Element STATE
+ * makes sure the signal only reaches conversions, and not a backend install or
+ * another Python call that happens to run when a conversion is superseded.
+ */
+
+const SIGNAL = 0;
+const STATE = 1;
+const SIGINT = 2;
+
+// States of the STATE element
+const IDLE = 0;
+const CONVERTING = 1;
+// The main thread is writing the signal
+const CANCELLING = 2;
+const CANCELLED = 3;
+
+// Longest wait for the main thread to finish signalling, it does so without yielding
+const SIGNAL_WAIT_MS = 100;
+
+export function createInterruptBuffer(): Int32Array {
+    return new Int32Array(new SharedArrayBuffer(2 * Int32Array.BYTES_PER_ELEMENT));
+}
+
+/**
+ * Main thread: interrupt the running conversion, if there is one
+ */
+export function requestInterrupt(buffer: Int32Array): void {
+    if (Atomics.compareExchange(buffer, STATE, CONVERTING, CANCELLING) !== CONVERTING) {
+        return;
+    }
+    Atomics.store(buffer, SIGNAL, SIGINT);
+    Atomics.store(buffer, STATE, CANCELLED);
+    Atomics.notify(buffer, STATE);
+}
+
+/**
+ * Worker: a conversion starts, it can be interrupted until endInterruptible()
+ */
+export function beginInterruptible(buffer: Int32Array): void {
+    // A cancellation requested before this conversion started was meant for an earlier one
+    Atomics.store(buffer, SIGNAL, 0);
+    Atomics.store(buffer, STATE, CONVERTING);
+}
+
+/**
+ * Worker: the conversion has ended, clear a signal it did not pick up
+ */
+export function endInterruptible(buffer: Int32Array): void {
+    if (Atomics.compareExchange(buffer, STATE, CONVERTING, IDLE) !== CONVERTING) {
+        // Cancelled meanwhile: wait until the signal is written, then drop it
+        Atomics.wait(buffer, STATE, CANCELLING, SIGNAL_WAIT_MS);
+        Atomics.store(buffer, SIGNAL, 0);
+        Atomics.store(buffer, STATE, IDLE);
+    }
+}
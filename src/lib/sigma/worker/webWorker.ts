@@ -2,12 +2,29 @@ import { loadPyodide, type PyodideInterface } from "pyodide";
 import { SIGMA_TARGETS } from "@/types/SIEMs";
 import registerPromiseWorker from "promise-worker/register";
 import type { ConversionParams, WorkerStatus } from "./workerApi";
+import { beginInterruptible, endInterruptible } from "./interrupt";
 
 // Runtime state
 let pyodide: PyodideInterface | null = null;
 let installedBackends = new Set<string>();
 let pythonModuleLoaded = false;
 let sigmaNamespace: any = null;
+// Shared with the main thread to cancel the running conversion (see cancelConversion())
+let interruptBuffer: Int32Array | null = null;
+// MITRE ATT&CK snapshot in the Pyodide file system, fetched with the first backend
+let mitreAttackSnapshot: Promise<string | null> | null = null;
+const MITRE_ATTACK_SNAPSHOT_PATH = "/home/pyodide/mitre-attack.json.gz";
+// Lock manifest of the wheelhouse and the namespace of sigma_provisioning.py, null without a wheelhouse
+let wheelhouseLock: string | null = null;
+let provisioningNamespace: any = null;
+// Backend installs in progress by target
+const pendingInstalls = new Map<string, Promise<{ success: boolean; error?: string }>>();
+// IndexedDB-backed directory keeping the converter caches across page loads
+const PERSISTENT_CACHE_PATH = "/persistent";
+let persistentCacheReady: Promise<boolean> = Promise.resolve(false);
+let persistentCacheSyncTimer: ReturnType<typeof setTimeout> | null = null;
+// Delay before converter cache writes are flushed to IndexedDB
+const PERSISTENT_CACHE_SYNC_DELAY = 2000;
 
 // Keep track of the initialization state
 let initializationState: WorkerStatus = {
@@ -42,27 +59,35 @@ const pyodideReadyPromise = (async () => {
       convertNullToNone: true,
     });
 
+    // Restore the cache from IndexedDB while the packages are installed
+    persistentCacheReady = mountPersistentCache();
+
     await pyodide?.loadPackage("micropip");
     const micropip = pyodide?.pyimport("micropip");
 
-    // Install custom PyYAML 6.0.3 wheel for PySigma 2.x compatibility
-    const wheelUrl = new URL(
-      "/wheels/pyyaml-6.0.3-cp313-cp313-pyodide_2025_0_wasm32.whl",
-      self.location.origin,
-    ).href;
-    await micropip.install(wheelUrl);
-
-    // Install PySigma (now compatible with PyYAML 6.0.3+)
-    await micropip.install("pysigma==1.3.2");
-
-    // Install pipeline packages
-    // These pipelines will be available for all backends (allowed_backends is typically None for pipelines)
-    await micropip.install([
-      "pysigma-pipeline-windows",
-      "pysigma-pipeline-sysmon",
-      // "pysigma-pipeline-ocsf", // TODO: Blocked behind pysigma 1.0.0
-      // "pySigma-pipeline-rclinuxedr" // TODO: Blocked behind pysigma 1.0.0
-    ]);
+    if (await loadProvisioning()) {
+      // PySigma, the pipelines and their pinned dependencies from the local wheelhouse
+      await installPackages(provisioningNamespace.get("BASE_PACKAGES").toJs());
+    } else {
+      // Install custom PyYAML 6.0.3 wheel for PySigma 2.x compatibility
+      const wheelUrl = new URL(
+        "/wheels/pyyaml-6.0.3-cp313-cp313-pyodide_2025_0_wasm32.whl",
+        self.location.origin,
+      ).href;
+      await micropip.install(wheelUrl);
+
+      // Install PySigma (now compatible with PyYAML 6.0.3+)
+      await micropip.install("pysigma==1.3.2");
+
+      // Install pipeline packages
+      // These pipelines will be available for all backends (allowed_backends is typically None for pipelines)
+      await micropip.install([
+        "pysigma-pipeline-windows",
+        "pysigma-pipeline-sysmon",
+        // "pysigma-pipeline-ocsf", // TODO: Blocked behind pysigma 1.0.0
+        // "pySigma-pipeline-rclinuxedr" // TODO: Blocked behind pysigma 1.0.0
+      ]);
+    }
 
     updateStatus({ pyodideReady: true });
     await loadPythonModule();
@@ -90,11 +115,7 @@ async function loadPythonModule() {
     // import with ?raw doesn't work reliably in workers across runtimes.
     // In dev mode the source path works; in production the static-copy
     // plugin places .py files at the output root.
-    let response = await fetch("/src/lib/sigma/python/sigma_converter.py");
-    if (!response.ok) {
-      response = await fetch("/sigma_converter.py");
-    }
-    const pythonCode = await response.text();
+    const pythonCode = await fetchPythonSource("sigma_converter.py");
 
     // Create a namespace for our Python module only if it doesn't exist
     if (!sigmaNamespace) {
@@ -103,6 +124,12 @@ async function loadPythonModule() {
 
     // Run the module code to define the functions in our namespace
     pyodide?.runPython(pythonCode, { globals: sigmaNamespace });
+    if (interruptBuffer) {
+      sigmaNamespace.get("set_cancel_flag")(interruptBuffer);
+    }
+    if (await persistentCacheReady) {
+      sigmaNamespace.get("set_persistent_cache")(`${PERSISTENT_CACHE_PATH}/sigma`);
+    }
     pythonModuleLoaded = true;
 
     return true;
@@ -116,33 +143,210 @@ async function loadPythonModule() {
 }
 
 /**
- * Install a backend for a specific target
+ * Mount the IndexedDB file system for the persistent converter cache and load its contents.
+ * Resolves to false if IndexedDB is unavailable, the converter then only caches in memory.
  */
-async function installBackend(target: string) {
-  if (installedBackends.has(target)) {
-    return { success: true };
+async function mountPersistentCache(): Promise<boolean> {
+  try {
+    pyodide?.FS.mkdirTree(PERSISTENT_CACHE_PATH);
+    pyodide?.FS.mount(pyodide.FS.filesystems.IDBFS, {}, PERSISTENT_CACHE_PATH);
+    await syncPersistentCache(true);
+    return true;
+  } catch (error) {
+    console.warn("Persistent conversion cache not available:", error);
+    return false;
   }
+}
 
-  const targetInfo = SIGMA_TARGETS.get(target);
-  if (!targetInfo?.backend) {
-    throw new Error(`No backend URL found for target ${target}`);
+function syncPersistentCache(populate: boolean): Promise<void> {
+  return new Promise((resolve, reject) => {
+    pyodide?.FS.syncfs(populate, (error: unknown) => (error ? reject(error) : resolve()));
+  });
+}
+
+/**
+ * Write the converter cache to IndexedDB once conversions have settled
+ */
+function schedulePersistentCacheSync() {
+  if (persistentCacheSyncTimer) {
+    clearTimeout(persistentCacheSyncTimer);
   }
+  persistentCacheSyncTimer = setTimeout(() => {
+    persistentCacheSyncTimer = null;
+    syncPersistentCache(false).catch((error) => {
+      console.warn("Error saving the conversion cache:", error);
+    });
+  }, PERSISTENT_CACHE_SYNC_DELAY);
+}
 
+/**
+ * Fetch a Python source file, from the source tree in dev mode or the output root in production
+ */
+async function fetchPythonSource(name: string): Promise<string> {
+  let response = await fetch(`/src/lib/sigma/python/${name}`);
+  if (!response.ok) {
+    response = await fetch(`/${name}`);
+  }
+  return response.text();
+}
+
+/**
+ * Load sigma_provisioning.py if the build ships a wheelhouse with a lock manifest.
+ * Returns false if packages have to be installed from the package index.
+ */
+async function loadProvisioning(): Promise<boolean> {
   try {
-    updateStatus({ ready: false });
+    const response = await fetch("/wheels/lock.json");
+    if (!response.ok) {
+      return false;
+    }
+    wheelhouseLock = await response.text();
+    provisioningNamespace = pyodide?.globals.get("dict")();
+    pyodide?.runPython(await fetchPythonSource("sigma_provisioning.py"), {
+      globals: provisioningNamespace,
+    });
+    return true;
+  } catch (error) {
+    console.warn("Wheelhouse not available, installing from the package index:", error);
+    wheelhouseLock = null;
+    return false;
+  }
+}
 
-    const micropip = pyodide?.pyimport("micropip");
+/**
+ * Install packages and their dependencies, from the wheelhouse if there is one.
+ * All wheels of the resolved plan are installed by one concurrent micropip call.
+ */
+async function installPackages(packages: string[]) {
+  const micropip = pyodide?.pyimport("micropip");
+  if (wheelhouseLock) {
+    try {
+      const plan = provisioningNamespace
+        .get("install_plan")(wheelhouseLock, pyodide?.toPy(packages))
+        .toJs({ dict_converter: Object.fromEntries });
+      if (plan.external.length) {
+        // Provided by the Pyodide distribution, e.g. packages with compiled extensions
+        await micropip.install(plan.external);
+      }
+      const urls = plan.wheels.map(
+        (wheel: { file: string }) => new URL(`/wheels/${wheel.file}`, self.location.origin).href,
+      );
+      if (urls.length) {
+        await micropip.install.callKwargs(urls, { deps: false });
+      }
+      return;
+    } catch (error) {
+      console.warn(`Installing ${packages.join(", ")} from the package index:`, error);
+    }
+  }
+  await micropip.install(packages);
+}
 
-    const backendPackage = targetInfo.backend;
+/**
+ * Whether fetched content is a gzipped snapshot, or a JSON one if the server
+ * removed the compression already (Content-Encoding: gzip)
+ */
+function isMitreAttackSnapshot(content: Uint8Array): boolean {
+  if (content[0] === 0x1f && content[1] === 0x8b) {
+    return true;
+  }
+  // Skip JSON whitespace
+  const start = content.findIndex((byte) => ![0x20, 0x09, 0x0a, 0x0d].includes(byte));
+  return content[start] === 0x7b; // "{"
+}
 
-    console.log(`Installing backend ${backendPackage} for target ${target}...`);
-    await micropip.install(backendPackage);
+/**
+ * Fetch the MITRE ATT&CK snapshot (see scripts/generate-attack-data.py) into
+ * the Pyodide file system. Resolves to its path, or null if the build has none.
+ */
+function fetchMitreAttackSnapshot(): Promise<string | null> {
+  if (!mitreAttackSnapshot) {
+    mitreAttackSnapshot = (async () => {
+      try {
+        const response = await fetch("/mitre-attack.json.gz");
+        if (!response.ok) {
+          return null;
+        }
+        const content = new Uint8Array(await response.arrayBuffer());
+        if (!isMitreAttackSnapshot(content)) {
+          // E.g. a dev server or SPA fallback answering with index.html
+          console.warn(
+            "MITRE ATT&CK snapshot not available: unexpected content of type",
+            response.headers.get("Content-Type"),
+          );
+          return null;
+        }
+        pyodide?.FS.writeFile(MITRE_ATTACK_SNAPSHOT_PATH, content);
+        return MITRE_ATTACK_SNAPSHOT_PATH;
+      } catch (error) {
+        console.warn("MITRE ATT&CK snapshot not available:", error);
+        return null;
+      }
+    })();
+  }
+  return mitreAttackSnapshot;
+}
 
-    installedBackends.add(target);
+/**
+ * Install a backend for a specific target
+ */
+async function installBackend(target: string) {
+  return (await installBackends([target]))[0];
+}
 
-    // Reload the Python module to pick up the newly installed backend
-    // This re-runs plugin autodiscovery which will find the new backend
-    await loadPythonModule();
+/**
+ * Install the backends of several targets, resolving their packages together
+ */
+async function installBackends(targets: string[]) {
+  const missing = [...new Set(targets)].filter(
+    (target) => !installedBackends.has(target) && !pendingInstalls.has(target),
+  );
+  if (missing.length) {
+    const install = installMissingBackends(missing);
+    for (const target of missing) {
+      pendingInstalls.set(target, install);
+    }
+    install.finally(() => missing.forEach((target) => pendingInstalls.delete(target)));
+  }
+  return Promise.all(
+    targets.map((target) =>
+      installedBackends.has(target)
+        ? { success: true }
+        : (pendingInstalls.get(target) ?? { success: true }),
+    ),
+  );
+}
+
+async function installMissingBackends(targets: string[]) {
+  try {
+    const backendPackages = targets.map((target) => {
+      const targetInfo = SIGMA_TARGETS.get(target);
+      if (!targetInfo?.backend) {
+        throw new Error(`No backend URL found for target ${target}`);
+      }
+      return targetInfo.backend;
+    });
+
+    updateStatus({ ready: false });
+
+    console.log(`Installing backends ${backendPackages.join(", ")} for ${targets.join(", ")}...`);
+    // Backends read ATT&CK data when enriching rules, fetch it during the install
+    const snapshotPromise = fetchMitreAttackSnapshot();
+    await installPackages([...new Set(backendPackages)]);
+    const snapshotPath = await snapshotPromise;
+
+    targets.forEach((target) => installedBackends.add(target));
+
+    // Plugins are discovered again on next use, which finds the new backend.
+    // The module itself doesn't need to be reloaded.
+    if (pythonModuleLoaded) {
+      sigmaNamespace.get("refresh_plugins")();
+    } else {
+      await loadPythonModule();
+    }
+    if (snapshotPath && pythonModuleLoaded) {
+      sigmaNamespace.get("set_mitre_attack_snapshot")(snapshotPath);
+    }
 
     updateStatus({ ready: true });
 
@@ -150,7 +354,7 @@ async function installBackend(target: string) {
   } catch (error) {
     const errorMsg = error instanceof Error ? error.message : String(error);
     updateStatus({
-      error: `Error installing backend ${target}: ${errorMsg}`,
+      error: `Error installing backend ${targets.join(", ")}: ${errorMsg}`,
     });
     return {
       success: false,
@@ -172,6 +376,9 @@ async function convertRule(params: ConversionParams) {
     format = "default",
     correlationMethod = "",
     backendOptions = {},
+    timeBudget,
+    simplifyConditions = false,
+    optimizePipeline = false,
   } = params;
 
   if (!installedBackends.has(target)) {
@@ -194,6 +401,9 @@ async function convertRule(params: ConversionParams) {
       format,
       correlation_method: correlationMethod || null,
       backend_options: backendOptions || {},
+      time_budget: timeBudget ?? null,
+      simplify_conditions: simplifyConditions,
+      optimize_pipeline: optimizePipeline,
     };
 
     // Set parameters in namespace using toPy
@@ -211,17 +421,41 @@ async function convertRule(params: ConversionParams) {
           pipeline_ymls=pipeline_ymls,
           filter_yml=filter_yml,
           correlation_method=correlation_method,
-          backend_options=backend_options
+          backend_options=backend_options,
+          time_budget=time_budget,
+          simplify_conditions=simplify_conditions,
+          optimize_pipeline=optimize_pipeline
         )
       `;
 
-    const result = pyodide?.runPython(pythonCode, { globals: sigmaNamespace });
+    // Cancellation only interrupts the conversion itself, not installs or other Python calls
+    if (interruptBuffer) {
+      beginInterruptible(interruptBuffer);
+    }
+    let result;
+    try {
+      result = pyodide?.runPython(pythonCode, { globals: sigmaNamespace });
+    } finally {
+      if (interruptBuffer) {
+        endInterruptible(interruptBuffer);
+      }
+    }
+    if (await persistentCacheReady) {
+      schedulePersistentCacheSync();
+    }
     return { result: result };
   } catch (error) {
     const errorMsg = error instanceof Error ? error.message : String(error);
+    let conversionStatus: string | undefined;
+    if (errorMsg.includes("ConversionCancelled")) {
+      conversionStatus = "cancelled";
+    } else if (errorMsg.includes("ConversionBudgetExceeded")) {
+      conversionStatus = "budget_exceeded";
+    }
     return {
       error: errorMsg,
       success: false,
+      conversionStatus,
     };
   }
 }
@@ -258,6 +492,20 @@ registerPromiseWorker(async (message) => {
       case "install":
         return await installBackend(message.target);
 
+      case "preinstall":
+        // Backends the workspace is known to use, installed before the first conversion asks
+        return { success: (await installBackends(message.targets)).every((result) => result.success) };
+
+      case "set_interrupt_buffer":
+        // Pyodide raises KeyboardInterrupt when the first element is set to 2 (SIGINT),
+        // converter checkpoints additionally stop at any non-zero value (see interrupt.ts)
+        interruptBuffer = message.interruptBuffer;
+        pyodide?.setInterruptBuffer(message.interruptBuffer);
+        if (pythonModuleLoaded) {
+          sigmaNamespace.get("set_cancel_flag")(interruptBuffer);
+        }
+        return { success: true };
+
       case "status":
         // Return the current initialization state
         return {
@@ -1,8 +1,11 @@
 import PromiseWorker from "promise-worker";
+import { createInterruptBuffer, requestInterrupt } from "./interrupt";
 
 // For client-side use only - lazy initialization
 let worker: Worker;
 let promiseWorker: PromiseWorker;
+// Shared with the worker to cancel running conversions, needs cross-origin isolation
+let interruptBuffer: Int32Array | null = null;
 
 // Status event handlers
 const statusListeners: ((status: WorkerStatus) => void)[] = [];
@@ -18,6 +21,8 @@ type WorkerMessage = {
     type: string;
     conversionParams?: ConversionParams;
     target?: string;
+    targets?: string[];
+    interruptBuffer?: Int32Array;
 };
 
 type WorkerResponse = {
@@ -26,6 +31,8 @@ type WorkerResponse = {
     result?: string;
     error?: string;
     success?: boolean;
+    // Set when the conversion was cancelled or exceeded its time budget
+    conversionStatus?: "cancelled" | "budget_exceeded";
 };
 
 // Initialize worker only in browser environment
@@ -45,6 +52,16 @@ function getWorker(): PromiseWorker {
                     notifyStatusListeners(data.status);
                 }
             });
+
+            if (typeof SharedArrayBuffer !== "undefined" && self.crossOriginIsolated) {
+                interruptBuffer = createInterruptBuffer();
+                promiseWorker.postMessage<WorkerResponse, WorkerMessage>({
+                    type: "set_interrupt_buffer",
+                    interruptBuffer,
+                }).catch((error) => {
+                    console.error("Error setting up conversion cancellation:", error);
+                });
+            }
         }
     }
 
@@ -60,6 +77,12 @@ export type ConversionParams = {
     format?: string;
     correlationMethod?: string;
     backendOptions?: Record<string, any>;
+    // Maximum conversion time in seconds
+    timeBudget?: number;
+    // Simplify rule conditions (flatten, deduplicate, merge IN-lists) before conversion
+    simplifyConditions?: boolean;
+    // Fuse field mapping items, memoize log source conditions and keep the optimized pipeline between conversions
+    optimizePipeline?: boolean;
 };
 
 /**
@@ -102,6 +125,19 @@ export function convert(conversionParams: ConversionParams): Promise<WorkerRespo
     });
 }
 
+/**
+ * Cancel the conversion currently running in the worker.
+ * Returns false if cancellation is unavailable (the page is not cross-origin isolated).
+ */
+export function cancelConversion(): boolean {
+    if (!interruptBuffer) {
+        return false;
+    }
+    // Only signals while a conversion runs, see interrupt.ts
+    requestInterrupt(interruptBuffer);
+    return true;
+}
+
 /**
  * Install a backend for a specific target
  */
@@ -112,6 +148,16 @@ export function installBackend(target: string): Promise<WorkerResponse> {
     });
 }
 
+/**
+ * Install the backends of several targets ahead of their first conversion
+ */
+export function preinstallBackends(targets: string[]): Promise<WorkerResponse> {
+    return getWorker().postMessage<WorkerResponse, WorkerMessage>({
+        type: "preinstall",
+        targets,
+    });
+}
+
 /**
  * Get current worker status
  */
@@ -7,6 +7,9 @@ import type { SigmaStore } from "@/types/SigmaStore";
 import { useWorkspaceStore } from "@/stores/WorkspaceStore";
 import { SigmaConverter } from "@/lib/sigma";
 
+// Maximum time in seconds a conversion of the edited rule may take
+const CONVERSION_TIME_BUDGET = 10;
+
 export function createSigmaStore(id: string): StoreDefinition<string, SigmaStore> {
     // @ts-ignore
     return defineStore(
@@ -43,6 +46,7 @@ export function createSigmaStore(id: string): StoreDefinition<string, SigmaStore
 
             // Initialize the converter
             const sigmaConverter = ref(new SigmaConverter());
+            sigmaConverter.value.preinstall([selected_siem.value]);
 
             // Track readiness state
             const isReady = ref(false);
@@ -67,7 +71,7 @@ export function createSigmaStore(id: string): StoreDefinition<string, SigmaStore
             }
 
             // Async computed property for SIEM query
-            const siem_query = computedAsync(async () => {
+            const siem_query = computedAsync(async (onCancel) => {
                 // Skip in SSR/SSG environment
                 if (typeof Worker === "undefined") {
                     return "";
@@ -77,6 +81,9 @@ export function createSigmaStore(id: string): StoreDefinition<string, SigmaStore
                     return "";
                 }
 
+                // The rule changed again before this conversion finished, stop it in the worker
+                onCancel(() => sigmaConverter.value.cancel());
+
                 // Get pipeline and filter YAML content from files
                 const pipelineYmls =
                     fs.value?.files
@@ -115,8 +122,17 @@ export function createSigmaStore(id: string): StoreDefinition<string, SigmaStore
                         pipeline,
                         pipelineYmls,
                         filterYml,
+                        "",
+                        "",
+                        {},
+                        CONVERSION_TIME_BUDGET,
                     );
 
+                    if (result.cancelled) {
+                        // Superseded by a newer conversion, which reports its own outcome
+                        return siem_query.value;
+                    }
+
                     if (result.error) {
                         siem_conversion_error.value = result.error;
                         return siem_query.value;
@@ -18,25 +18,124 @@ interface SearchResponse {
 let index: Flexsearch.Document<any> | null = null;
 let rulesMap: Map<string, SigmaRule> = new Map();
 
+// Layout constants of the columnar index, see encode_columnar() in scripts/generate-sigma-index.py
+const COLUMNAR_MAGIC = "SGIX";
+const COLUMNAR_VERSION = 1;
+const COLUMNAR_FIELDS = ["id", "title", "description", "status", "author", "level", "path"] as const;
+const COLUMNAR_JSON_VALUE = 0x80000000;
+const COLUMNAR_TAGS_VALUE = 1;
+const COLUMNAR_LOGSOURCE_VALUE = 2;
+
+/**
+ * Decode the columnar rules index, returns null if the data is not a columnar index
+ */
+function decodeColumnarIndex(buffer: ArrayBuffer): SigmaRule[] | null {
+    const header = new DataView(buffer);
+    const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, Math.min(4, buffer.byteLength)));
+    if (
+        buffer.byteLength < 24 ||
+        magic !== COLUMNAR_MAGIC ||
+        header.getUint32(4, true) !== COLUMNAR_VERSION
+    ) {
+        return null;
+    }
+    const ruleCount = header.getUint32(8, true);
+    const stringCount = header.getUint32(12, true);
+    const tagCount = header.getUint32(16, true);
+    const pairCount = header.getUint32(20, true);
+
+    // All tables are little-endian uint32 arrays following the header
+    let offset = 24;
+    const table = (length: number) => {
+        const values = new Uint32Array(buffer, offset, length);
+        offset += length * 4;
+        return values;
+    };
+    const stringOffsets = table(stringCount + 1);
+    const columns = {} as Record<(typeof COLUMNAR_FIELDS)[number], Uint32Array>;
+    for (const field of COLUMNAR_FIELDS) {
+        columns[field] = table(ruleCount);
+    }
+    const flags = table(ruleCount);
+    const tagOffsets = table(ruleCount + 1);
+    const tags = table(tagCount);
+    const logsourceOffsets = table(ruleCount + 1);
+    const logsource = table(pairCount * 2);
+
+    const bytes = new Uint8Array(buffer, offset);
+    const decoder = new TextDecoder();
+    const strings: string[] = new Array(stringCount);
+    for (let i = 0; i < stringCount; i++) {
+        strings[i] = decoder.decode(bytes.subarray(stringOffsets[i], stringOffsets[i + 1]));
+    }
+    const value = (ref: number): any =>
+        ref & COLUMNAR_JSON_VALUE ? JSON.parse(strings[ref & ~COLUMNAR_JSON_VALUE]) : strings[ref];
+
+    const rules: SigmaRule[] = new Array(ruleCount);
+    for (let i = 0; i < ruleCount; i++) {
+        let ruleTags: any;
+        if (flags[i] & COLUMNAR_TAGS_VALUE) {
+            ruleTags = value(tags[tagOffsets[i]]);
+        } else {
+            ruleTags = Array.from(tags.subarray(tagOffsets[i], tagOffsets[i + 1]), value);
+        }
+        let ruleLogsource: any;
+        if (flags[i] & COLUMNAR_LOGSOURCE_VALUE) {
+            ruleLogsource = value(logsource[logsourceOffsets[i] * 2 + 1]);
+        } else {
+            ruleLogsource = {};
+            for (let pair = logsourceOffsets[i]; pair < logsourceOffsets[i + 1]; pair++) {
+                ruleLogsource[strings[logsource[pair * 2]]] = value(logsource[pair * 2 + 1]);
+            }
+        }
+        // Same property order as the JSON index
+        rules[i] = {
+            id: value(columns.id[i]),
+            title: value(columns.title[i]),
+            description: value(columns.description[i]),
+            status: value(columns.status[i]),
+            author: value(columns.author[i]),
+            tags: ruleTags,
+            level: value(columns.level[i]),
+            path: value(columns.path[i]),
+            logsource: ruleLogsource,
+        } as SigmaRule;
+    }
+    return rules;
+}
+
+/**
+ * Load the rules index, preferring the columnar index over the JSON index
+ */
+async function fetchRulesIndex(): Promise<unknown> {
+    const columnar = await fetch("/sigma-rules-index.bin").catch(() => null);
+    if (columnar?.ok) {
+        const rules = decodeColumnarIndex(await columnar.arrayBuffer());
+        if (rules) {
+            return rules;
+        }
+    }
+
+    const response = await fetch("/sigma-rules-index.json");
+
+    if (!response.ok) {
+        throw new Error(`Failed to load rules index: ${response.status} ${response.statusText}`);
+    }
+
+    return await response.json();
+}
+
 // Listen for messages from the main thread
 self.onmessage = async (event: MessageEvent<SearchMessage>) => {
     const { type, query, rules } = event.data;
 
     try {
         if (type === "load") {
-            // Load rules from the sigma-rules-index.json file
+            // Load rules from the sigma-rules-index.bin or .json file
             console.log("SearchWorker: Loading rules from index...");
 
             try {
-                const response = await fetch("/sigma-rules-index.json");
-
-                if (!response.ok) {
-                    throw new Error(
-                        `Failed to load rules index: ${response.status} ${response.statusText}`,
-                    );
-                }
-
-                const data = await response.json();
+                const data = await fetchRulesIndex();
 
                 if (!Array.isArray(data)) {
                     throw new Error("Invalid rules index format");